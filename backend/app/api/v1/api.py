@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import resumes, users, analysis
+from app.api.v1.endpoints import resumes, users, analysis, tasks
 
 api_router = APIRouter()
 
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
 api_router.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
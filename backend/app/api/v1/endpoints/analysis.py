@@ -1,75 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Any
-from uuid import UUID
+import json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncContextManager, AsyncIterator, List, Optional
 
-from app.core.security import get_current_user
-from app.services.ats_scoring_service import ATSScoringService
+from app.core.admission import AdmissionController, admission_slot, client_ip
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceeded
+from app.core.security import get_current_user, get_current_token, verify_guest_session, verify_token
+from app.services.analysis_workflow_service import AnalysisWorkflowService
+from app.services.batch_scoring_service import BatchScoringService
 from app.schemas.scoring import ATSScoreResult
-from app.clients.supabase import supabase
 from app.services.rewrite_service import RewriteService
-from app.schemas.analysis import AnalysisRequest, RewriteRequest, RewriteResult, OptimizeRequest, OptimizeResult
+from app.services.live_scoring_service import LiveScoringService
+from app.schemas.analysis import AnalysisRequest, BatchScoreItem, BatchScoreRequest, BatchScoreResponse, RewriteRequest, RewriteResult, OptimizeRequest, OptimizeResult
 from app.core.logging import logger
-from app.core.exceptions import ResourceNotFound, NexusError
 
 router = APIRouter()
 
-@router.post("/optimize", response_model=OptimizeResult)
+@router.post("/optimize", response_model=OptimizeResult, dependencies=[Depends(admission_slot)])
 async def optimize_resume(
     request: OptimizeRequest,
     current_user_id: str = Depends(get_current_user)
 ) -> Any:
     """
     Generates a full optimized resume based on ATS analysis.
+    For long resumes prefer `POST /tasks/optimize`, which runs in the background.
     """
-    # Fetch Resume if text not provided
-    resume_text = request.resume_text
-    if not resume_text:
-        if not request.resume_id:
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Either resume_id or resume_text must be provided")
+    return await AnalysisWorkflowService.optimize(request, current_user_id)
 
-        try:
-            # We fetch only the raw_text field
-            response = supabase.table("resumes")\
-                .select("raw_text")\
-                .eq("id", str(request.resume_id))\
-                .eq("user_id", current_user_id)\
-                .execute()
-                
-            if not response.data:
-                raise ResourceNotFound(resource="Resume", resource_id=str(request.resume_id))
-                
-            resume_record = response.data[0]
-            resume_text = resume_record.get("raw_text")
-            
-            if not resume_text:
-                raise NexusError("Resume has no extracted text. Please re-upload or wait for processing.")
-                
-        except ResourceNotFound as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
-        except NexusError as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
-        except Exception as e:
-            logger.error(f"Database error fetching resume: {str(e)}")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
-
-    try:
-        result = await RewriteService.optimize_full_resume(
-            resume_text=resume_text,
-            job_description=request.job_description,
-            missing_critical_skills=request.missing_critical_skills,
-            missing_bonus_skills=request.missing_bonus_skills,
-            suggestions=request.suggestions
-        )
-        return result
-        
-    except Exception as e:
-        logger.error(f"Optimization failed: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate optimized resume"
-        )
-
-@router.post("/rewrite", response_model=RewriteResult)
+@router.post("/rewrite", response_model=RewriteResult, dependencies=[Depends(admission_slot)])
 async def rewrite_text(
     request: RewriteRequest,
     current_user_id: str = Depends(get_current_user)
@@ -85,6 +44,8 @@ async def rewrite_text(
         )
         return result
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Rewrite failed: {str(e)}")
         raise HTTPException(
@@ -92,64 +53,112 @@ async def rewrite_text(
             detail="Failed to generate rewrite suggestion"
         )
 
-@router.post("/score", response_model=ATSScoreResult)
+@router.post("/score", response_model=ATSScoreResult, dependencies=[Depends(admission_slot)])
 async def calculate_score(
     request: AnalysisRequest,
-    current_user_id: str = Depends(get_current_user)
+    response: Response,
+    background_tasks: BackgroundTasks,
+    current_user_id: str = Depends(get_current_user),
+    token: Optional[str] = Depends(get_current_token)
 ) -> Any:
     """
     Calculates the ATS Match Score for a given resume and job description.
     
     1. Verifies the resume belongs to the user.
     2. Retrieves the raw text of the resume.
-    3. Calls the ATSScoringService to compute the score.
+    3. Returns the stored result for this exact resume/JD pair, unless `force_refresh` is set.
+    4. Otherwise calls the ATSScoringService to compute the score and stores it.
+    """
+    # Only authenticated users have rows in `analyses`
+    persisted = token is not None
+    outcome = await AnalysisWorkflowService.score(request, current_user_id, persisted=persisted)
+
+    # The DB write happens after the response is sent
+    if persisted and not outcome.from_store:
+        background_tasks.add_task(outcome.persist, current_user_id, request)
+    response.headers["X-Analysis-Cache"] = "hit" if outcome.from_store else "miss"
+    return outcome.result
+
+@router.post("/score/batch", response_model=BatchScoreResponse, dependencies=[Depends(admission_slot)])
+async def calculate_score_batch(
+    request: BatchScoreRequest,
+    background_tasks: BackgroundTasks,
+    current_user_id: str = Depends(get_current_user),
+    token: Optional[str] = Depends(get_current_token)
+) -> Any:
     """
+    Scores one resume against many job descriptions, or many resumes against one job description.
     
-    resume_text = request.resume_text
+    - Default: one JSON body with every item, best match first.
+    - `stream: true`: NDJSON, one `{"type": "item", ...}` line per pair as soon as it completes,
+      then a final `{"type": "ranking", "order": [...]}` line with the item indexes best first.
+    """
+    persisted = token is not None
+    # Resolving inputs first means 4xx errors are returned before any streaming starts
+    plan = await BatchScoringService.prepare(request, current_user_id)
+    items = BatchScoringService.run(plan, persisted=persisted, background_tasks=background_tasks)
+
+    if not request.stream:
+        return BatchScoreResponse(items=BatchScoringService.rank([item async for item in items]))
+
+    async def ndjson() -> AsyncIterator[str]:
+        completed: List[BatchScoreItem] = []
+        async for item in items:
+            completed.append(item)
+            yield json.dumps({"type": "item", **item.model_dump(mode="json")}) + "\n"
+        ranked = BatchScoringService.rank(completed)
+        yield json.dumps({"type": "ranking", "order": [item.index for item in ranked if item.rank is not None]}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.websocket("/live")
+async def live_score(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    session_id: Optional[str] = None
+):
+    """
+    Live ATS scoring while the user edits.
     
-    # 1. Fetch Resume if text not provided
-    if not resume_text:
-        if not request.resume_id:
-             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Either resume_id or resume_text must be provided")
+    Browsers cannot set headers on WebSockets, so identity comes from the
+    signed `session_id` or the `token` query parameter. See LiveScoringService for the protocol.
 
+    Open connections are capped by LIVE_MAX_CONNECTIONS (globally and per key; closed
+    with 1013 when refused) and hold no request slot; each debounced re-score is
+    admitted like a request.
+    """
+    guest_id = verify_guest_session(session_id) if session_id else None
+    if guest_id is None:
+        if not token:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
         try:
-            # We fetch only the raw_text field to save bandwidth
-            response = supabase.table("resumes")\
-                .select("raw_text")\
-                .eq("id", str(request.resume_id))\
-                .eq("user_id", current_user_id)\
-                .execute()
-                
-            if not response.data:
-                raise ResourceNotFound(resource="Resume", resource_id=str(request.resume_id))
-                
-            resume_record = response.data[0]
-            resume_text = resume_record.get("raw_text")
-            
-            if not resume_text:
-                raise NexusError("Resume has no extracted text. Please re-upload or wait for processing.")
-                
-        except ResourceNotFound as e:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
-        except NexusError as e:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
-        except Exception as e:
-            logger.error(f"Database error fetching resume: {str(e)}")
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+            user_id = verify_token(token)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
 
-    logger.info(f"Proceeding to scoring with resume text length: {len(resume_text)}")
+    keys = None
+    admit = None
+    if settings.ADMISSION_ENABLED:
+        keys = AdmissionController.keys_for(
+            guest_id or user_id,
+            guest_session=guest_id is not None,
+            authenticated=guest_id is None,
+            ip=client_ip(websocket)
+        )
+        if not AdmissionController.open_live(keys):
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+        def admit() -> AsyncContextManager[None]:
+            return AdmissionController.slot(keys)
 
-    # 2. Calculate Score
     try:
-        result = await ATSScoringService.calculate_score(
-            resume_text=resume_text,
-            job_description=request.job_description
-        )
-        return result
-        
-    except Exception as e:
-        logger.error(f"Scoring failed: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-            detail="Failed to calculate ATS score"
-        )
+        await websocket.accept()
+        await LiveScoringService.serve(websocket.receive_json, websocket.send_json, admit=admit)
+    except WebSocketDisconnect:
+        logger.info("Live scoring client disconnected")
+    finally:
+        if keys is not None:
+            AdmissionController.close_live(keys)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, UploadFile, File, status, Response
-from typing import List
+from fastapi import APIRouter, Depends, UploadFile, File, Header, Query, status, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from app.core.security import get_current_user, get_current_token
-from app.schemas.resume import ResumeResponse
+from app.schemas.resume import BulkUploadResponse, ResumeListItem, ResumeResponse
 from app.services.resume_service import ResumeService
 
 router = APIRouter()
@@ -21,38 +22,84 @@ async def upload_resume(
     """
     return await ResumeService.upload_resume(user_id=current_user_id, file=file, jwt_token=token)
 
+@router.post("/bulk_upload", response_model=BulkUploadResponse)
+async def bulk_upload(
+    files: List[UploadFile] = File(...),
+    current_user_id: str = Depends(get_current_user),
+    token: str = Depends(get_current_token)
+):
+    """
+    Upload many resume PDFs at once, as separate files and/or ZIP archives.
+    
+    - Each file gets its own result (`uploaded` or `failed` with a reason).
+    - Per-file limit is the same as `/upload_resume`; the batch is limited in file
+      count and total (uncompressed) size.
+    """
+    return await ResumeService.bulk_upload(user_id=current_user_id, files=files, jwt_token=token)
+
 @router.get("/download_resume")
 async def download_resume(
     file_name: str,
-    current_user_id: str = Depends(get_current_user)
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    current_user_id: str = Depends(get_current_user),
+    token: Optional[str] = Depends(get_current_token)
 ):
     """
     Download a resume PDF.
     
-    - Fetches the file from Supabase Storage.
+    - Streams the file from Supabase Storage (constant memory per download).
+    - Supports `If-None-Match` (304) and single `Range` requests (206) for PDF viewers.
     - Ensures user can only access their own files.
     """
-    file_content = await ResumeService.download_resume(user_id=current_user_id, file_name=file_name)
+    download = await ResumeService.download_resume(
+        user_id=current_user_id,
+        file_name=file_name,
+        range_header=range_header,
+        if_none_match=if_none_match,
+        guest=token is None
+    )
     
+    headers = {
+        **download.headers,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename={file_name}",
+    }
+    if download.stream is not None:
+        return StreamingResponse(
+            download.stream,
+            status_code=download.status_code,
+            media_type="application/pdf",
+            headers=headers
+        )
     return Response(
-        content=file_content,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={file_name}"}
+        content=download.body,
+        status_code=download.status_code,
+        media_type="application/pdf" if download.body is not None else None,
+        headers=headers
     )
 
-@router.get("/", response_model=List[ResumeResponse])
-async def get_resumes(current_user_id: str = Depends(get_current_user)):
+@router.get("/", response_model=List[ResumeListItem], response_model_exclude_unset=True)
+async def get_resumes(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. `file_name,raw_text`"),
+    current_user_id: str = Depends(get_current_user)
+):
     """
-    List all resumes for the authenticated user.
+    List the authenticated user's resumes, newest first.
+
+    - Keyset-paginated on (created_at, id): pass `X-Next-Cursor` back as `cursor`.
+    - Summary columns only by default; `raw_text` / `parsed_content` must be requested via `fields`.
+    - Guests have no DB records and get an empty list.
     """
-    # This logic should also ideally be in the service layer, but for simple fetches it's ok here.
-    # For consistency, let's create a placeholder or call Supabase directly here for now.
-    from app.clients.supabase import supabase
-    
-    # Check if guest
-    try:
-        response = supabase.table("resumes").select("*").eq("user_id", current_user_id).execute()
-        return response.data
-    except Exception as e:
-        # Guests don't have DB records, return empty list instead of 500
-        return []
+    items, next_cursor = await ResumeService.list_resumes(
+        user_id=current_user_id,
+        limit=limit,
+        cursor=cursor,
+        fields=fields
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.admission import admission_slot
+from app.core.config import settings
+from app.core.security import get_current_user, get_current_token
+from app.schemas.analysis import AnalysisRequest, OptimizeRequest
+from app.schemas.task import TaskAccepted, TaskResponse
+from app.services.task_backends import Task
+from app.services.task_queue_service import TaskQueueService
+import app.services.task_handlers  # noqa: F401  (registers the score/optimize handlers)
+
+router = APIRouter()
+
+
+def _accepted(task: Task) -> TaskAccepted:
+    base = f"{settings.API_V1_STR}/tasks/{task.id}"
+    return TaskAccepted(id=task.id, status=task.status, status_url=base, events_url=f"{base}/events")
+
+
+def _to_response(task: Task) -> TaskResponse:
+    return TaskResponse(
+        id=task.id,
+        type=task.type,
+        status=task.status,
+        attempts=task.attempts,
+        max_attempts=task.max_attempts,
+        result=task.result,
+        error=task.error,
+        created_at=datetime.fromtimestamp(task.created_at, tz=timezone.utc),
+        updated_at=datetime.fromtimestamp(task.updated_at, tz=timezone.utc)
+    )
+
+
+@router.post(
+    "/score", response_model=TaskAccepted, status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admission_slot)]
+)
+async def enqueue_score(
+    request: AnalysisRequest,
+    current_user_id: str = Depends(get_current_user),
+    token: Optional[str] = Depends(get_current_token)
+) -> Any:
+    """
+    Queues an ATS score calculation (same body as POST /analysis/score).
+    Returns the task id immediately; the result appears on the task once it succeeds.
+    """
+    task = await TaskQueueService.enqueue(
+        "score",
+        current_user_id,
+        {"request": request.model_dump(mode="json"), "persist": token is not None}
+    )
+    return _accepted(task)
+
+
+@router.post(
+    "/optimize", response_model=TaskAccepted, status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admission_slot)]
+)
+async def enqueue_optimize(
+    request: OptimizeRequest,
+    current_user_id: str = Depends(get_current_user)
+) -> Any:
+    """
+    Queues a full resume optimisation (same body as POST /analysis/optimize).
+    """
+    task = await TaskQueueService.enqueue("optimize", current_user_id, {"request": request.model_dump(mode="json")})
+    return _accepted(task)
+
+
+@router.get("/{task_id}", response_model=TaskResponse)
+async def get_task(task_id: str, current_user_id: str = Depends(get_current_user)) -> Any:
+    """
+    Current state of a task: queued, running, succeeded (with `result`) or failed (with `error`).
+    """
+    task = await TaskQueueService.get(task_id, current_user_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return _to_response(task)
+
+
+@router.get("/{task_id}/events")
+async def task_events(task_id: str, current_user_id: str = Depends(get_current_user)):
+    """
+    Server-Sent Events stream of the task's state changes.
+    Each `status` event carries the same body as GET /tasks/{task_id}; the stream
+    ends after the task succeeds or fails.
+    """
+    if await TaskQueueService.get(task_id, current_user_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    async def stream() -> AsyncIterator[str]:
+        async for task in TaskQueueService.events(task_id, current_user_id):
+            yield f"event: status\ndata: {json.dumps(_to_response(task).model_dump(mode='json'))}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
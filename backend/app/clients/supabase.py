@@ -1,25 +1,139 @@
-from supabase import create_client, Client
+import hashlib
+import time
+from typing import Optional
+
+import httpx
+from jose import jwt
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import DeadlineExceeded
 from app.core.logging import logger
+from app.core.metrics import metrics
+
+async def _trace(event_name: str, info: dict) -> None:
+    # httpcore trace hook: a TCP connect means the pool had no reusable connection
+    if event_name == "connection.connect_tcp.complete":
+        metrics.inc("supabase.http.connections_opened")
+
+def _bound_timeout(request: httpx.Request) -> None:
+    # Within a request deadline, no phase (connect, write, read, pool) may wait past it
+    remaining = Deadline.remaining(settings.SUPABASE_HTTP_TIMEOUT_SECONDS)
+    if remaining <= 0:
+        metrics.inc("deadline.skipped.supabase")
+        raise DeadlineExceeded("supabase")
+    if remaining < settings.SUPABASE_HTTP_TIMEOUT_SECONDS:
+        request.extensions["timeout"] = httpx.Timeout(remaining).as_dict()
+
+async def _on_request(request: httpx.Request) -> None:
+    metrics.inc("supabase.http.requests")
+    request.extensions["trace"] = _trace
+    _bound_timeout(request)
+
+def _token_key_and_ttl(jwt_token: str) -> tuple[str, float]:
+    key = hashlib.sha256(jwt_token.encode("utf-8")).hexdigest()
+    ttl = settings.SUPABASE_SCOPED_CLIENT_TTL_SECONDS
+    try:
+        exp = jwt.get_unverified_claims(jwt_token).get("exp")
+        if exp:
+            ttl = min(ttl, exp - time.time())
+    except Exception:
+        pass
+    return key, ttl
 
-class SupabaseClient:
-    _instance: Client = None
+def _pool_stats(http_client) -> dict:
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = list(pool.connections) if pool is not None else []
+    return {
+        "open_connections": len(connections),
+        "idle_connections": sum(1 for conn in connections if conn.is_idle()),
+    }
+
+class AsyncSupabaseClient:
+    """
+    Supabase clients used by the repositories. DB and storage calls await on the
+    event loop instead of blocking it. Every client, including the per-user
+    scoped ones, shares one pooled HTTP transport (keep-alive, TLS reuse).
+    """
+    _instance: AsyncClient = None
+    _http: Optional[httpx.AsyncClient] = None
+    _scoped: LRUCache[AsyncClient] = LRUCache(max_entries=settings.SUPABASE_SCOPED_CLIENT_CACHE_SIZE)
+
+    @classmethod
+    def get_http_client(cls) -> httpx.AsyncClient:
+        if cls._http is None:
+            cls._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(settings.SUPABASE_HTTP_TIMEOUT_SECONDS),
+                event_hooks={"request": [_on_request]}
+            )
+        return cls._http
 
     @classmethod
-    def get_client(cls) -> Client:
+    async def get_client(cls) -> Optional[AsyncClient]:
         if cls._instance is None:
+            if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+                logger.warning("Supabase credentials missing. Supabase client will be disabled.")
+                return None
             try:
-                if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
-                    logger.warning("Supabase credentials missing. Supabase client will be disabled.")
-                    return None
-                    
-                cls._instance = create_client(
+                cls._instance = await acreate_client(
                     settings.SUPABASE_URL,
-                    settings.SUPABASE_KEY
+                    settings.SUPABASE_KEY,
+                    options=AsyncClientOptions(httpx_client=cls.get_http_client())
                 )
             except Exception as e:
-                logger.error(f"Failed to initialize Supabase client: {e}")
+                logger.error(f"Failed to initialize async Supabase client: {e}")
                 return None
         return cls._instance
 
-supabase = SupabaseClient.get_client()
+    @classmethod
+    async def get_scoped_client(cls, jwt_token: str) -> AsyncClient:
+        """
+        Returns a client that acts as the user (RLS applies), cached per token.
+        Entries expire after SUPABASE_SCOPED_CLIENT_TTL_SECONDS or at the token's `exp`, whichever is first.
+        """
+        key, ttl = _token_key_and_ttl(jwt_token)
+        client = cls._scoped.get(key)
+        if client is not None:
+            metrics.inc("supabase.scoped_clients.reused")
+            return client
+
+        client = await acreate_client(
+            settings.SUPABASE_URL,
+            settings.SUPABASE_KEY,
+            options=AsyncClientOptions(
+                headers={"Authorization": f"Bearer {jwt_token}"},
+                httpx_client=cls.get_http_client(),
+                auto_refresh_token=False,
+                persist_session=False
+            )
+        )
+        metrics.inc("supabase.scoped_clients.created")
+        if ttl > 0:
+            cls._scoped.set(key, client, ttl_seconds=ttl)
+        return client
+
+    @classmethod
+    async def resolve(cls, jwt_token: Optional[str] = None) -> Optional[AsyncClient]:
+        """Scoped client when a token is given (falls back to the service client on failure)."""
+        if jwt_token:
+            try:
+                return await cls.get_scoped_client(jwt_token)
+            except Exception as e:
+                logger.warning(f"Failed to create scoped client: {e}. Falling back to global client.")
+        return await cls.get_client()
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        return {
+            "max_connections": settings.SUPABASE_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.SUPABASE_POOL_MAX_KEEPALIVE,
+            **_pool_stats(cls._http),
+            "scoped_clients": cls._scoped.stats(),
+        }
+
+metrics.register("supabase_pool", AsyncSupabaseClient.pool_stats)
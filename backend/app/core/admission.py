@@ -0,0 +1,512 @@
+"""
+Admission control for the expensive (Gemini-backed) endpoints.
+
+Every admitted request holds a slot until its response is sent. A request is
+checked, in order, against:
+
+1. the global in-flight maximum (ADMISSION_MAX_IN_FLIGHT): rejected with 503
+   (load shedding) so a saturated worker stops queueing Gemini calls;
+2. the concurrency cap of each of its keys: 429;
+3. the sliding-window rate limit of each of its keys: 429, with Retry-After set
+   to when the oldest counted request leaves the window.
+
+Keys are `user:<id>` for signed-in users. Guests are limited by client IP
+(`ip:<address>`) and, when they send a correctly signed X-Session-ID, by
+`guest:<id>` as well, so a script cannot dodge the limit by dropping or
+rotating its session id. Rejected requests are not counted against the window.
+
+State lives in this process by default; ADMISSION_BACKEND="sqlite" shares it
+between the workers of one machine.
+
+Live scoring WebSockets do not hold request slots while open: they are capped
+on their own (LIVE_MAX_CONNECTIONS, LIVE_MAX_CONNECTIONS_PER_KEY, per worker,
+see `LiveConnections`), so idle editors cannot starve /score. Each debounced
+re-score they run is admitted like a request (`slot`).
+"""
+import ipaddress
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, List, Optional, Type
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import HTTPConnection
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.core.security import get_current_user, security, verify_guest_session
+
+
+@dataclass
+class AdmissionKey:
+    key: str
+    rate_limit: int  # requests per window; 0 disables the rate limit
+    max_concurrent: int  # 0 disables the concurrency cap
+
+
+@dataclass
+class Decision:
+    admitted: bool
+    ticket: Optional[str] = None  # passed to `release` once the request is done
+    status_code: int = status.HTTP_200_OK
+    reason: str = ""
+    retry_after: float = 0.0
+
+
+class AdmissionBackend(ABC):
+    """
+    Shared admission state. `acquire` must check and record atomically: two
+    requests racing for the last slot cannot both be admitted.
+    """
+    name: str = ""
+
+    @abstractmethod
+    async def acquire(self, keys: List[AdmissionKey]) -> Decision:
+        ...
+
+    @abstractmethod
+    async def release(self, ticket: str) -> None:
+        ...
+
+    @staticmethod
+    def _shed() -> Decision:
+        return Decision(
+            admitted=False,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            reason="overloaded",
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+        )
+
+    @staticmethod
+    def _busy() -> Decision:
+        return Decision(
+            admitted=False,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            reason="concurrency",
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+        )
+
+    @staticmethod
+    def _limited(retry_after: float) -> Decision:
+        return Decision(
+            admitted=False,
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            reason="rate",
+            retry_after=retry_after
+        )
+
+
+class InMemoryAdmissionBackend(AdmissionBackend):
+    """
+    Default backend: per-key logs of admission times and in-flight counters,
+    for this process only. Idle keys are dropped once per window.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._hits: Dict[str, Deque[float]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._tickets: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _sweep(self, now: float) -> None:
+        horizon = now - settings.ADMISSION_RATE_WINDOW_SECONDS
+        for key in list(self._hits):
+            hits = self._hits[key]
+            while hits and hits[0] <= horizon:
+                hits.popleft()
+            if not hits:
+                del self._hits[key]
+        self._last_sweep = now
+
+    async def acquire(self, keys: List[AdmissionKey]) -> Decision:
+        now = time.monotonic()
+        window = settings.ADMISSION_RATE_WINDOW_SECONDS
+        with self._lock:
+            if now - self._last_sweep > window:
+                self._sweep(now)
+
+            if len(self._tickets) >= settings.ADMISSION_MAX_IN_FLIGHT:
+                return self._shed()
+
+            for entry in keys:
+                if entry.max_concurrent and self._in_flight.get(entry.key, 0) >= entry.max_concurrent:
+                    return self._busy()
+
+            for entry in keys:
+                if not entry.rate_limit:
+                    continue
+                hits = self._hits.get(entry.key)
+                if hits is None:
+                    continue
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                if len(hits) >= entry.rate_limit:
+                    # Admitted again once enough of the oldest hits have left the window
+                    return self._limited(hits[len(hits) - entry.rate_limit] + window - now)
+
+            ticket = uuid.uuid4().hex
+            self._tickets[ticket] = [entry.key for entry in keys]
+            for entry in keys:
+                self._in_flight[entry.key] = self._in_flight.get(entry.key, 0) + 1
+                if entry.rate_limit:
+                    self._hits.setdefault(entry.key, deque()).append(now)
+            return Decision(admitted=True, ticket=ticket)
+
+    async def release(self, ticket: str) -> None:
+        with self._lock:
+            for key in self._tickets.pop(ticket, []):
+                remaining = self._in_flight.get(key, 0) - 1
+                if remaining > 0:
+                    self._in_flight[key] = remaining
+                else:
+                    self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._tickets), "tracked_keys": len(self._hits)}
+
+
+class SQLiteAdmissionBackend(AdmissionBackend):
+    """
+    Backend shared by the worker processes of one machine (ADMISSION_SQLITE_PATH).
+    Slots are leases that expire after ADMISSION_LEASE_SECONDS, so a worker that
+    dies mid-request does not hold its slots forever.
+    """
+    name = "sqlite"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS admission_hits (
+            key TEXT NOT NULL,
+            at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_admission_hits ON admission_hits (key, at);
+        CREATE TABLE IF NOT EXISTS admission_leases (
+            ticket TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS admission_lease_keys (
+            ticket TEXT NOT NULL,
+            key TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_admission_lease_keys ON admission_lease_keys (key, expires_at);
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.ADMISSION_SQLITE_PATH
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+    def _decide(self, keys: List[AdmissionKey], now: float) -> Decision:
+        window = settings.ADMISSION_RATE_WINDOW_SECONDS
+        conn = self._conn
+        conn.execute("DELETE FROM admission_leases WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM admission_lease_keys WHERE expires_at <= ?", (now,))
+
+        (in_flight,) = conn.execute("SELECT COUNT(*) FROM admission_leases").fetchone()
+        if in_flight >= settings.ADMISSION_MAX_IN_FLIGHT:
+            return self._shed()
+
+        for entry in keys:
+            if not entry.max_concurrent:
+                continue
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM admission_lease_keys WHERE key = ?", (entry.key,)
+            ).fetchone()
+            if count >= entry.max_concurrent:
+                return self._busy()
+
+        for entry in keys:
+            if not entry.rate_limit:
+                continue
+            conn.execute("DELETE FROM admission_hits WHERE key = ? AND at <= ?", (entry.key, now - window))
+            row = conn.execute(
+                "SELECT at FROM admission_hits WHERE key = ? ORDER BY at DESC LIMIT 1 OFFSET ?",
+                (entry.key, entry.rate_limit - 1)
+            ).fetchone()
+            if row is not None:
+                return self._limited(row[0] + window - now)
+
+        ticket = uuid.uuid4().hex
+        expires_at = now + settings.ADMISSION_LEASE_SECONDS
+        conn.execute(
+            "INSERT INTO admission_leases (ticket, expires_at) VALUES (?, ?)",
+            (ticket, expires_at)
+        )
+        conn.executemany(
+            "INSERT INTO admission_lease_keys (ticket, key, expires_at) VALUES (?, ?, ?)",
+            [(ticket, entry.key, expires_at) for entry in keys]
+        )
+        conn.executemany(
+            "INSERT INTO admission_hits (key, at) VALUES (?, ?)",
+            [(entry.key, now) for entry in keys if entry.rate_limit]
+        )
+        return Decision(admitted=True, ticket=ticket)
+
+    def _acquire(self, keys: List[AdmissionKey]) -> Decision:
+        # Wall clock: the timestamps are compared across processes
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so other workers cannot admit into the same slot
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                decision = self._decide(keys, now)
+                self._conn.execute("COMMIT")
+                return decision
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _release(self, ticket: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM admission_leases WHERE ticket = ?", (ticket,))
+                self._conn.execute("DELETE FROM admission_lease_keys WHERE ticket = ?", (ticket,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def acquire(self, keys: List[AdmissionKey]) -> Decision:
+        return await run_in_threadpool(self._acquire, keys)
+
+    async def release(self, ticket: str) -> None:
+        await run_in_threadpool(self._release, ticket)
+
+
+BACKENDS: Dict[str, Type[AdmissionBackend]] = {
+    InMemoryAdmissionBackend.name: InMemoryAdmissionBackend,
+    SQLiteAdmissionBackend.name: SQLiteAdmissionBackend,
+}
+
+
+def get_backend(name: Optional[str] = None) -> AdmissionBackend:
+    """Instantiates the configured backend (ADMISSION_BACKEND), falling back to in-memory."""
+    name = name or settings.ADMISSION_BACKEND
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"Unknown admission backend '{name}', using '{InMemoryAdmissionBackend.name}'")
+        backend_cls = InMemoryAdmissionBackend
+    return backend_cls()
+
+
+class LiveConnections:
+    """
+    Open live scoring WebSockets of this process. A socket lives in one worker,
+    so the count is per worker; a socket counts once against the global cap
+    and once against each of its keys.
+    """
+
+    def __init__(self):
+        self._open: Dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def open(self, keys: List[AdmissionKey]) -> bool:
+        """Registers a connection for `keys`; False (nothing registered) when a cap is reached."""
+        with self._lock:
+            if self._total >= settings.LIVE_MAX_CONNECTIONS:
+                return False
+            per_key = settings.LIVE_MAX_CONNECTIONS_PER_KEY
+            if per_key and any(self._open.get(entry.key, 0) >= per_key for entry in keys):
+                return False
+            self._total += 1
+            for entry in keys:
+                self._open[entry.key] = self._open.get(entry.key, 0) + 1
+            return True
+
+    def close(self, keys: List[AdmissionKey]) -> None:
+        with self._lock:
+            self._total = max(0, self._total - 1)
+            for entry in keys:
+                remaining = self._open.get(entry.key, 0) - 1
+                if remaining > 0:
+                    self._open[entry.key] = remaining
+                else:
+                    self._open.pop(entry.key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"live_connections": self._total}
+
+
+def _trusted_proxies() -> List[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    networks = []
+    for entry in settings.ADMISSION_TRUSTED_PROXIES:
+        try:
+            networks.append(ipaddress.ip_network(entry.strip(), strict=False))
+        except ValueError:
+            logger.warning("Ignoring invalid ADMISSION_TRUSTED_PROXIES entry %r", entry)
+    return networks
+
+
+_TRUSTED_PROXIES = _trusted_proxies()
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _TRUSTED_PROXIES)
+
+
+def client_ip(connection: HTTPConnection) -> str:
+    """
+    The client address. X-Forwarded-For can be written by anyone, so it is only
+    read when the socket peer is a trusted proxy (ADMISSION_TRUSTED_PROXIES);
+    the client is then the right-most hop that is not itself a trusted proxy.
+    """
+    peer = connection.client.host if connection.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+    forwarded = connection.headers.get("x-forwarded-for", "")
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+class AdmissionController:
+    _backend: Optional[AdmissionBackend] = None
+    _live = LiveConnections()
+    _stats = {
+        "admitted": 0, "rejected_overloaded": 0, "rejected_concurrency": 0, "rejected_rate": 0,
+        "rejected_live_connections": 0,
+    }
+
+    @classmethod
+    def backend(cls) -> AdmissionBackend:
+        if cls._backend is None:
+            cls._backend = get_backend()
+        return cls._backend
+
+    @staticmethod
+    def keys_for(user_id: str, guest_session: bool, authenticated: bool, ip: str) -> List[AdmissionKey]:
+        if authenticated and not guest_session:
+            return [AdmissionKey(
+                f"user:{user_id}", settings.ADMISSION_USER_RATE_LIMIT, settings.ADMISSION_MAX_CONCURRENT_PER_KEY
+            )]
+        keys = [AdmissionKey(f"ip:{ip}", settings.ADMISSION_IP_RATE_LIMIT, settings.ADMISSION_IP_MAX_CONCURRENT)]
+        if guest_session:
+            keys.append(AdmissionKey(
+                f"guest:{user_id}", settings.ADMISSION_GUEST_RATE_LIMIT, settings.ADMISSION_MAX_CONCURRENT_PER_KEY
+            ))
+        return keys
+
+    @classmethod
+    async def acquire(cls, keys: List[AdmissionKey]) -> str:
+        """Takes a slot for the keys and returns its ticket; raises HTTPException(429/503) when refused."""
+        decision = await cls.backend().acquire(keys)
+        if decision.admitted:
+            cls._stats["admitted"] += 1
+            metrics.inc("admission.admitted")
+            return decision.ticket
+
+        cls._stats[f"rejected_{decision.reason}"] += 1
+        metrics.inc(f"admission.rejected.{decision.reason}")
+        retry_after = max(1, math.ceil(decision.retry_after))
+        logger.warning(
+            "Admission refused (%s) for %s; retry after %ds",
+            decision.reason, ", ".join(entry.key for entry in keys), retry_after
+        )
+        detail = (
+            "Server is busy, please retry shortly"
+            if decision.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            else "Too many requests, please slow down"
+        )
+        raise HTTPException(
+            status_code=decision.status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    @classmethod
+    def open_live(cls, keys: List[AdmissionKey]) -> bool:
+        """Admits a live scoring connection under the LIVE_MAX_CONNECTIONS caps; pair with `close_live`."""
+        if cls._live.open(keys):
+            return True
+        cls._stats["rejected_live_connections"] += 1
+        metrics.inc("admission.rejected.live_connections")
+        logger.warning("Live connection refused for %s", ", ".join(entry.key for entry in keys))
+        return False
+
+    @classmethod
+    def close_live(cls, keys: List[AdmissionKey]) -> None:
+        cls._live.close(keys)
+
+    @classmethod
+    @asynccontextmanager
+    async def slot(cls, keys: List[AdmissionKey]) -> AsyncIterator[None]:
+        """Holds a slot for the block (a live re-score); raises like `acquire` when refused."""
+        ticket = await cls.acquire(keys)
+        try:
+            yield
+        finally:
+            await cls.release(ticket)
+
+    @classmethod
+    async def release(cls, ticket: str) -> None:
+        try:
+            await cls.backend().release(ticket)
+        except Exception as e:
+            # A lost release only costs a slot until its lease expires
+            logger.error(f"Failed to release admission slot: {str(e)}")
+
+    @classmethod
+    def stats(cls) -> Dict[str, object]:
+        backend = cls._backend
+        return {
+            "enabled": settings.ADMISSION_ENABLED,
+            "backend": backend.name if backend else settings.ADMISSION_BACKEND,
+            **(backend.stats() if isinstance(backend, InMemoryAdmissionBackend) else {}),
+            **cls._live.stats(),
+            **cls._stats,
+        }
+
+
+metrics.register("admission", AdmissionController.stats)
+
+
+async def admission_slot(
+    request: Request,
+    current_user_id: str = Depends(get_current_user),
+    x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+) -> AsyncIterator[None]:
+    """
+    Route dependency of the AI endpoints: holds an admission slot until the
+    response has been sent (including streamed bodies).
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+
+    # get_current_user prefers a signed session id over the JWT, so check which one it used
+    guest_session = bool(x_session_id) and verify_guest_session(x_session_id) == current_user_id
+    keys = AdmissionController.keys_for(
+        current_user_id,
+        guest_session=guest_session,
+        authenticated=credentials is not None,
+        ip=client_ip(request)
+    )
+    ticket = await AdmissionController.acquire(keys)
+    try:
+        yield
+    finally:
+        await AdmissionController.release(ticket)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Nexus Career AI"
@@ -8,14 +8,161 @@ class Settings(BaseSettings):
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
     
+    # Logging (see app/core/logging.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" (one object per line) or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread; beyond this they are dropped
+    LOG_REQUESTS: bool = True  # one line per request with its status, duration and stage timings
+    LOG_INFO_SAMPLE_RATE: float = 1.0  # share of requests whose INFO records are kept; warnings are never sampled
+    LOG_SAMPLE_RATES: Dict[str, float] = {  # message template -> rate, overriding LOG_INFO_SAMPLE_RATE
+        "Sending request to Gemini model: %s": 0.1,
+        "Sending prompt to AI (length: %d)": 0.1,
+        "Starting text extraction for: %s": 0.1,
+    }
+    
     # Supabase
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = "" # Service Role Key for Backend
     SUPABASE_JWT_SECRET: str = "" # Required for python-jose validation
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 20
+    SUPABASE_POOL_MAX_KEEPALIVE: int = 10
+    SUPABASE_HTTP_TIMEOUT_SECONDS: float = 30.0
+    SUPABASE_SCOPED_CLIENT_CACHE_SIZE: int = 256
+    SUPABASE_SCOPED_CLIENT_TTL_SECONDS: int = 300
+    
+    # Request deadlines and cancellation on disconnect (see app/core/deadline.py)
+    REQUEST_DEADLINE_SECONDS: float = 60.0
+    ROUTE_DEADLINES: Dict[str, float] = {  # path suffix -> seconds; 0 disables the deadline
+        "/analysis/score": 45.0,
+        "/analysis/score/batch": 300.0,
+        "/analysis/optimize": 120.0,
+        "/analysis/rewrite": 30.0,
+        "/resumes/upload_resume": 60.0,
+        "/resumes/bulk_upload": 300.0,
+        "/events": 0,
+    }
+    CANCEL_ON_DISCONNECT: bool = True
+    DEADLINE_MIN_AI_SECONDS: float = 3.0  # a Gemini call is not started with less budget left
+    DEADLINE_MIN_EMBEDDING_SECONDS: float = 1.0
+    DEADLINE_MIN_EXTRACTION_SECONDS: float = 1.0
+    
+    # Verified JWT cache (app/core/security.py)
+    AUTH_CACHE_MAX_ENTRIES: int = 4096
+    AUTH_CACHE_MAX_TTL_SECONDS: int = 3600
+    
+    # Guest sessions (signed X-Session-ID) and guest storage sweeper
+    GUEST_SESSION_SECRET: str = ""  # falls back to SUPABASE_JWT_SECRET
+    GUEST_STORAGE_PREFIX: str = "guests"  # guest uploads live under <prefix>/<guest_id>/
+    GUEST_STORAGE_TTL_SECONDS: int = 24 * 3600
+    GUEST_SWEEP_ENABLED: bool = True
+    GUEST_SWEEP_INTERVAL_SECONDS: int = 3600
+    GUEST_SWEEP_BATCH_SIZE: int = 100  # objects per storage list/remove call
+    
+    # Admission control for the AI endpoints (see app/core/admission.py)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared by the workers of one machine)
+    ADMISSION_SQLITE_PATH: str = "nexus_admission.db"
+    ADMISSION_RATE_WINDOW_SECONDS: float = 60.0
+    ADMISSION_USER_RATE_LIMIT: int = 30  # requests per window per signed-in user
+    ADMISSION_GUEST_RATE_LIMIT: int = 10  # per guest session
+    ADMISSION_IP_RATE_LIMIT: int = 20  # per client IP, applied to guests only
+    ADMISSION_MAX_CONCURRENT_PER_KEY: int = 2
+    ADMISSION_IP_MAX_CONCURRENT: int = 4
+    ADMISSION_MAX_IN_FLIGHT: int = 32  # admitted requests across all keys; beyond this requests are shed with 503
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5  # Retry-After of concurrency and load-shedding rejections
+    ADMISSION_LEASE_SECONDS: float = 600.0  # a slot not released by then (crashed worker) is freed
+    # Proxies (addresses or CIDR ranges) whose X-Forwarded-For is trusted for the client IP;
+    # empty: the socket peer is the client and the header is ignored
+    ADMISSION_TRUSTED_PROXIES: List[str] = []
+    
+    # Idempotency-Key support (see app/core/idempotency.py)
+    IDEMPOTENCY_PATHS: List[str] = ["/analysis/score", "/analysis/optimize", "/resumes/upload_resume"]
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_MAX_ENTRIES: int = 4096
+    IDEMPOTENCY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = 1024 * 1024  # larger responses are not stored
+    IDEMPOTENCY_WAIT_SECONDS: float = 120.0  # a duplicate waits this long (or until its deadline) for the original
     
     # Gemini
     GEMINI_API_KEY: str = ""
     
+    # Uploads
+    MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5 MB per file
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    BULK_UPLOAD_MAX_FILES: int = 50
+    BULK_UPLOAD_MAX_TOTAL_SIZE: int = 100 * 1024 * 1024  # 100 MB of PDFs per request (after unzipping)
+    BULK_UPLOAD_CONCURRENCY: int = 4  # files buffered and processed at once
+    
+    # Resume text cache (shared by /analysis/score and /analysis/optimize)
+    RESUME_TEXT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    RESUME_TEXT_CACHE_TTL_SECONDS: int = 900
+    
+    # Stored score results (in-process layer in front of the `analyses` table)
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: int = 3600
+    
+    # Near-duplicate JD reuse of Gemini analyses (see app/services/jd_dedup_service.py)
+    JD_DEDUP_ENABLED: bool = True
+    JD_DEDUP_THRESHOLD: float = 0.9  # estimated Jaccard similarity of word shingles
+    JD_DEDUP_SHINGLE_WORDS: int = 3
+    JD_DEDUP_NUM_PERM: int = 128  # MinHash signature length
+    JD_DEDUP_MAX_ENTRIES: int = 4096  # JDs in the LSH index and analyses kept
+    JD_DEDUP_TTL_SECONDS: int = 3600
+    
+    # Downloads
+    DOWNLOAD_CHUNK_SIZE: int = 64 * 1024
+    DOWNLOAD_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    DOWNLOAD_CACHE_MAX_FILE_SIZE: int = 2 * 1024 * 1024
+    DOWNLOAD_CACHE_TTL_SECONDS: int = 60
+    SIGNED_URL_TTL_SECONDS: int = 3600
+    
+    # Batch scoring (/analysis/score/batch)
+    BATCH_SCORING_MAX_ITEMS: int = 50
+    BATCH_SCORING_CONCURRENCY: int = 4  # per-pair Gemini calls in flight per request
+    EMBEDDING_BATCH_SIZE: int = 100  # texts per embedding API call
+    EMBEDDING_CONCURRENCY: int = 4  # embedding API calls in flight per get_embeddings call
+    
+    # Chunked embeddings (see app/services/chunking_service.py)
+    EMBEDDING_CHUNK_MAX_WORDS: int = 200
+    EMBEDDING_MAX_CHUNKS: int = 32  # per document; chunks grow beyond this instead of text being dropped
+    EMBEDDING_POOLING: str = "maxsim"  # "maxsim" (best resume chunk per JD chunk) or "mean" (weighted mean vectors)
+    
+    # Embedding store (see app/core/embedding_store.py), used by live scoring
+    EMBEDDING_STORE_CAPACITY: int = 4096  # vectors; the oldest is overwritten when full
+    EMBEDDING_STORE_DTYPE: str = "float16"  # "float16" or "int8" (per-vector scale)
+    EMBEDDING_STORE_PATH: str = ""  # memory-mapped files at this path prefix; empty keeps the store in memory
+    
+    # Requirement-to-evidence alignment (see app/services/alignment_service.py)
+    ALIGNMENT_MAX_REQUIREMENTS: int = 30
+    ALIGNMENT_MAX_EVIDENCE: int = 100
+    ALIGNMENT_MIN_SIMILARITY: float = 0.6
+    
+    # Resume optimisation (/analysis/optimize)
+    OPTIMIZE_MODE: str = "sections"  # "sections" (concurrent per-section generations) or "single"
+    OPTIMIZE_SECTION_CONCURRENCY: int = 6  # section generations in flight per request
+    OPTIMIZE_SECTION_RETRIES: int = 1  # extra attempts for each failed section
+    
+    # Live scoring (WebSocket)
+    LIVE_SCORING_DEBOUNCE_MS: int = 300
+    LIVE_MAX_CONNECTIONS: int = 64  # open live sockets per worker; they hold no admission slot while idle
+    LIVE_MAX_CONNECTIONS_PER_KEY: int = 2  # per admission key (user, guest session, guest IP); 0 disables
+    
+    # PDF Extraction (see app/services/extraction_backends.py)
+    PDF_EXTRACTION_BACKEND: str = "pypdf"
+    PDF_EXTRACTION_FALLBACKS: List[str] = ["pypdf"]
+    EXTRACTION_WORKERS: int = 4
+    
+    # Background tasks (see app/services/task_backends.py)
+    TASK_QUEUE_BACKEND: str = "memory"  # "memory" or "sqlite"
+    TASK_QUEUE_SQLITE_PATH: str = "nexus_tasks.db"
+    TASK_WORKERS: int = 4
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_RETRY_BACKOFF_SECONDS: float = 2.0
+    TASK_LEASE_SECONDS: int = 300  # a running task not finished by then is picked up again
+    TASK_POLL_INTERVAL_SECONDS: float = 1.0
+    TASK_RESULT_TTL_SECONDS: int = 3600
+    TASK_MAX_ACTIVE_PER_USER: int = 4  # queued + running tasks per user; more are refused with 429 (0 disables)
+    
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 settings = Settings()
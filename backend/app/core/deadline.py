@@ -0,0 +1,100 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+from app.core.exceptions import DeadlineExceeded
+from app.core.logging import logger, stage_timer
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """
+    Time budget of the current request, carried in a context variable.
+
+    DeadlineMiddleware starts one per HTTP request. Context variables follow
+    tasks created from the request and worker threads started with
+    run_in_threadpool, so every stage can read the remaining budget:
+    Gemini and embedding calls and PDF extraction are awaited through `run`,
+    and Supabase requests cap their HTTP timeouts with `remaining`. Optional
+    stages check `allows` and are skipped when too little time is left.
+
+    Once the response has been sent the deadline is released, so background
+    tasks that run after it (persisting results) are not cut short.
+    Outside a request (task queue workers, WebSockets) there is no deadline.
+    """
+
+    _current: ContextVar[Optional["Deadline"]] = ContextVar("request_deadline", default=None)
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.released = False
+
+    def time_left(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @classmethod
+    def start(cls, seconds: float) -> "Deadline":
+        """Sets a deadline for the current context (the tighter one wins when nested)."""
+        deadline = cls(seconds)
+        outer = cls.current()
+        if outer is not None and outer.expires_at < deadline.expires_at:
+            deadline.expires_at = outer.expires_at
+        cls._current.set(deadline)
+        return deadline
+
+    @classmethod
+    def current(cls) -> Optional["Deadline"]:
+        deadline = cls._current.get()
+        return None if deadline is None or deadline.released else deadline
+
+    @classmethod
+    def remaining(cls, default: Optional[float] = None) -> Optional[float]:
+        """Seconds left, capped at `default`; `default` when there is no deadline."""
+        deadline = cls.current()
+        if deadline is None:
+            return default
+        left = max(0.0, deadline.time_left())
+        return left if default is None else min(default, left)
+
+    @classmethod
+    def allows(cls, min_seconds: float) -> bool:
+        """True when a stage needing `min_seconds` can still finish (always, without a deadline)."""
+        deadline = cls.current()
+        return deadline is None or deadline.time_left() >= min_seconds
+
+    @classmethod
+    def check(cls, stage: str, min_seconds: float = 0.0) -> None:
+        """Raises DeadlineExceeded instead of starting a stage that cannot finish in time."""
+        if not cls.allows(max(min_seconds, 1e-3)):
+            metrics.inc(f"deadline.skipped.{stage}")
+            logger.warning("Skipping %s: %.2fs left, %.2fs needed", stage, cls.remaining(0.0), min_seconds)
+            raise DeadlineExceeded(stage)
+
+    @classmethod
+    async def run(cls, awaitable: Awaitable[T], stage: str, min_seconds: float = 0.0) -> T:
+        """
+        Awaits `awaitable` within the remaining budget.
+        Checks `min_seconds` first; on expiry the awaitable is cancelled (a worker
+        thread keeps running, but nothing waits for it) and DeadlineExceeded is raised.
+        The time spent is added to the request's stage timings.
+        """
+        try:
+            cls.check(stage, min_seconds)
+        except DeadlineExceeded:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+        timeout = cls.remaining()
+        with stage_timer(stage):
+            if timeout is None:
+                return await awaitable
+            try:
+                return await asyncio.wait_for(awaitable, timeout)
+            except asyncio.TimeoutError:
+                metrics.inc(f"deadline.exceeded.{stage}")
+                logger.warning("Deadline exceeded during %s", stage)
+                raise DeadlineExceeded(stage)
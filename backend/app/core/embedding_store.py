@@ -0,0 +1,237 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DTYPES = {"float16": np.float16, "int8": np.int8}
+_SEARCH_BLOCK_ROWS = 4096
+
+
+class EmbeddingStore:
+    """
+    Compact, array-backed store of embedding vectors.
+
+    Vectors live in one contiguous (capacity x dim) array, either float16 or int8
+    with a per-vector scale, instead of Python lists of floats (~25 KB per
+    768-dim vector). An id -> row index maps keys to offsets; per-row scale and
+    norm are kept in a float32 side array.
+
+    With `path`, the arrays are memory-mapped files (`<path>.vec`, `<path>.meta`)
+    plus a JSON index (`<path>.idx.json`) written by `flush`, so the store
+    survives restarts and only touched pages are resident. Without `path` the
+    arrays are in memory.
+
+    The store is a fixed-size ring: when full, the oldest row is overwritten.
+    `view` returns zero-copy views of the quantized row; `search` scores the
+    quantized matrix block by block without dequantizing it as a whole.
+    Keys are strings (content digests); one writer process per file.
+    """
+
+    def __init__(self, capacity: int, dtype: str = "float16", path: Optional[str] = None):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype '{dtype}' (expected one of {sorted(DTYPES)})")
+        self.capacity = capacity
+        self.dtype = dtype
+        self.path = path
+        self.dim: Optional[int] = None
+
+        self._vectors: Optional[np.ndarray] = None
+        self._meta: Optional[np.ndarray] = None  # (capacity, 2) float32: scale, norm
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._rows: Dict[str, int] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path and os.path.exists(f"{path}.idx.json"):
+            self._load()
+
+    def _allocate(self, dim: int, mode: str = "w+") -> None:
+        self.dim = dim
+        shape = (self.capacity, dim)
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._vectors = np.memmap(f"{self.path}.vec", dtype=DTYPES[self.dtype], mode=mode, shape=shape)
+            self._meta = np.memmap(f"{self.path}.meta", dtype=np.float32, mode=mode, shape=(self.capacity, 2))
+        else:
+            self._vectors = np.zeros(shape, dtype=DTYPES[self.dtype])
+            self._meta = np.zeros((self.capacity, 2), dtype=np.float32)
+
+    def _load(self) -> None:
+        with open(f"{self.path}.idx.json", "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("dtype") != self.dtype or index.get("capacity") != self.capacity or not index.get("dim"):
+            # Layout changed: start over rather than misread the files
+            return
+        self._allocate(index["dim"], mode="r+")
+        self._ids = index["ids"]
+        self._rows = {key: row for row, key in enumerate(self._ids) if key is not None}
+        self._next = index["next"]
+
+    def flush(self) -> None:
+        """Writes the memory-mapped arrays and the index to disk (no-op in memory)."""
+        if not self.path or self._vectors is None:
+            return
+        with self._lock:
+            self._vectors.flush()
+            self._meta.flush()
+            index = {"dim": self.dim, "dtype": self.dtype, "capacity": self.capacity, "next": self._next, "ids": self._ids}
+            tmp = f"{self.path}.idx.json.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp, f"{self.path}.idx.json")
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (quantized rows, scales). float16 rows have scale 1."""
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+        # Symmetric int8: the largest component maps to +-127
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def _dequantize(self, rows: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        values = rows.astype(np.float32)
+        if self.dtype == "int8":
+            values *= scales[:, None]
+        return values
+
+    def put(self, key: str, vector: Sequence[float]) -> None:
+        self.put_many([key], [vector])
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        if not keys:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self._vectors is None:
+                self._allocate(matrix.shape[1])
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {matrix.shape[1]}")
+
+            quantized, scales = self._quantize(matrix)
+            # Norms of the stored (dequantized) vectors, so cosine scores match what is stored
+            norms = np.linalg.norm(self._dequantize(quantized, scales), axis=1)
+            for key, q, scale, norm in zip(keys, quantized, scales, norms):
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._next
+                    self._next = (self._next + 1) % self.capacity
+                    evicted = self._ids[row]
+                    if evicted is not None:
+                        del self._rows[evicted]
+                        self.evictions += 1
+                    self._ids[row] = key
+                    self._rows[key] = row
+                self._vectors[row] = q
+                self._meta[row] = (scale, norm)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids = [None] * self.capacity
+            self._rows = {}
+            self._next = 0
+            if self._meta is not None:
+                self._meta[:, 1] = 0  # zero norms mark the rows empty for search
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def view(self, key: str) -> Optional[Tuple[np.ndarray, float]]:
+        """Zero-copy view of the quantized row and its scale, or None."""
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        return self._vectors[row], float(self._meta[row, 0])
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Dequantized float32 copy of one vector."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            rows = [self._rows.get(key) for key in keys]
+            found = [row for row in rows if row is not None]
+            self.hits += len(found)
+            self.misses += len(rows) - len(found)
+            if not found:
+                return [None] * len(rows)
+            values = iter(self._dequantize(self._vectors[found], self._meta[found, 0]))
+        return [next(values) if row is not None else None for row in rows]
+
+    def search(self, query: Sequence[float], k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine) for one query; see `search_many`."""
+        return self.search_many([query], k)[0]
+
+    def search_many(self, queries: Sequence[Sequence[float]], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k (id, cosine) per query, scored on the quantized rows.
+
+        Rows are read as zero-copy slices and widened one block at a time, so the
+        store is never dequantized as a whole. For int8 the query is quantized too:
+        products of int8 values sum exactly in float32, so the BLAS matmul is
+        exact integer arithmetic and the scales are applied afterwards.
+        """
+        matrix = np.asarray(queries, dtype=np.float32)
+        if self._vectors is None or not self._rows or not len(matrix):
+            return [[] for _ in range(len(matrix))]
+        q_norms = np.linalg.norm(matrix, axis=1)
+
+        if self.dtype == "int8":
+            quantized, q_scales = self._quantize(matrix)
+            operand = quantized.astype(np.float32).T
+        else:
+            operand, q_scales = matrix.T, np.ones(len(matrix), dtype=np.float32)
+
+        with self._lock:
+            used = self._used_rows()
+            scores = np.full((len(matrix), used), -np.inf, dtype=np.float32)
+            for start in range(0, used, _SEARCH_BLOCK_ROWS):
+                end = min(start + _SEARCH_BLOCK_ROWS, used)
+                dots = self._vectors[start:end].astype(np.float32) @ operand  # (rows, queries)
+                scales, norms = self._meta[start:end, 0], self._meta[start:end, 1]
+                if self.dtype == "int8":
+                    dots *= scales[:, None] * q_scales[None, :]
+                denominators = norms[:, None] * q_norms[None, :]
+                np.divide(dots, denominators, out=dots, where=denominators > 0)
+                dots[norms <= 0] = -np.inf  # empty rows
+                scores[:, start:end] = dots.T
+            ids = self._ids[:used]
+
+        results = []
+        for row_scores in scores:
+            top_k = min(k, used)
+            top = np.argpartition(-row_scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-row_scores[top])]
+            results.append([(ids[i], float(row_scores[i])) for i in top if ids[i] is not None and np.isfinite(row_scores[i])])
+        return results
+
+    def _used_rows(self) -> int:
+        """Rows written so far: the ring only wraps once it has been filled."""
+        return self.capacity if self._ids[self._next] is not None else self._next
+
+    @property
+    def size_bytes(self) -> int:
+        if self._vectors is None:
+            return 0
+        return self._vectors.nbytes + self._meta.nbytes
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._rows),
+            "capacity": self.capacity,
+            "dtype": self.dtype,
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -28,3 +28,9 @@ class ParsingError(NexusError):
     def __init__(self, detail: str):
         self.message = f"Resume parsing failed: {detail}"
         super().__init__(self.message)
+
+class DeadlineExceeded(NexusError):
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.message = f"Request deadline exceeded ({stage})"
+        super().__init__(self.message)
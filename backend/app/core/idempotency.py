@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Statuses worth retrying are never stored: the retry should run again
+_RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+    @staticmethod
+    def storable(status: int) -> bool:
+        return status < 500 and status not in _RETRYABLE_STATUSES
+
+
+@dataclass
+class PendingRequest:
+    fingerprint: str
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class IdempotencyConflict(Exception):
+    """The Idempotency-Key was already used with a different request."""
+
+
+class IdempotencyStore:
+    """
+    Responses of requests sent with an Idempotency-Key, per (caller, key).
+
+    The first request with a key owns it while it runs; duplicates arriving
+    meanwhile wait for it, and later ones get its stored response (for
+    IDEMPOTENCY_TTL_SECONDS). When the owner ends without a storable response
+    (server error, cancelled by a disconnect) the key is released and one of
+    the waiters runs the request instead. Each request is fingerprinted so a key
+    reused for a different request is refused rather than answered with the
+    wrong response.
+
+    Responses are kept per worker; a retry routed to another worker runs again.
+    """
+
+    _responses: LRUCache[StoredResponse] = LRUCache(
+        max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+        max_bytes=settings.IDEMPOTENCY_CACHE_MAX_BYTES,
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        sizeof=lambda response: len(response.body) + sum(len(k) + len(v) for k, v in response.headers)
+    )
+    _pending: Dict[Tuple[str, str, str], PendingRequest] = {}
+
+    @staticmethod
+    def fingerprint(method: str, path: str, query: bytes, body: bytes, boundary: Optional[bytes] = None) -> str:
+        """Digest of the request; the multipart boundary is random per attempt, so it is left out."""
+        if boundary:
+            body = body.replace(boundary, b"")
+        digest = hashlib.sha256(f"{method} {path}?".encode("utf-8") + query + b"\n")
+        digest.update(body)
+        return digest.hexdigest()
+
+    @classmethod
+    async def claim(
+        cls,
+        key: Tuple[str, str, str],
+        fingerprint: str,
+        wait_seconds: Optional[float]
+    ) -> Optional[StoredResponse]:
+        """
+        Returns the stored response for `key`, or None once the caller owns the key
+        (it must then call `complete` or `release`). Waits while another request
+        owns it; raises IdempotencyConflict for a different request under the same
+        key and asyncio.TimeoutError when the owner outlasts `wait_seconds`.
+        """
+        while True:
+            stored = cls._responses.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    raise IdempotencyConflict()
+                metrics.inc("idempotency.replayed")
+                return stored
+
+            pending = cls._pending.get(key)
+            if pending is None:
+                cls._pending[key] = PendingRequest(fingerprint=fingerprint)
+                return None
+            if pending.fingerprint != fingerprint:
+                raise IdempotencyConflict()
+
+            metrics.inc("idempotency.waited")
+            await asyncio.wait_for(pending.done.wait(), wait_seconds)
+
+    @classmethod
+    def complete(cls, key: Tuple[str, str, str], response: Optional[StoredResponse]) -> None:
+        """Stores the owner's response (None when it is not storable) and wakes the waiters."""
+        if response is not None:
+            cls._responses.set(key, response)
+            metrics.inc("idempotency.stored")
+        cls.release(key)
+
+    @classmethod
+    def release(cls, key: Tuple[str, str, str]) -> None:
+        pending = cls._pending.pop(key, None)
+        if pending is not None:
+            pending.done.set()
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {**cls._responses.stats(), "in_progress": len(cls._pending)}
+
+
+metrics.register("idempotency", IdempotencyStore.stats)
@@ -0,0 +1,98 @@
+import json
+import re
+from typing import Any, List, Tuple
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_MAX_CUT_ATTEMPTS = 64
+
+
+def loads_tolerant(text: str) -> Tuple[Any, bool]:
+    """
+    Parses model output as JSON, repairing what is recoverable.
+
+    Returns (value, repaired). Handles Markdown code fences, prose around the
+    JSON, trailing commas and output truncated mid-document: the open arrays
+    and objects are closed after the last complete member. A member cut off
+    mid-value (an open string, a partial number or literal) is dropped rather
+    than completed, so "Pyth" never becomes a keyword. Raises ValueError when
+    nothing parses.
+    """
+    try:
+        return json.loads(text), False
+    except (TypeError, json.JSONDecodeError):
+        pass
+
+    candidate = _FENCE.sub("", text or "")
+    starts = [i for i in (candidate.find("{"), candidate.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array in model output")
+    candidate, stack, in_string, end, cuts = _scan(candidate[min(starts):])
+    if end > 0:
+        # Complete root value, possibly followed by prose ('{...} Hope this helps!')
+        try:
+            return json.loads(candidate[:end]), True
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Unrecoverable JSON in model output: {e}") from e
+
+    # Truncated right after a complete string or container: close every open bracket
+    if not in_string and candidate.rstrip()[-1:] in ('"', "]", "}"):
+        try:
+            return json.loads(candidate + "".join(reversed(stack))), True
+        except json.JSONDecodeError:
+            pass
+
+    # Cut back to the last complete member (drops a partial string, key, literal or number)
+    for index, open_brackets in reversed(cuts[-_MAX_CUT_ATTEMPTS:]):
+        try:
+            return json.loads(candidate[:index] + "".join(reversed(open_brackets))), True
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("Unrecoverable JSON in model output")
+
+
+def _scan(text: str) -> Tuple[str, List[str], bool, int, List[Tuple[int, List[str]]]]:
+    """
+    Walks the text once, outside strings tracking open brackets and dropping
+    trailing commas (a comma followed only by whitespace and a closer).
+    Returns (the text without trailing commas, closers still open, ends inside
+    a string, index just past the root value or -1, cut points). Indexes refer
+    to the returned text. A cut point is a prefix length that ends right after
+    an opening bracket or right before a separating comma, with the closers
+    open at that point.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, List[str]]] = []
+    in_string = escaped = False
+    comma_at = -1  # index in `out` of the last comma outside strings, until another token follows
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char.isspace():
+            pass
+        else:
+            if char in "}]" and comma_at >= 0:
+                # Trailing comma: only whitespace separates it from the closer
+                del out[comma_at]
+            comma_at = -1
+            i = len(out)
+            if char == '"':
+                in_string = True
+            elif char in "{[":
+                stack.append("}" if char == "{" else "]")
+                cuts.append((i + 1, list(stack)))
+            elif char in "}]" and stack:
+                stack.pop()
+                if not stack:
+                    out.append(char)
+                    return "".join(out), stack, False, i + 1, cuts
+            elif char == "," and stack:
+                cuts.append((i, list(stack)))
+                comma_at = i
+        out.append(char)
+    return "".join(out), stack, in_string, -1, cuts
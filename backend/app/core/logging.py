@@ -1,17 +1,200 @@
+"""
+Logging setup: records are queued by the caller and written by a background thread.
+
+- `logger.info("Sent %d bytes", size)`: use %-style arguments, not f-strings.
+  The message is only built if the record passes the level and sampling
+  checks, and then on the writer thread. Pass values that will not change
+  afterwards (ints, strings), since the arguments are read later.
+- Every record carries the current request id (RequestContextMiddleware sets
+  it per HTTP request, from X-Request-ID when the client sends one).
+- `stage_timer(name)` adds a stage's wall time to the request; the request's
+  summary line lists the time per stage.
+- INFO records can be sampled per request (LOG_INFO_SAMPLE_RATE, or per
+  message template in LOG_SAMPLE_RATES). The draw follows the request id, so
+  a request keeps or drops its sampled records together and the ones kept
+  stay readable. Warnings and errors are always kept.
+- Output is one JSON object per line (LOG_FORMAT="json") or plain text.
+"""
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Any
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Configure logging format (LOG_FORMAT="text")
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Per request: stage -> [total seconds, calls]. Shared (not copied) by the tasks a request starts.
+_stage_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("stage_timings", default=None)
+
+# LogRecord attributes that are not `extra` fields
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Logging context of one request (request id and stage timings); yields the request id."""
+    request_id = request_id or uuid.uuid4().hex
+    id_token = _request_id.set(request_id)
+    timings_token = _stage_timings.set({})
+    try:
+        yield request_id
+    finally:
+        _stage_timings.reset(timings_token)
+        _request_id.reset(id_token)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Adds the wall time of the block to the current request's `stage` timing (no-op outside a request)."""
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = timings.setdefault(stage, [0.0, 0])
+        entry[0] += time.perf_counter() - started
+        entry[1] += 1
+
+
+def stage_timings() -> Dict[str, Dict[str, float]]:
+    """The current request's stage timings: stage -> {"ms": total, "calls": count}."""
+    timings = _stage_timings.get() or {}
+    return {
+        stage: {"ms": round(seconds * 1000, 1), "calls": int(calls)}
+        for stage, (seconds, calls) in timings.items()
+    }
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps every WARNING and above; keeps INFO and below at the configured rate.
+    Inside a request the decision is derived from the request id, so the same
+    request keeps or drops all its records of a given template together.
+    """
+
+    def __init__(self, default_rate: float, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg, self.default_rate) if isinstance(record.msg, str) else self.default_rate
+        if rate >= 1:
+            return True
+        if rate <= 0:
+            return False
+        request_id = _request_id.get()
+        draw = (zlib.crc32(request_id.encode("ascii", "ignore")) % 10000) / 10000 if request_id else random.random()
+        if draw < rate:
+            return True
+        metrics.inc("logging.sampled_out")
+        return False
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts records on the queue without formatting them: the caller only pays
+    for the record and the request id lookup. A full queue drops the record
+    instead of blocking the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = _request_id.get()
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference live frames; render them while they are still accurate
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("logging.dropped")
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request id and `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
 
-# Configure logging format
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
 def setup_logging():
-    logging.basicConfig(
-        level=logging.INFO,
-        format=LOG_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    """Routes the `nexus` logger (and the root logger) through the queue; idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JSONFormatter() if settings.LOG_FORMAT == "json" else _TextFormatter(LOG_FORMAT))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = ContextQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(settings.LOG_INFO_SAMPLE_RATE, settings.LOG_SAMPLE_RATES))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    metrics.register("logging", lambda: {"queued": log_queue.qsize(), "capacity": settings.LOG_QUEUE_SIZE})
+
+
+def shutdown_logging():
+    """Writes out the queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 logger = logging.getLogger("nexus")
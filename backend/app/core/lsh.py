@@ -0,0 +1,124 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """
+    MinHash signatures of string sets, vectorised over permutations.
+
+    Shingles are hashed to 32 bits with a stable hash (blake2b, not Python's
+    salted `hash`), so signatures agree across processes and restarts. The
+    fraction of equal signature slots estimates the Jaccard similarity.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # (a * x + b) mod p with a, b, x < 2^32 never overflows uint64
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+
+    def signature(self, shingles: Iterable[str]) -> Optional[np.ndarray]:
+        """uint64 signature of `num_perm` slots, or None for an empty set."""
+        values = np.fromiter({self._hash(s) for s in shingles}, dtype=np.uint64)
+        if not len(values):
+            return None
+        permuted = (values[:, None] * self._a[None, :] + self._b[None, :]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.mean(first == second))
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows <= num_perm minimising the false positive plus
+    false negative probability mass around `threshold` (the LSH S-curve).
+    """
+    points = np.linspace(0.0, 1.0, 201)
+    best: Tuple[float, int, int] = (float("inf"), 1, num_perm)
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1 - (1 - points ** rows) ** bands
+        # Riemann sums over [0, threshold) and [threshold, 1]
+        false_positive = np.where(points < threshold, candidate, 0.0).mean()
+        false_negative = np.where(points >= threshold, 1 - candidate, 0.0).mean()
+        error = false_positive + false_negative
+        if error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    Thread-safe banded LSH index over MinHash signatures.
+
+    Each signature is cut into `bands` bands of `rows` slots; keys sharing any
+    band are candidates, which `query` then checks against `threshold` with the
+    full-signature estimate. Bounded by `max_entries` (oldest key evicted first).
+    """
+
+    def __init__(self, threshold: float, num_perm: int, max_entries: int = 4096):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.max_entries = max_entries
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        self._signatures: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        with self._lock:
+            if key in self._signatures:
+                self._signatures.move_to_end(key)
+                return
+            self._signatures[key] = signature
+            for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+                bucket.setdefault(band_key, set()).add(key)
+            while len(self._signatures) > self.max_entries:
+                self._remove(next(iter(self._signatures)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        signature = self._signatures.pop(key)
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            keys = bucket.get(band_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del bucket[band_key]
+
+    def query(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Keys whose estimated similarity is at least `threshold`, most similar first."""
+        with self._lock:
+            candidates: Set[str] = set()
+            for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+                candidates |= bucket.get(band_key, set())
+            scored = [(key, MinHasher.similarity(signature, self._signatures[key])) for key in candidates]
+        return sorted(
+            ((key, similarity) for key, similarity in scored if similarity >= self.threshold),
+            key=lambda item: -item[1]
+        )
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,44 @@
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process metrics: counters, gauges and collectors.
+    Collectors are callables evaluated at snapshot time (pool sizes, cache stats, ...).
+    Exposed as JSON on GET /metrics.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def register(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data: Dict[str, Any] = {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+        for name, collector in self._collectors.items():
+            try:
+                data[name] = collector()
+            except Exception as e:
+                data[name] = {"error": str(e)}
+        return data
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,425 @@
+import asyncio
+import re
+import time
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import client_ip
+from app.core.deadline import Deadline
+from app.core.idempotency import IdempotencyConflict, IdempotencyStore, StoredResponse
+from app.core.logging import logger, request_context, stage_timings
+from app.core.metrics import metrics
+from app.core.security import verify_guest_session, verify_token
+
+_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]+")
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies above `max_body_size` for the given path suffixes.
+
+    The multipart body is parsed (and spooled) by Starlette before the endpoint
+    runs, so the limit has to be enforced here to stop a huge upload early:
+    - A declared Content-Length over the limit is refused before reading anything.
+    - Chunked/undeclared bodies are counted as they arrive and aborted on overflow.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_suffixes: Iterable[str]):
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_suffixes = tuple(path_suffixes)
+
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Request body too large."
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].rstrip("/").endswith(self.path_suffixes):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > self.max_body_size:
+                    response = JSONResponse(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        content={"detail": "Request body too large."}
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    # Raised inside the route's body parsing; FastAPI re-raises
+                    # HTTPException untouched so the client gets a 413.
+                    raise self._too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class DeadlineMiddleware:
+    """
+    Gives every HTTP request a deadline and cancels its handler when the client goes away.
+
+    The budget is the longest matching suffix in `route_seconds` (0 disables the
+    deadline for that route) or `default_seconds`; see app/core/deadline.py for
+    how stages use it.
+
+    Disconnects are only visible on `receive`, so once the request body has been
+    read a watcher keeps reading it: an `http.disconnect` before the response is
+    complete cancels the handler task, which cancels in-flight Gemini,
+    embedding and Supabase awaits instead of paying for work nobody will read.
+    The handler still sees the disconnect on its own `receive` calls (streaming
+    responses rely on that).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_seconds: float,
+        route_seconds: Optional[Dict[str, float]] = None,
+        cancel_on_disconnect: bool = True
+    ):
+        self.app = app
+        self.default_seconds = default_seconds
+        # Longest suffix first, so "/score/batch" is not taken for "/score"
+        self.route_seconds = sorted((route_seconds or {}).items(), key=lambda item: -len(item[0]))
+        self.cancel_on_disconnect = cancel_on_disconnect
+
+    def _budget(self, path: str) -> float:
+        path = path.rstrip("/")
+        for suffix, seconds in self.route_seconds:
+            if path.endswith(suffix.rstrip("/")):
+                return seconds
+        return self.default_seconds
+
+    @staticmethod
+    def _has_body(scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"transfer-encoding" or (name == b"content-length" and value.strip() not in (b"", b"0")):
+                return True
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seconds = self._budget(scope["path"])
+        deadline: Optional[Deadline] = None
+        disconnected = asyncio.Event()
+        response_done = False
+        watcher: Optional[asyncio.Task] = None
+        handler: Optional[asyncio.Task] = None
+        early: "asyncio.Queue[Message]" = asyncio.Queue()
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    if self.cancel_on_disconnect and not response_done and handler is not None and not handler.done():
+                        metrics.inc("requests.cancelled_on_disconnect")
+                        logger.info("Client disconnected, cancelling %s %s", scope["method"], scope["path"])
+                        handler.cancel()
+                    return
+                await early.put(message)
+
+        def start_watcher() -> None:
+            nonlocal watcher
+            if watcher is None:
+                watcher = asyncio.create_task(watch())
+
+        async def watched_receive() -> Message:
+            if watcher is not None:
+                # The watcher owns the client's receive channel now
+                if not early.empty():
+                    return early.get_nowait()
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                start_watcher()
+            return message
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_done
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+                if deadline is not None:
+                    # Background tasks run after this in the same context
+                    deadline.released = True
+
+        async def run_handler() -> None:
+            nonlocal deadline
+            # Set inside the handler task, so the deadline never outlives this request's context
+            if seconds > 0:
+                deadline = Deadline.start(seconds)
+            await self.app(scope, watched_receive, tracked_send)
+
+        if not self._has_body(scope):
+            start_watcher()
+        handler = asyncio.create_task(run_handler())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set() or response_done:
+                raise
+        finally:
+            if not handler.done():
+                handler.cancel()
+            if watcher is not None and not watcher.done():
+                watcher.cancel()
+
+
+class IdempotencyMiddleware:
+    """
+    Honours the `Idempotency-Key` header on the given POST path suffixes.
+
+    Requests are scoped to the caller (signed-in user, guest session, or client
+    IP for callers with neither) so keys never collide between users. The first
+    request with a key runs normally and its response is stored; duplicates get
+    that response, replayed with `Idempotent-Replayed: true`, without running
+    the endpoint again. See app/core/idempotency.py for waiting and expiry.
+
+    The body is buffered to fingerprint the request, so this must sit inside
+    BodySizeLimitMiddleware.
+    """
+
+    MAX_KEY_LENGTH = 255
+
+    def __init__(self, app: ASGIApp, path_suffixes: Iterable[str], max_response_bytes: int, wait_seconds: float):
+        self.app = app
+        self.path_suffixes = tuple(suffix.rstrip("/") for suffix in path_suffixes)
+        self.max_response_bytes = max_response_bytes
+        self.wait_seconds = wait_seconds
+
+    @staticmethod
+    def _caller(request: Request) -> Optional[str]:
+        """Same precedence as get_current_user; None for a bearer token that does not verify."""
+        session_id = request.headers.get("x-session-id")
+        if session_id:
+            guest_id = verify_guest_session(session_id)
+            if guest_id is not None:
+                return f"guest:{guest_id}"
+        authorization = request.headers.get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                return f"user:{verify_token(token.strip())}"
+            except HTTPException:
+                return None
+        return f"ip:{client_ip(request)}"
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> Optional[bytes]:
+        """The whole request body; None when the client disconnects first."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _send_stored(stored: StoredResponse, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].rstrip("/").endswith(self.path_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        idempotency_key = request.headers.get("idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not idempotency_key or len(idempotency_key) > self.MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": f"Idempotency-Key must be 1 to {self.MAX_KEY_LENGTH} characters."}
+            )
+            await response(scope, receive, send)
+            return
+
+        caller = self._caller(request)
+        if caller is None:
+            # Invalid credentials: let the endpoint answer 401
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            body = await self._read_body(receive)
+        except HTTPException as e:
+            # Raised by BodySizeLimitMiddleware's receive, outside FastAPI's handlers
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await response(scope, receive, send)
+            return
+        if body is None:
+            return
+
+        boundary = None
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/"):
+            boundary = content_type.partition("boundary=")[2].strip('"').encode("latin-1") or None
+        fingerprint = IdempotencyStore.fingerprint(
+            scope["method"], scope["path"], scope.get("query_string", b""), body, boundary
+        )
+        key = (caller, scope["path"], idempotency_key)
+
+        try:
+            stored = await IdempotencyStore.claim(key, fingerprint, Deadline.remaining(self.wait_seconds))
+        except IdempotencyConflict:
+            metrics.inc("idempotency.conflicts")
+            response = JSONResponse(
+                status_code=422,  # constant renamed across Starlette versions
+                content={"detail": "Idempotency-Key was already used with a different request."}
+            )
+            await response(scope, receive, send)
+            return
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                content={"detail": "A request with this Idempotency-Key is still in progress."},
+                headers={"Retry-After": "5"}
+            )
+            await response(scope, receive, send)
+            return
+        if stored is not None:
+            await self._send_stored(stored, send)
+            return
+
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start: Optional[Message] = None
+        chunks = []
+        size = 0
+        completed = False
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal start, size, completed
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and start is not None and not completed:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size <= self.max_response_bytes:
+                    chunks.append(chunk)
+                if not message.get("more_body", False):
+                    # Waiters are woken as soon as the response is complete, not after background tasks
+                    completed = True
+                    stored_response = None
+                    if StoredResponse.storable(start["status"]) and size <= self.max_response_bytes:
+                        stored_response = StoredResponse(
+                            fingerprint=fingerprint,
+                            status=start["status"],
+                            headers=list(start.get("headers", [])),
+                            body=b"".join(chunks)
+                        )
+                    IdempotencyStore.complete(key, stored_response)
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capturing_send)
+        finally:
+            if not completed:
+                IdempotencyStore.release(key)
+
+
+class RequestContextMiddleware:
+    """
+    Gives every HTTP request a correlation id and logs one summary line for it.
+
+    The id is taken from a well-formed X-Request-ID request header (so ids can
+    be followed across services) or generated, returned in the X-Request-ID
+    response header and attached to every log record of the request. The
+    summary line carries the status, total duration and time per stage (see
+    `stage_timer` in app/core/logging.py).
+    """
+
+    MAX_ID_LENGTH = 128
+
+    def __init__(self, app: ASGIApp, log_requests: bool = True):
+        self.app = app
+        self.log_requests = log_requests
+
+    @classmethod
+    def _incoming_id(cls, scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1").strip()
+                if 0 < len(candidate) <= cls.MAX_ID_LENGTH and _REQUEST_ID.fullmatch(candidate):
+                    return candidate
+                return None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_context(self._incoming_id(scope)) as request_id:
+            started = time.perf_counter()
+            status_code = 500  # reported when the handler fails before responding
+
+            async def send_with_id(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                if self.log_requests:
+                    logger.info(
+                        "%s %s %d",
+                        scope["method"],
+                        scope["path"],
+                        status_code,
+                        extra={
+                            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                            "stages": stage_timings(),
+                        }
+                    )
@@ -1,32 +1,122 @@
-from fastapi import Depends, HTTPException, status, Header
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+import uuid
+from fastapi import Depends, HTTPException, status, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import metrics
 from typing import Optional
 
 # Define the security scheme
 security = HTTPBearer(auto_error=False) # Make it optional
 
+# Verified tokens -> user id. Keyed by a digest so raw tokens are never held as keys;
+# each entry expires at the token's `exp`.
+_verified_tokens: LRUCache[str] = LRUCache(max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
+_cache_secret: Optional[str] = None  # secret the cached entries were verified with
+
+metrics.register("auth_cache", _verified_tokens.stats)
+
+# Used only when neither GUEST_SESSION_SECRET nor SUPABASE_JWT_SECRET is set:
+# guest sessions then last as long as this process.
+_process_guest_secret = secrets.token_bytes(32)
+
+def check_guest_secret() -> None:
+    """Logs an error at startup when guest sessions would be signed with the per-process key."""
+    if not (settings.GUEST_SESSION_SECRET or settings.SUPABASE_JWT_SECRET):
+        logger.error(
+            "Neither GUEST_SESSION_SECRET nor SUPABASE_JWT_SECRET is set: guest sessions are signed "
+            "with a random per-process key, so they are rejected by other workers and lost on restart"
+        )
+
 def get_current_user(
+    response: Response,
     x_session_id: Optional[str] = Header(None, alias="X-Session-ID"),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> str:
     """
     Returns the user ID. 
-    Prioritizes X-Session-ID (for no-login mode).
+    Prioritizes a signed X-Session-ID (for no-login mode).
     Falls back to JWT validation.
+    
+    Requests with neither (or with an unsigned/forged session id) get a new guest
+    id; its signed form is returned in the X-Session-ID response header and must
+    be sent back to keep the same identity.
     """
     if x_session_id:
-        return x_session_id
+        guest_id = verify_guest_session(x_session_id)
+        if guest_id is not None:
+            return guest_id
+        metrics.inc("guest_sessions.rejected")
+
+    if credentials:
+        return verify_token(credentials.credentials)
+
+    guest_id = str(uuid.uuid4())
+    response.headers["X-Session-ID"] = sign_guest_session(guest_id)
+    metrics.inc("guest_sessions.issued")
+    return guest_id
+
+def _guest_signature(guest_id: str) -> str:
+    secret = settings.GUEST_SESSION_SECRET or settings.SUPABASE_JWT_SECRET
+    key = secret.encode("utf-8") if secret else _process_guest_secret
+    digest = hmac.new(key, f"guest:{guest_id}".encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
 
-    if not credentials:
-        # Fallback to ephemeral guest ID if no session/auth provided
-        import uuid
-        return str(uuid.uuid4())
+def sign_guest_session(guest_id: str) -> str:
+    """Signed, stable session id for a guest: `<guest uuid>.<HMAC-SHA256>`."""
+    return f"{guest_id}.{_guest_signature(guest_id)}"
 
-    token = credentials.credentials
+def verify_guest_session(session_id: str) -> Optional[str]:
+    """Returns the guest id of a correctly signed session id, else None."""
+    guest_id, _, signature = session_id.partition(".")
+    try:
+        guest_id = str(uuid.UUID(guest_id))
+    except ValueError:
+        return None
+    if not hmac.compare_digest(signature, _guest_signature(guest_id)):
+        return None
+    return guest_id
+
+def _check_secret_rotation() -> None:
+    """Drops every cached verification when SUPABASE_JWT_SECRET changes."""
+    global _cache_secret
+    if settings.SUPABASE_JWT_SECRET != _cache_secret:
+        if _cache_secret is not None:
+            logger.info("JWT secret changed; clearing verified token cache")
+        _verified_tokens.clear()
+        _cache_secret = settings.SUPABASE_JWT_SECRET
+
+def verify_token(token: str) -> str:
+    """
+    Validates a Supabase JWT and returns its user ID (`sub`).
+    Raises HTTPException(401) if the token is invalid.
     
+    Successful verifications are cached until the token's `exp` (capped at
+    AUTH_CACHE_MAX_TTL_SECONDS), so repeat requests skip the HMAC check and claim validation.
+    """
+    _check_secret_rotation()
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    user_id = _verified_tokens.get(key)
+    if user_id is not None:
+        return user_id
+
+    user_id, exp = _decode_token(token)
+    ttl = settings.AUTH_CACHE_MAX_TTL_SECONDS
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _verified_tokens.set(key, user_id, ttl_seconds=ttl)
+    return user_id
+
+def _decode_token(token: str) -> tuple[str, Optional[float]]:
+    """Full verification: signature, audience and time claims. Returns (user_id, exp)."""
     try:
         if not settings.SUPABASE_JWT_SECRET:
              logger.error("SUPABASE_JWT_SECRET is not set!")
@@ -45,8 +135,11 @@ def get_current_user(
                 detail="Token payload invalid: missing user_id"
             )
             
-        return user_id
+        exp = payload.get("exp")
+        return user_id, float(exp) if exp is not None else None
         
+    except HTTPException:
+        raise
     except JWTError as e:
         logger.warning(f"JWT Validation Error: {str(e)}")
         raise HTTPException(
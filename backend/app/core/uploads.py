@@ -0,0 +1,122 @@
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile, HTTPException, status
+
+# PDF files start with "%PDF-", although the spec tolerates leading garbage
+# in the first kilobyte (some generators emit a BOM or whitespace first).
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+
+DEFAULT_CHUNK_SIZE = 64 * 1024  # 64 KB
+
+
+@dataclass
+class SpooledUpload:
+    """
+    A validated upload held in a bounded spooled buffer.
+    The stream is rewound and ready to be consumed by storage and extraction.
+    """
+    stream: BinaryIO
+    size: int
+    filename: str
+
+    def rewind(self) -> BinaryIO:
+        self.stream.seek(0)
+        return self.stream
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def is_pdf_header(chunk: bytes) -> bool:
+    return PDF_MAGIC in chunk[:PDF_MAGIC_WINDOW]
+
+
+class _Spooler:
+    """Chunk-by-chunk validation shared by the async (UploadFile) and sync (archive member) readers."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.buffer = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        if self.size == 0 and not is_pdf_header(chunk):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid file content. The uploaded file is not a PDF."
+            )
+
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum size is {self.max_size // (1024 * 1024)}MB."
+            )
+
+        self.buffer.write(chunk)
+
+    def finish(self, filename: str) -> SpooledUpload:
+        if self.size == 0:
+            self.buffer.close()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded file is empty."
+            )
+
+        self.buffer.seek(0)
+        return SpooledUpload(stream=self.buffer, size=self.size, filename=filename)
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> SpooledUpload:
+    """
+    Reads an UploadFile chunk by chunk into a SpooledTemporaryFile.
+
+    - Rejects the upload with 400 if the first chunk is not a PDF.
+    - Aborts with 413 as soon as more than `max_size` bytes have been read,
+      so oversized files are never fully buffered.
+    - The spool threshold equals `max_size`, so an accepted file always stays in memory.
+    """
+    spooler = _Spooler(max_size)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            spooler.write(chunk)
+    except BaseException:
+        spooler.buffer.close()
+        raise
+
+    return spooler.finish(file.filename or "resume.pdf")
+
+
+def spool_stream(
+    stream: BinaryIO,
+    filename: str,
+    max_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> SpooledUpload:
+    """
+    Blocking counterpart of `spool_upload` for file-like sources such as ZIP members.
+    The size is counted on the bytes actually read, never on declared sizes,
+    so a member that decompresses past `max_size` is cut off.
+    """
+    spooler = _Spooler(max_size)
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            spooler.write(chunk)
+    except BaseException:
+        spooler.buffer.close()
+        raise
+
+    return spooler.finish(filename)
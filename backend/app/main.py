@@ -1,18 +1,64 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.logging import setup_logging, logger
-from app.core.exceptions import NexusError, ResourceNotFound, AuthError
+from app.core.exceptions import NexusError, ResourceNotFound, AuthError, DeadlineExceeded
+from app.core.middleware import BodySizeLimitMiddleware, DeadlineMiddleware, IdempotencyMiddleware, RequestContextMiddleware
+from app.core.metrics import metrics
+from app.core.security import check_guest_secret
 from app.api.v1.api import api_router
+from app.services.guest_storage_service import GuestStorageService
+from app.services.live_scoring_service import LiveScoringService
+from app.services.task_queue_service import TaskQueueService
 
 # Initialize logging
 setup_logging()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Guest sessions only survive restarts and span workers with a configured secret
+    check_guest_secret()
+    # Background task workers (see app/services/task_queue_service.py)
+    await TaskQueueService.start()
+    # Expiry of guest uploads (see app/services/guest_storage_service.py)
+    await GuestStorageService.start()
+    yield
+    await GuestStorageService.stop()
+    await TaskQueueService.stop()
+    LiveScoringService.flush()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
+)
+
+# Idempotency-Key replay for the expensive POSTs. Added first so it runs inside
+# the body size limits (it buffers the body) and CORS (replays get CORS headers).
+app.add_middleware(
+    IdempotencyMiddleware,
+    path_suffixes=settings.IDEMPOTENCY_PATHS,
+    max_response_bytes=settings.IDEMPOTENCY_MAX_RESPONSE_BYTES,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+)
+
+# Upload size guard: stop oversized multipart bodies before they are spooled.
+# Added before CORS so their 413 responses still carry the CORS headers.
+# The slack covers multipart boundaries and part headers.
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.MAX_UPLOAD_SIZE + 64 * 1024,
+    path_suffixes=["/resumes/upload_resume"],
+)
+# Bulk uploads are checked on the wire (compressed) size; uncompressed limits are enforced per member
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.BULK_UPLOAD_MAX_TOTAL_SIZE + 1024 * 1024,
+    path_suffixes=["/resumes/bulk_upload"],
 )
 
 # CORS
@@ -22,19 +68,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Analysis-Cache", "X-Session-ID", "Retry-After", "Idempotent-Replayed", "X-Request-ID"],
 )
 
+# Per-route deadlines, propagated to AI, embedding, Supabase and extraction calls;
+# a client disconnect cancels the in-flight handler
+app.add_middleware(
+    DeadlineMiddleware,
+    default_seconds=settings.REQUEST_DEADLINE_SECONDS,
+    route_seconds=settings.ROUTE_DEADLINES,
+    cancel_on_disconnect=settings.CANCEL_ON_DISCONNECT,
+)
+
+# Outermost: correlation id and stage timings cover every other middleware
+app.add_middleware(RequestContextMiddleware, log_requests=settings.LOG_REQUESTS)
+
 # Global Error Handler
 @app.exception_handler(NexusError)
 async def nexus_exception_handler(request: Request, exc: NexusError):
     # Ensure message attribute exists, fallback to string representation if needed
     error_msg = getattr(exc, 'message', str(exc))
-    logger.error(f"NexusError: {error_msg}")
+    logger.error("NexusError: %s", error_msg)
     status_code = 500
     if isinstance(exc, ResourceNotFound):
         status_code = 404
     elif isinstance(exc, AuthError):
         status_code = 401
+    elif isinstance(exc, DeadlineExceeded):
+        status_code = 504
     
     return JSONResponse(
         status_code=status_code,
@@ -43,7 +104,7 @@ async def nexus_exception_handler(request: Request, exc: NexusError):
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled Exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled Exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={"error": "Internal Server Error"}
@@ -56,6 +117,13 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 async def health_check():
     return {"status": "healthy", "version": "0.1.0"}
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """
+    In-process metrics (connection pools, caches, counters) for this worker.
+    """
+    return metrics.snapshot()
+
 @app.get("/api/v1/debug")
 async def debug_endpoint():
     """
@@ -65,12 +133,19 @@ async def debug_endpoint():
     import sys
     import os
     
+    from app.services.extraction_backends import BACKENDS, get_backend_chain
+
     # Check dependencies
     try:
         import pypdf
         pypdf_status = "installed"
     except ImportError:
         pypdf_status = "missing"
+
+    extraction_backends = {
+        name: ("installed" if backend_cls.is_available() else "missing")
+        for name, backend_cls in BACKENDS.items()
+    }
         
     return {
         "status": "online",
@@ -85,5 +160,9 @@ async def debug_endpoint():
         },
         "dependencies": {
             "pypdf": pypdf_status
+        },
+        "extraction": {
+            "backends": extraction_backends,
+            "chain": [backend.name for backend in get_backend_chain()]
         }
     }
@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from supabase import AsyncClient
+from app.repositories.base import get_db
+
+
+class AnalysisRepository:
+    TABLE = "analyses"
+    KEYWORD_GAPS_TABLE = "keyword_gaps"
+    SUGGESTIONS_TABLE = "rewrite_suggestions"
+
+    @staticmethod
+    async def get(
+        user_id: str,
+        analysis_id: UUID | str,
+        columns: str = "*",
+        client: Optional[AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+        db = await get_db(client)
+        response = await db.table(AnalysisRepository.TABLE)\
+            .select(columns)\
+            .eq("id", str(analysis_id))\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    async def find_latest(
+        user_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        scoring_version: int,
+        columns: str = "*",
+        client: Optional[AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Most recent analysis of this exact resume/JD pair (idx_analyses_lookup)."""
+        db = await get_db(client)
+        response = await db.table(AnalysisRepository.TABLE)\
+            .select(columns)\
+            .eq("user_id", user_id)\
+            .eq("resume_hash", resume_hash)\
+            .eq("jd_hash", jd_hash)\
+            .eq("scoring_version", scoring_version)\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    async def create(values: Dict[str, Any], client: Optional[AsyncClient] = None) -> Dict[str, Any]:
+        db = await get_db(client)
+        response = await db.table(AnalysisRepository.TABLE).insert(values).execute()
+        return response.data[0]
+
+    @staticmethod
+    async def add_keyword_gaps(rows: List[Dict[str, Any]], client: Optional[AsyncClient] = None) -> None:
+        """Inserts all rows in a single request."""
+        if not rows:
+            return
+        db = await get_db(client)
+        await db.table(AnalysisRepository.KEYWORD_GAPS_TABLE).insert(rows).execute()
+
+    @staticmethod
+    async def add_rewrite_suggestions(rows: List[Dict[str, Any]], client: Optional[AsyncClient] = None) -> None:
+        """Inserts all rows in a single request."""
+        if not rows:
+            return
+        db = await get_db(client)
+        await db.table(AnalysisRepository.SUGGESTIONS_TABLE).insert(rows).execute()
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from supabase import AsyncClient
+from app.clients.supabase import AsyncSupabaseClient
+from app.core.exceptions import StorageError
+
+
+async def get_db(client: Optional[AsyncClient] = None) -> AsyncClient:
+    """Returns the given (scoped) client or the shared service client."""
+    client = client or await AsyncSupabaseClient.get_client()
+    if client is None:
+        raise StorageError("Supabase client is not configured")
+    return client
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from supabase import AsyncClient
+from app.repositories.base import get_db
+
+
+class JobDescriptionRepository:
+    TABLE = "job_descriptions"
+
+    @staticmethod
+    async def get(
+        user_id: str,
+        job_description_id: UUID | str,
+        columns: str = "*",
+        client: Optional[AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+        db = await get_db(client)
+        response = await db.table(JobDescriptionRepository.TABLE)\
+            .select(columns)\
+            .eq("id", str(job_description_id))\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    async def list_for_user(
+        user_id: str,
+        status: Optional[str] = None,
+        columns: str = "*",
+        client: Optional[AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
+        db = await get_db(client)
+        query = db.table(JobDescriptionRepository.TABLE).select(columns).eq("user_id", user_id)
+        if status:
+            query = query.eq("status", status)
+        response = await query.execute()
+        return response.data or []
+
+    @staticmethod
+    async def create(values: Dict[str, Any], client: Optional[AsyncClient] = None) -> Dict[str, Any]:
+        db = await get_db(client)
+        response = await db.table(JobDescriptionRepository.TABLE).insert(values).execute()
+        return response.data[0]
+
+    @staticmethod
+    async def update(
+        user_id: str,
+        job_description_id: UUID | str,
+        values: Dict[str, Any],
+        client: Optional[AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+        db = await get_db(client)
+        response = await db.table(JobDescriptionRepository.TABLE)\
+            .update(values)\
+            .eq("id", str(job_description_id))\
+            .eq("user_id", user_id)\
+            .execute()
+        return response.data[0] if response.data else None
@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import NexusError, ResourceNotFound
+from app.core.metrics import metrics
+from app.repositories.resumes import ResumeRepository
+
+
+@dataclass
+class ResumeText:
+    raw_text: str
+    parsed_content: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def size_bytes(self) -> int:
+        # parsed_content is roughly the same size again (sections repeat the lines)
+        return 2 * len(self.raw_text.encode("utf-8"))
+
+
+class ResumeTextRepository:
+    """
+    Read-through cache of a resume's text and parse, keyed by (user_id, resume_id).
+    Bounded by bytes, since a handful of long resumes can outweigh hundreds of short ones.
+    """
+    _cache: LRUCache[ResumeText] = LRUCache(
+        max_entries=4096,
+        max_bytes=settings.RESUME_TEXT_CACHE_MAX_BYTES,
+        ttl_seconds=settings.RESUME_TEXT_CACHE_TTL_SECONDS,
+        sizeof=lambda entry: entry.size_bytes
+    )
+    # Concurrent misses for the same key share one query
+    _inflight: Dict[Tuple[str, str], "asyncio.Task[ResumeText]"] = {}
+
+    @staticmethod
+    async def get(user_id: str, resume_id: UUID | str) -> ResumeText:
+        """
+        Raises ResourceNotFound if the resume does not exist for this user,
+        NexusError if it has no extracted text yet.
+        """
+        key = (user_id, str(resume_id))
+        cached = ResumeTextRepository._cache.get(key)
+        if cached is not None:
+            metrics.inc("resume_text_cache.hits")
+            return cached
+
+        load = ResumeTextRepository._inflight.get(key)
+        if load is None:
+            metrics.inc("resume_text_cache.misses")
+            # The query runs as its own task in a fresh context: no caller owns it, so a
+            # cancelled request (client disconnect) or its deadline cannot fail the others
+            load = asyncio.get_running_loop().create_task(
+                ResumeTextRepository._load(key, resume_id), context=contextvars.Context()
+            )
+            ResumeTextRepository._inflight[key] = load
+            load.add_done_callback(lambda task: ResumeTextRepository._loaded(key, task))
+
+        # Each caller waits within its own deadline; leaving early does not cancel the query
+        return await Deadline.run(asyncio.shield(load), "supabase")
+
+    @staticmethod
+    async def _load(key: Tuple[str, str], resume_id: UUID | str) -> ResumeText:
+        user_id = key[0]
+        record = await ResumeRepository.get(user_id, resume_id, columns="raw_text, parsed_content")
+        if not record:
+            raise ResourceNotFound(resource="Resume", resource_id=str(resume_id))
+        if not record.get("raw_text"):
+            raise NexusError("Resume has no extracted text. Please re-upload or wait for processing.")
+
+        entry = ResumeText(raw_text=record["raw_text"], parsed_content=record.get("parsed_content") or {})
+        ResumeTextRepository._cache.set(key, entry)
+        return entry
+
+    @staticmethod
+    def _loaded(key: Tuple[str, str], task: "asyncio.Task[ResumeText]") -> None:
+        if ResumeTextRepository._inflight.get(key) is task:
+            del ResumeTextRepository._inflight[key]
+        if not task.cancelled():
+            # Retrieved here so a failure nobody waited for is not logged as "never retrieved"
+            task.exception()
+
+    @staticmethod
+    def invalidate(user_id: str, resume_id: Optional[UUID | str] = None) -> None:
+        """Drops one resume, or every cached resume of the user when resume_id is None."""
+        if resume_id is not None:
+            ResumeTextRepository._cache.pop((user_id, str(resume_id)))
+        else:
+            ResumeTextRepository._cache.discard_where(lambda key: key[0] == user_id)
+
+    @staticmethod
+    def stats() -> dict:
+        return ResumeTextRepository._cache.stats()
+
+
+metrics.register("resume_text_cache", ResumeTextRepository.stats)
@@ -0,0 +1,55 @@
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from supabase import AsyncClient
+from app.repositories.base import get_db
+
+
+class ResumeRepository:
+    TABLE = "resumes"
+
+    @staticmethod
+    async def get(
+        user_id: str,
+        resume_id: UUID | str,
+        columns: str = "*",
+        client: Optional[AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
+        db = await get_db(client)
+        response = await db.table(ResumeRepository.TABLE)\
+            .select(columns)\
+            .eq("id", str(resume_id))\
+            .eq("user_id", user_id)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    @staticmethod
+    async def list_page(
+        user_id: str,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        columns: str = "id,created_at",
+        client: Optional[AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Newest-first page of a user's resumes, keyset-paginated on (created_at, id).
+        `after` is the (created_at, id) of the last row of the previous page.
+        Served by idx_resumes_user_created_id, so each page is an index range scan.
+        """
+        db = await get_db(client)
+        query = db.table(ResumeRepository.TABLE)\
+            .select(columns)\
+            .eq("user_id", user_id)
+        if after:
+            created_at, last_id = after
+            query = query.or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{last_id})'
+            )
+        response = await query\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(limit)\
+            .execute()
+        return response.data or []
@@ -0,0 +1,59 @@
+from typing import Any, Dict, List, Optional
+
+from supabase import AsyncClient
+from app.repositories.base import get_db
+
+
+class StorageRepository:
+    """Async access to Supabase Storage objects in one bucket."""
+    BUCKET_NAME = "resumes"
+
+    @staticmethod
+    async def upload(
+        path: str,
+        content: bytes,
+        content_type: str = "application/pdf",
+        upsert: bool = True,
+        bucket: str = BUCKET_NAME,
+        client: Optional[AsyncClient] = None
+    ) -> Any:
+        db = await get_db(client)
+        return await db.storage.from_(bucket).upload(
+            path=path,
+            file=content,
+            file_options={"content-type": content_type, "upsert": "true" if upsert else "false"}
+        )
+
+    @staticmethod
+    async def download(path: str, bucket: str = BUCKET_NAME, client: Optional[AsyncClient] = None) -> bytes:
+        db = await get_db(client)
+        return await db.storage.from_(bucket).download(path)
+
+    @staticmethod
+    async def create_signed_url(
+        path: str,
+        expires_in: int,
+        bucket: str = BUCKET_NAME,
+        client: Optional[AsyncClient] = None
+    ) -> Optional[str]:
+        db = await get_db(client)
+        res = await db.storage.from_(bucket).create_signed_url(path, expires_in)
+        return res.get("signedURL") or res.get("signedUrl")
+
+    @staticmethod
+    async def list(
+        prefix: str = "",
+        limit: int = 100,
+        offset: int = 0,
+        bucket: str = BUCKET_NAME,
+        client: Optional[AsyncClient] = None
+    ) -> List[Dict[str, Any]]:
+        db = await get_db(client)
+        return await db.storage.from_(bucket).list(prefix, {"limit": limit, "offset": offset})
+
+    @staticmethod
+    async def remove(paths: List[str], bucket: str = BUCKET_NAME, client: Optional[AsyncClient] = None) -> List[Dict[str, Any]]:
+        if not paths:
+            return []
+        db = await get_db(client)
+        return await db.storage.from_(bucket).remove(paths)
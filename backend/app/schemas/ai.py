@@ -0,0 +1,148 @@
+"""
+Response schemas of the Gemini prompts.
+
+Each model is sent to Gemini as the response schema of its prompt (see
+AIAnalysisService.run_structured) and validates the parsed reply. Validation is
+lenient on purpose: values the model commonly gets slightly wrong ("5+ years",
+a bare keyword string, a null list) are coerced and missing optional fields
+take defaults, so a recoverable reply never fails the call. What a score cannot
+do without (the JD analysis and its critical keywords) is required, so an
+unrelated or empty reply fails instead of scoring as a perfect match.
+
+Every reply model records whether its JSON had to be repaired (`repaired`);
+callers do not cache or persist what they derive from a repaired reply.
+"""
+import re
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def _to_years(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value))
+    return float(match.group().replace(",", ".")) if match else None
+
+
+def _to_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _to_text(value: Any) -> str:
+    if isinstance(value, dict):
+        # Flatten {"action": ..., "reason": ...} style suggestions
+        return " - ".join(f"{k}: {v}" for k, v in value.items())
+    return str(value)
+
+
+class AIReply(BaseModel):
+    """Base of the prompt reply models."""
+    _repaired: bool = PrivateAttr(default=False)
+
+    @property
+    def repaired(self) -> bool:
+        """True when the reply was malformed JSON that loads_tolerant repaired (possibly truncated)."""
+        return self._repaired
+
+    def mark_repaired(self) -> None:
+        self._repaired = True
+
+
+class KeywordPresence(BaseModel):
+    keyword: str
+    present_in_resume: bool = False
+
+    @model_validator(mode="before")
+    @classmethod
+    def _from_string(cls, value: Any) -> Any:
+        return {"keyword": value} if isinstance(value, str) else value
+
+
+class JDAnalysis(BaseModel):
+    critical_keywords: List[KeywordPresence]
+    bonus_keywords: List[KeywordPresence] = []
+    required_yoe: float = 0
+    seniority_level: str = "Mid-Level"
+
+    @field_validator("critical_keywords", "bonus_keywords", mode="before")
+    @classmethod
+    def _keywords(cls, value: Any) -> List[Any]:
+        # Entries without a keyword carry no information; drop them rather than fail
+        return [
+            entry for entry in _to_list(value)
+            if (isinstance(entry, str) and entry.strip()) or (isinstance(entry, dict) and entry.get("keyword"))
+        ]
+
+    @field_validator("critical_keywords")
+    @classmethod
+    def _has_critical_keywords(cls, value: List[KeywordPresence]) -> List[KeywordPresence]:
+        # Without them the keyword score would be a perfect 100
+        if not value:
+            raise ValueError("the JD analysis lists no critical keywords")
+        return value
+
+    @field_validator("required_yoe", mode="before")
+    @classmethod
+    def _required_yoe(cls, value: Any) -> float:
+        return _to_years(value) or 0
+
+    @field_validator("seniority_level", mode="before")
+    @classmethod
+    def _seniority_level(cls, value: Any) -> str:
+        return str(value).strip() if value else "Mid-Level"
+
+
+class ResumeAnalysis(BaseModel):
+    candidate_yoe: Optional[float] = None
+    suggestions: List[str] = []
+
+    @field_validator("candidate_yoe", mode="before")
+    @classmethod
+    def _candidate_yoe(cls, value: Any) -> Optional[float]:
+        return _to_years(value)
+
+    @field_validator("suggestions", mode="before")
+    @classmethod
+    def _suggestions(cls, value: Any) -> List[str]:
+        return [_to_text(item) for item in _to_list(value) if item]
+
+
+class ScoreAnalysis(AIReply):
+    """Reply of the ATS analysis prompt (ATSScoringService._get_ai_analysis)."""
+    jd_analysis: JDAnalysis
+    resume_analysis: ResumeAnalysis = Field(default_factory=ResumeAnalysis)
+
+    @field_validator("resume_analysis", mode="before")
+    @classmethod
+    def _missing_part(cls, value: Any) -> Any:
+        return value or {}
+
+
+class OptimizedResume(AIReply):
+    """Reply of the single-generation resume optimisation prompt."""
+    optimized_resume_text: str
+
+
+class SectionRewrite(AIReply):
+    """Reply of one section prompt in section-parallel optimisation."""
+    markdown: str
+
+
+class BulletRewrite(AIReply):
+    """Reply of the bullet point rewrite prompt."""
+    rewritten_text: Optional[str] = None
+    explanation: str = "No explanation provided."
+    applied_keywords: List[str] = []
+
+    @field_validator("applied_keywords", mode="before")
+    @classmethod
+    def _applied_keywords(cls, value: Any) -> List[str]:
+        return [str(item) for item in _to_list(value) if item]
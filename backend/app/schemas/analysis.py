@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, model_validator
 from uuid import UUID
 from typing import Optional, List
 from datetime import datetime
@@ -15,6 +15,54 @@ class AnalysisRequest(BaseModel):
     resume_id: Optional[UUID] = None
     resume_text: Optional[str] = None
     job_description: str
+    force_refresh: bool = False  # ignore any stored result and recompute
+
+class BatchResumeInput(BaseModel):
+    resume_id: Optional[UUID] = None
+    resume_text: Optional[str] = None
+    label: Optional[str] = None  # echoed back on the result (e.g. candidate name)
+
+class BatchScoreRequest(BaseModel):
+    """
+    Exactly one shape:
+    - one resume (`resume_id` / `resume_text`) vs many `job_descriptions`, or
+    - many `resumes` vs one `job_description`.
+    """
+    resume_id: Optional[UUID] = None
+    resume_text: Optional[str] = None
+    job_descriptions: List[str] = []
+    job_description: Optional[str] = None
+    resumes: List[BatchResumeInput] = []
+    stream: bool = False  # NDJSON, one line per pair as it completes
+    force_refresh: bool = False
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "BatchScoreRequest":
+        one_resume = bool(self.job_descriptions)
+        one_jd = bool(self.resumes)
+        if one_resume == one_jd:
+            raise ValueError("Provide either job_descriptions (one resume vs N JDs) or resumes (N resumes vs one JD)")
+        if one_resume and (not (self.resume_id or self.resume_text) or self.job_description):
+            raise ValueError("job_descriptions needs resume_id or resume_text, and no job_description")
+        if one_jd and (not self.job_description or self.resume_id or self.resume_text):
+            raise ValueError("resumes needs job_description, and no resume_id or resume_text")
+        return self
+
+    @property
+    def shared_resume(self) -> bool:
+        return bool(self.job_descriptions)
+
+class BatchScoreItem(BaseModel):
+    index: int  # position in `job_descriptions` or `resumes`
+    rank: Optional[int] = None  # 1 = best match; set once the whole batch is ranked
+    label: Optional[str] = None
+    resume_id: Optional[UUID] = None
+    result: Optional[ATSScoreResult] = None
+    from_store: bool = False
+    error: Optional[str] = None
+
+class BatchScoreResponse(BaseModel):
+    items: List[BatchScoreItem]  # ranked, failures last
 
 class AnalysisCreate(BaseModel):
     resume_id: UUID
@@ -59,6 +107,10 @@ class RewriteResult(BaseModel):
     explanation: str
     applied_keywords: List[str]
 
+class OptimizeMode(str, Enum):
+    SINGLE = "single"  # one generation for the whole resume
+    SECTIONS = "sections"  # one generation per section, run concurrently
+
 class OptimizeRequest(BaseModel):
     resume_id: Optional[UUID] = None
     resume_text: Optional[str] = None
@@ -66,6 +118,8 @@ class OptimizeRequest(BaseModel):
     missing_critical_skills: List[str] = []
     missing_bonus_skills: List[str] = []
     suggestions: List[str] = []
+    mode: Optional[OptimizeMode] = None  # defaults to OPTIMIZE_MODE
 
 class OptimizeResult(BaseModel):
     optimized_resume_text: str
+    failed_sections: List[str] = []  # sections kept as written because generation failed
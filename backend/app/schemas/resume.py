@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Optional, Dict, Any, List
 from .common import TimestampSchema
 
 class ResumeBase(BaseModel):
@@ -21,3 +22,49 @@ class ResumeResponse(ResumeBase, TimestampSchema):
     raw_text: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+class ResumeListItem(BaseModel):
+    """Row of GET /resumes; only the selected columns are set (see `fields`)."""
+    id: UUID
+    created_at: datetime
+    user_id: Optional[UUID] = None
+    file_name: Optional[str] = None
+    file_path: Optional[str] = None
+    updated_at: Optional[datetime] = None
+    parsed_content: Optional[Dict[str, Any]] = None
+    raw_text: Optional[str] = None
+
+class BulkUploadItem(BaseModel):
+    file_name: str  # as uploaded, or the member path inside a ZIP
+    status: str  # "uploaded" or "failed"
+    size: Optional[int] = None
+    resume: Optional[ResumeResponse] = None
+    error: Optional[str] = None
+    warning: Optional[str] = None
+
+class BulkUploadResponse(BaseModel):
+    items: List[BulkUploadItem]
+    uploaded: int
+    failed: int
+
+class ResumeSection(BaseModel):
+    key: str  # canonical name: summary, experience, education, skills, ...
+    heading: Optional[str] = None  # heading as written in the resume
+    lines: List[str] = []
+    bullets: List[str] = []
+
+class ExperienceEntry(BaseModel):
+    header: List[str] = []  # title / company lines
+    start: Optional[str] = None  # "YYYY-MM" or "YYYY"
+    end: Optional[str] = None  # "YYYY-MM", "YYYY" or "present"
+    months: Optional[int] = None
+    bullets: List[str] = []
+
+class ParsedResume(BaseModel):
+    """Structured, heuristic parse of a resume's raw text (returned and read as `parsed_content`)."""
+    version: int
+    content_hash: str
+    word_count: int
+    sections: List[ResumeSection] = []
+    experience: List[ExperienceEntry] = []
+    total_experience_months: Optional[int] = None
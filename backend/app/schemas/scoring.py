@@ -12,6 +12,13 @@ class ScoreBreakdown(BaseModel):
     seniority_score: float
     penalties: float
 
+class RequirementEvidence(BaseModel):
+    requirement: str  # JD requirement sentence
+    evidence: Optional[str] = None  # best-matching resume bullet or line
+    section: Optional[str] = None  # resume section of the evidence
+    similarity: float  # cosine similarity, 0-1
+    matched: bool  # similarity >= ALIGNMENT_MIN_SIMILARITY
+
 class ATSScoreResult(BaseModel):
     final_score: int
     breakdown: ScoreBreakdown
@@ -21,6 +28,11 @@ class ATSScoreResult(BaseModel):
     required_yoe: Optional[float] = None
     explanation: str
     suggestions: List[str] = []
+    alignment: List[RequirementEvidence] = []  # one entry per JD requirement, in JD order
+    alignment_complete: bool = True  # False when alignment was not computed (failed, skipped or batch scoring)
+    semantic_complete: bool = True  # False when the embeddings failed or ran out of time (semantic score counted as 0)
+    analysis_repaired: bool = False  # the Gemini reply was malformed JSON that had to be repaired
+    partial: bool = False  # some component is missing or repaired (see the flags above); partial results are never persisted
 
 class AnalysisRequest(BaseModel):
     resume_text: str
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+
+class TaskStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class TaskAccepted(BaseModel):
+    id: str
+    status: TaskStatus
+    status_url: str
+    events_url: str
+
+class TaskResponse(BaseModel):
+    id: str
+    type: str
+    status: TaskStatus
+    attempts: int
+    max_attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,9 +1,51 @@
-import json
+import asyncio
+import functools
 import google.generativeai as genai
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
 from app.clients.gemini import GeminiClient
-from app.core.exceptions import AIProcessingError
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import AIProcessingError, DeadlineExceeded
+from app.core.json_repair import loads_tolerant
 from app.core.logging import logger
+from app.core.metrics import metrics
+from app.schemas.ai import AIReply
+
+ResponseModel = TypeVar("ResponseModel", bound=BaseModel)
+
+
+def _gemini_schema(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a Pydantic JSON schema node to the OpenAPI subset Gemini accepts (no refs, defaults or titles)."""
+    if "$ref" in schema:
+        return _gemini_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        converted = _gemini_schema(options[0], defs)
+        if len(options) < len(schema["anyOf"]):
+            converted["nullable"] = True
+        return converted
+
+    converted: Dict[str, Any] = {"type": schema.get("type", "string")}
+    if "enum" in schema:
+        converted["enum"] = schema["enum"]
+    if converted["type"] == "object":
+        properties = {name: _gemini_schema(node, defs) for name, node in schema.get("properties", {}).items()}
+        converted["properties"] = properties
+        # Ask for every field; the Pydantic models still fill in whatever is missing
+        converted["required"] = list(properties)
+    elif converted["type"] == "array":
+        converted["items"] = _gemini_schema(schema.get("items", {}), defs)
+    return converted
+
+
+@functools.lru_cache(maxsize=None)
+def response_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Gemini response schema for a Pydantic response model (computed once per model)."""
+    schema = model.model_json_schema()
+    return _gemini_schema(schema, schema.get("$defs", {}))
+
 
 class AIAnalysisService:
     """
@@ -12,46 +54,86 @@ class AIAnalysisService:
     """
 
     @staticmethod
-    async def run_prompt(prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+    async def run_structured(
+        prompt: str,
+        response_model: Type[ResponseModel],
+        temperature: float = 0.7
+    ) -> ResponseModel:
+        """
+        Runs a prompt constrained to `response_model`'s schema and returns the validated model.
+        Only replies that cannot be repaired or validated raise AIProcessingError.
+        A reply whose JSON was repaired is marked (`AIReply.repaired`).
         """
-        Sends a prompt to Gemini and returns the parsed JSON response.
+        data, repaired = await AIAnalysisService.run_prompt(prompt, temperature, schema=response_schema(response_model))
+        try:
+            reply = response_model.model_validate(data)
+        except ValidationError as e:
+            metrics.inc("ai.invalid_responses")
+            logger.error(f"AI response does not match {response_model.__name__}: {str(e)}")
+            raise AIProcessingError(f"AI response did not match the expected format ({response_model.__name__})")
+        if repaired and isinstance(reply, AIReply):
+            reply.mark_repaired()
+        return reply
+
+    @staticmethod
+    async def run_prompt(
+        prompt: str,
+        temperature: float = 0.7,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Sends a prompt to Gemini and returns (parsed JSON response, whether it had to be repaired).
+        `schema` is an optional Gemini response schema (see `response_schema`).
         Implements fallback logic for Quota Exceeded (429) errors.
+        Bounded by the request deadline: no call is started with less than
+        DEADLINE_MIN_AI_SECONDS left, and a call still running at the deadline is cancelled.
         """
         try:
             # Try primary model first (configured in GeminiClient, e.g. gemini-flash-latest)
             model = GeminiClient.get_model()
-            return await AIAnalysisService._execute_request(model, prompt, temperature)
+            return await Deadline.run(
+                AIAnalysisService._execute_request(model, prompt, temperature, schema),
+                "gemini", settings.DEADLINE_MIN_AI_SECONDS
+            )
 
         except Exception as e:
             error_str = str(e).lower()
             # Check for quota errors (429) or other API issues that might be model-specific
             if "429" in error_str or "quota" in error_str or "resourceexhausted" in error_str:
-                logger.warning(f"Primary model failed with quota error: {e}. Attempting fallback to gemini-pro.")
+                logger.warning("Primary model failed with quota error: %s. Attempting fallback to gemini-pro.", e)
                 try:
                     # Fallback to gemini-pro which often has separate quotas or better availability
                     fallback_model = GeminiClient.get_model("gemini-pro")
-                    return await AIAnalysisService._execute_request(fallback_model, prompt, temperature)
+                    return await Deadline.run(
+                        AIAnalysisService._execute_request(fallback_model, prompt, temperature, schema),
+                        "gemini", settings.DEADLINE_MIN_AI_SECONDS
+                    )
+                except DeadlineExceeded:
+                    raise
                 except Exception as fallback_error:
                     logger.error(f"Fallback model also failed: {fallback_error}")
                     raise AIProcessingError(f"AI Service unavailable (Quota Exceeded): {str(fallback_error)}")
             
             # Re-raise if it's not a quota error or if we didn't catch it
-            if isinstance(e, AIProcessingError):
+            if isinstance(e, (AIProcessingError, DeadlineExceeded)):
                 raise e
             
             logger.error(f"Gemini API Error: {str(e)}", exc_info=True)
             raise AIProcessingError(f"Failed to communicate with AI service: {str(e)}")
 
     @staticmethod
-    async def _execute_request(model, prompt: str, temperature: float) -> Dict[str, Any]:
+    async def _execute_request(
+        model, prompt: str, temperature: float, schema: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Any, bool]:
         """Helper to execute the actual request and parse JSON."""
         # Configure generation for JSON response
         generation_config = genai.types.GenerationConfig(
             temperature=temperature,
-            response_mime_type="application/json"
+            response_mime_type="application/json",
+            response_schema=schema
         )
 
-        logger.info(f"Sending request to Gemini model: {model.model_name}...")
+        logger.info("Sending request to Gemini model: %s", model.model_name)
         
         response = await model.generate_content_async(
             prompt,
@@ -65,13 +147,20 @@ class AIAnalysisService:
 
         raw_text = response.text
         
-        # Parse JSON
+        # Parse JSON, repairing fences, trailing commas and truncated output instead of failing the call
         try:
-            data = json.loads(raw_text)
-            return data
-        except json.JSONDecodeError as e:
+            data, repaired = loads_tolerant(raw_text)
+        except ValueError as e:
+            metrics.inc("ai.unparseable_responses")
             logger.error(f"Failed to parse AI response as JSON: {raw_text[:200]}... Error: {str(e)}")
             raise AIProcessingError("AI response was not valid JSON")
+        if repaired:
+            metrics.inc("ai.repaired_responses")
+            logger.warning(
+                "Repaired malformed AI JSON response (finish reason: %s)",
+                response.candidates[0].finish_reason if response.candidates else "unknown"
+            )
+        return data, repaired
 
     @staticmethod
     def build_prompt(template: str, **kwargs) -> str:
@@ -85,30 +174,42 @@ class AIAnalysisService:
             raise AIProcessingError(f"Internal error building prompt: missing {str(e)}")
 
     @staticmethod
-    async def get_embedding(text: str) -> list[float]:
+    async def get_embeddings(texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
         """
-        Generates a vector embedding for the given text.
+        Embeds many texts with one API call per `batch_size` texts (EMBEDDING_BATCH_SIZE).
+        The SDK call is blocking, so it runs in a worker thread; up to
+        EMBEDDING_CONCURRENCY batches are in flight, so chunked documents cost
+        about one round trip rather than one per batch.
         """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_CONCURRENCY)
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                result = await run_in_threadpool(
+                    genai.embed_content,
+                    model="models/text-embedding-004",
+                    content=batch,
+                    task_type="semantic_similarity"
+                )
+            embeddings = result.get("embedding") if result else None
+            if not embeddings or len(embeddings) != len(batch):
+                raise AIProcessingError("Embedding batch returned the wrong number of vectors")
+            return embeddings
+
+        if not texts:
+            return []
         try:
-            # We use the 'embedding-001' model or similar for embeddings
-            # Note: The main model 'gemini-2.0-flash' is a generative model.
-            # For embeddings, we usually use 'models/text-embedding-004' or similar.
-            # We'll hardcode a standard embedding model for now.
-            
-            # Ensure client is initialized (though embed_content might not need the model object if using module level)
-            GeminiClient.get_model() 
-            
-            result = genai.embed_content(
-                model="models/text-embedding-004",
-                content=text,
-                task_type="semantic_similarity"
+            GeminiClient.get_model()
+            batches = await Deadline.run(
+                asyncio.gather(*(
+                    embed(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)
+                )),
+                "embeddings", settings.DEADLINE_MIN_EMBEDDING_SECONDS
             )
-            
-            if 'embedding' in result:
-                return result['embedding']
-            else:
-                raise AIProcessingError("No embedding returned from AI service")
-                
+        except (AIProcessingError, DeadlineExceeded):
+            raise
         except Exception as e:
-            logger.error(f"Embedding generation failed: {str(e)}")
+            logger.error(f"Batch embedding generation failed: {str(e)}")
             raise AIProcessingError(f"Failed to generate embeddings: {str(e)}")
+        return [vector for batch in batches for vector in batch]
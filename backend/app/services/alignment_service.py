@@ -0,0 +1,78 @@
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas.resume import ParsedResume
+from app.schemas.scoring import RequirementEvidence
+from app.services.chunking_service import NON_SEMANTIC_SECTIONS
+from app.services.parsing_service import BULLET_PREFIX
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+_MIN_WORDS = 3
+
+
+class AlignmentService:
+    """
+    Requirement-to-evidence alignment without a generative model.
+
+    The JD is split into requirement sentences and the resume into bullets.
+    ATSScoringService embeds both sides in one batched call and computes the
+    requirement x bullet cosine matrix in one matrix product; `match` then picks
+    each requirement's best-scoring bullet.
+    """
+
+    @staticmethod
+    def _sentences(line: str) -> List[str]:
+        bullet = BULLET_PREFIX.match(line)
+        if bullet:
+            line = line[bullet.end():]
+        return [s.strip(" .;") for s in _SENTENCE_END.split(line.strip()) if s.strip(" .;")]
+
+    @staticmethod
+    def requirements(job_description: str) -> List[str]:
+        """JD sentences long enough to state a requirement, in order, without duplicates."""
+        found: List[str] = []
+        seen = set()
+        for line in (job_description or "").splitlines():
+            # "Requirements:" and similar lines introduce a list, they are not requirements
+            if line.strip().endswith(":"):
+                continue
+            for sentence in AlignmentService._sentences(line):
+                key = sentence.casefold()
+                if len(sentence.split()) >= _MIN_WORDS and key not in seen:
+                    seen.add(key)
+                    found.append(sentence)
+        return found[:settings.ALIGNMENT_MAX_REQUIREMENTS]
+
+    @staticmethod
+    def evidence(parsed: ParsedResume) -> List[Tuple[str, str]]:
+        """(text, section key) for every resume bullet; sections without bullets contribute their sentences."""
+        found: List[Tuple[str, str]] = []
+        for section in parsed.sections:
+            if section.key in NON_SEMANTIC_SECTIONS:
+                continue
+            if section.bullets:
+                texts = section.bullets
+            else:
+                texts = [s for line in section.lines for s in AlignmentService._sentences(line)]
+            found.extend((text, section.key) for text in texts if len(text.split()) >= _MIN_WORDS)
+        return found[:settings.ALIGNMENT_MAX_EVIDENCE]
+
+    @staticmethod
+    def match(requirements: List[str], evidence: List[Tuple[str, str]], sims: np.ndarray) -> List[RequirementEvidence]:
+        """Best evidence per requirement from the requirements x evidence similarity matrix."""
+        best = sims.argmax(axis=1)
+        alignment = []
+        for row, requirement in enumerate(requirements):
+            similarity = float(sims[row, best[row]])
+            text, section = evidence[best[row]]
+            alignment.append(RequirementEvidence(
+                requirement=requirement,
+                evidence=text,
+                section=section,
+                similarity=round(similarity, 3),
+                matched=similarity >= settings.ALIGNMENT_MIN_SIMILARITY
+            ))
+        return alignment
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.repositories.analyses import AnalysisRepository
+from app.schemas.scoring import ATSScoreResult
+from app.services.ats_scoring_service import ATSScoringService
+
+
+class AnalysisStoreService:
+    """
+    Stored /analysis/score results, keyed by (user, resume content hash, normalised JD hash).
+
+    Lookups hit a bounded in-process cache first, then the `analyses` table.
+    Only authenticated users are persisted: guests have no profile row, so for
+    them the in-process cache is the only store.
+
+    Partial results are never persisted. Those missing only their alignment are
+    cached under a separate key, so /score never serves them; only callers that
+    pass `partial_ok` (batch scoring, which does not compute alignment) reuse
+    them. Those missing their semantic score or built on a repaired Gemini
+    reply are not cached at all.
+    """
+
+    _recent: LRUCache[ATSScoreResult] = LRUCache(
+        max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS
+    )
+
+    @staticmethod
+    def normalize_jd(job_description: str) -> str:
+        # Formatting-only differences (case, spacing, unicode forms) map to the same JD
+        text = unicodedata.normalize("NFKC", job_description or "").casefold()
+        return re.sub(r"\s+", " ", text).strip()
+
+    @staticmethod
+    def jd_hash(job_description: str) -> str:
+        return hashlib.sha256(AnalysisStoreService.normalize_jd(job_description).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _key(user_id: str, resume_hash: str, jd_hash: str, partial: bool = False) -> str:
+        key = f"{user_id}:{resume_hash}:{jd_hash}:{ATSScoringService.SCORING_VERSION}"
+        return f"{key}:partial" if partial else key
+
+    @staticmethod
+    async def lookup(
+        user_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        persisted: bool,
+        partial_ok: bool = False
+    ) -> Optional[ATSScoreResult]:
+        key = AnalysisStoreService._key(user_id, resume_hash, jd_hash)
+        result = AnalysisStoreService._recent.get(key)
+        if result is None and partial_ok:
+            result = AnalysisStoreService._recent.get(AnalysisStoreService._key(user_id, resume_hash, jd_hash, partial=True))
+        if result is not None:
+            metrics.inc("analysis_store.hits.memory")
+            return result
+
+        if persisted:
+            try:
+                row = await AnalysisRepository.find_latest(
+                    user_id, resume_hash, jd_hash,
+                    ATSScoringService.SCORING_VERSION,
+                    columns="result"
+                )
+            except Exception as e:
+                # A failed lookup only costs a recomputation
+                logger.warning("Stored analysis lookup failed: %s", e)
+                row = None
+
+            if row and row.get("result"):
+                result = ATSScoreResult.model_validate(row["result"])
+                AnalysisStoreService._recent.set(key, result)
+                metrics.inc("analysis_store.hits.db")
+                return result
+
+        metrics.inc("analysis_store.misses")
+        return None
+
+    @staticmethod
+    def remember(user_id: str, resume_hash: str, jd_hash: str, result: ATSScoreResult) -> None:
+        if not result.semantic_complete or result.analysis_repaired:
+            metrics.inc("analysis_store.partial_skipped")
+            return
+        partial = not result.alignment_complete
+        AnalysisStoreService._recent.set(AnalysisStoreService._key(user_id, resume_hash, jd_hash, partial=partial), result)
+
+    @staticmethod
+    async def persist(
+        user_id: str,
+        resume_hash: str,
+        jd_hash: str,
+        result: ATSScoreResult,
+        resume_id: Optional[UUID] = None
+    ) -> None:
+        """
+        Writes the analysis row, then its keyword gaps and suggestions as one batched insert each.
+        Runs after the response is sent; failures are logged, never raised.
+        Partial results are skipped: a later /score lookup would serve them as complete.
+        """
+        if result.partial:
+            metrics.inc("analysis_store.partial_skipped")
+            return
+        try:
+            analysis = await AnalysisRepository.create({
+                "user_id": user_id,
+                "resume_id": str(resume_id) if resume_id else None,
+                "match_score": result.final_score,
+                "summary": result.explanation,
+                "resume_hash": resume_hash,
+                "jd_hash": jd_hash,
+                "scoring_version": ATSScoringService.SCORING_VERSION,
+                "result": result.model_dump(),
+            })
+            analysis_id = analysis["id"]
+
+            await asyncio.gather(
+                AnalysisRepository.add_keyword_gaps(AnalysisStoreService._keyword_gap_rows(analysis_id, result)),
+                AnalysisRepository.add_rewrite_suggestions(AnalysisStoreService._suggestion_rows(analysis_id, result))
+            )
+            metrics.inc("analysis_store.persisted")
+        except Exception as e:
+            metrics.inc("analysis_store.persist_errors")
+            logger.warning("Failed to persist analysis for user %s: %s", user_id, e)
+
+    @staticmethod
+    def _keyword_gap_rows(analysis_id: str, result: ATSScoreResult) -> List[Dict[str, Any]]:
+        rows = [
+            {"analysis_id": analysis_id, "keyword": keyword, "category": "critical", "importance": "critical", "status": "missing"}
+            for keyword in result.missing_critical_skills
+        ]
+        rows += [
+            {"analysis_id": analysis_id, "keyword": keyword, "category": "bonus", "importance": "medium", "status": "missing"}
+            for keyword in result.missing_bonus_skills
+        ]
+        return rows
+
+    @staticmethod
+    def _suggestion_rows(analysis_id: str, result: ATSScoreResult) -> List[Dict[str, Any]]:
+        return [
+            {"analysis_id": analysis_id, "section": "general", "suggested_text": suggestion}
+            for suggestion in result.suggestions
+        ]
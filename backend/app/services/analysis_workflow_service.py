@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+from app.core.exceptions import DeadlineExceeded, NexusError, ResourceNotFound
+from app.core.logging import logger
+from app.repositories.resume_text import ResumeTextRepository
+from app.schemas.analysis import AnalysisRequest, OptimizeRequest, OptimizeResult
+from app.schemas.scoring import ATSScoreResult
+from app.services.analysis_store_service import AnalysisStoreService
+from app.services.ats_scoring_service import ATSScoringService
+from app.services.parsing_service import ResumeParsingService
+from app.services.rewrite_service import RewriteService
+
+
+@dataclass
+class ScoreOutcome:
+    result: ATSScoreResult
+    from_store: bool
+    resume_hash: str
+    jd_hash: str
+
+    async def persist(self, user_id: str, request: AnalysisRequest) -> None:
+        await AnalysisStoreService.persist(
+            user_id, self.resume_hash, self.jd_hash, self.result,
+            # Inline text may come with a client-side id that has no DB row
+            resume_id=None if request.resume_text else request.resume_id
+        )
+
+
+class AnalysisWorkflowService:
+    """
+    The /analysis/score and /analysis/optimize workflows.
+    Shared by the HTTP endpoints (inline) and the task queue (background).
+    """
+
+    @staticmethod
+    async def load_resume_text(
+        resume_id: Optional[UUID],
+        resume_text: Optional[str],
+        user_id: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Returns (raw_text, stored parsed_content) for a request.
+        Inline text wins; otherwise the resume is read through ResumeTextRepository's cache.
+        """
+        if resume_text:
+            return resume_text, None
+
+        if not resume_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Either resume_id or resume_text must be provided")
+
+        try:
+            entry = await ResumeTextRepository.get(user_id, resume_id)
+            return entry.raw_text, entry.parsed_content
+        except ResourceNotFound as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.message)
+        except DeadlineExceeded:
+            raise
+        except NexusError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+        except Exception as e:
+            logger.error(f"Database error fetching resume: {str(e)}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error")
+
+    @staticmethod
+    async def score(request: AnalysisRequest, user_id: str, persisted: bool) -> ScoreOutcome:
+        """
+        Returns the stored result for this resume/JD pair (unless `force_refresh`) or a fresh one.
+        A fresh result is remembered in-process; writing it to the DB (`ScoreOutcome.persist`) is left to the caller.
+        """
+        resume_text, stored_parse = await AnalysisWorkflowService.load_resume_text(
+            request.resume_id, request.resume_text, user_id
+        )
+
+        logger.info("Proceeding to scoring with resume text length: %d", len(resume_text))
+
+        parsed = ResumeParsingService.get_or_parse(resume_text, stored=stored_parse)
+
+        # Stored result lookup (resume content hash + normalised JD hash)
+        resume_hash = parsed.content_hash
+        jd_hash = AnalysisStoreService.jd_hash(request.job_description)
+        if not request.force_refresh:
+            stored = await AnalysisStoreService.lookup(user_id, resume_hash, jd_hash, persisted=persisted)
+            if stored is not None:
+                return ScoreOutcome(stored, True, resume_hash, jd_hash)
+
+        try:
+            result = await ATSScoringService.calculate_score(
+                resume_text=resume_text,
+                job_description=request.job_description,
+                parsed=parsed
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Scoring failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to calculate ATS score"
+            )
+
+        AnalysisStoreService.remember(user_id, resume_hash, jd_hash, result)
+        return ScoreOutcome(result, False, resume_hash, jd_hash)
+
+    @staticmethod
+    async def optimize(request: OptimizeRequest, user_id: str) -> OptimizeResult:
+        resume_text, stored_parse = await AnalysisWorkflowService.load_resume_text(
+            request.resume_id, request.resume_text, user_id
+        )
+
+        try:
+            return await RewriteService.optimize_full_resume(
+                resume_text=resume_text,
+                job_description=request.job_description,
+                missing_critical_skills=request.missing_critical_skills,
+                missing_bonus_skills=request.missing_bonus_skills,
+                suggestions=request.suggestions,
+                mode=request.mode,
+                parsed=ResumeParsingService.get_or_parse(resume_text, stored=stored_parse)
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Optimization failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to generate optimized resume"
+            )
@@ -1,10 +1,20 @@
-import math
+import asyncio
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
+import numpy as np
+from app.core.config import settings
 from app.services.ai_analysis_service import AIAnalysisService
-from app.schemas.scoring import ATSScoreResult, ScoreBreakdown, KeywordMatch
+from app.services.alignment_service import AlignmentService
+from app.services.chunking_service import ChunkingService
+from app.services.jd_dedup_service import JDDedupService
+from app.services.parsing_service import ResumeParsingService
+from app.schemas.ai import KeywordPresence, ScoreAnalysis
+from app.schemas.resume import ParsedResume
+from app.schemas.scoring import ATSScoreResult, ScoreBreakdown, KeywordMatch, RequirementEvidence
+from app.core.deadline import Deadline
 from app.core.exceptions import AIProcessingError
 from app.core.logging import logger
+from app.core.metrics import metrics
 
 class ATSScoringService:
     
@@ -18,39 +28,82 @@ class ATSScoringService:
     PENALTY_LENGTH = 5
     MAX_PENALTY_MISSING = 20
 
+    # Bump when the formula or prompt changes so stored results are recomputed
+    # (4: results without alignment are no longer stored; 5: nor partial or repaired ones)
+    SCORING_VERSION = 5
+
     @staticmethod
-    async def calculate_score(resume_text: str, job_description: str) -> ATSScoreResult:
+    async def calculate_score(
+        resume_text: str,
+        job_description: str,
+        parsed: Optional[ParsedResume] = None
+    ) -> ATSScoreResult:
         """
         Calculates the ATS Match Score based on the formula:
         Score = (KwS * 0.4) + (SemS * 0.4) + (SenS * 0.2) - Penalties
-        """
-        
-        # 1. Parallel Execution: Get AI Analysis and Embeddings
-        # In a real async environment, we would run these concurrently using asyncio.gather
-        # For simplicity/readability here, we run sequentially but they are async calls.
         
-        # A. Semantic Analysis (Keywords, YOE, etc.)
-        analysis_data = await ATSScoringService._get_ai_analysis(resume_text, job_description)
-        
-        # B. Embeddings for Semantic Similarity
-        sem_score = await ATSScoringService._calculate_semantic_similarity(resume_text, job_description)
+        `parsed` is the structured parse of the resume; it is computed (and cached) if not given.
+        """
+        if parsed is None:
+            parsed = ResumeParsingService.get_or_parse(resume_text)
+
+        # The Gemini analysis is required: fail before spending on embeddings if it cannot fit.
+        # The embedding stages are optional and are skipped (score 0, no alignment) when out of budget.
+        Deadline.check("gemini", settings.DEADLINE_MIN_AI_SECONDS)
         
+        # 1. Parallel Execution: AI Analysis and the two embedding stages run concurrently
+        analysis_data, sem_score, alignment = await asyncio.gather(
+            # A. Semantic Analysis (Keywords, YOE, etc.)
+            # The prompt gets the compact section rendering (no contact details) instead of the raw text.
+            ATSScoringService._get_ai_analysis(
+                ResumeParsingService.to_prompt_text(parsed) or resume_text,
+                job_description
+            ),
+            # B. Embeddings for Semantic Similarity (section-level chunks)
+            ATSScoringService._calculate_semantic_similarity(resume_text, job_description, parsed),
+            # C. Requirement-to-evidence alignment (embeddings only, no generative call)
+            ATSScoringService._calculate_alignment(job_description, parsed)
+        )
+
+        return ATSScoringService.build_result(analysis_data, sem_score, parsed, alignment)
+
+    @staticmethod
+    def build_result(
+        analysis_data: ScoreAnalysis,
+        sem_score: Optional[float],
+        parsed: ParsedResume,
+        alignment: Optional[List[RequirementEvidence]] = None
+    ) -> ATSScoreResult:
+        """
+        Combines the AI analysis, semantic score and local parse into the final result.
+        Pure and local: shared by the full scoring path and incremental (live) rescoring.
+        `sem_score` or `alignment` None means that part was not computed; the result is then flagged partial.
+        """
+        semantic_complete = sem_score is not None
+        sem_score = sem_score or 0.0
+
         # 2. Calculate Keyword Score (KwS)
+        jd_analysis = analysis_data.jd_analysis
         keyword_score, missing_critical, missing_bonus = ATSScoringService._calculate_keyword_score(
-            analysis_data["jd_analysis"]["critical_keywords"],
-            analysis_data["jd_analysis"]["bonus_keywords"]
+            jd_analysis.critical_keywords,
+            jd_analysis.bonus_keywords
         )
         
         # 3. Calculate Seniority Score (SenS)
+        # Fall back to the date ranges found by the parser when the AI gives no estimate
+        candidate_yoe = analysis_data.resume_analysis.candidate_yoe
+        if candidate_yoe is None and parsed.total_experience_months:
+            candidate_yoe = round(parsed.total_experience_months / 12, 1)
+
         seniority_score = ATSScoringService._calculate_seniority_score(
-            analysis_data["jd_analysis"].get("required_yoe", 0),
-            analysis_data["resume_analysis"].get("candidate_yoe", 0),
-            analysis_data["jd_analysis"].get("seniority_level", "Mid-Level")
+            jd_analysis.required_yoe,
+            candidate_yoe or 0,
+            jd_analysis.seniority_level
         )
         
         # 4. Calculate Penalties
         penalties = ATSScoringService._calculate_penalties(
-            resume_text,
+            parsed.word_count,
             missing_critical
         )
         
@@ -67,28 +120,15 @@ class ATSScoringService:
             final_score, keyword_score, sem_score, seniority_score, penalties
         )
 
-        # 7. Collect Suggestions
-        raw_suggestions = analysis_data["resume_analysis"].get("suggestions", [])
-        ai_suggestions = []
-        
-        for suggestion in raw_suggestions:
-            if isinstance(suggestion, str):
-                ai_suggestions.append(suggestion)
-            elif isinstance(suggestion, dict):
-                # Try to flatten dict to string
-                parts = []
-                for k, v in suggestion.items():
-                    parts.append(f"{k}: {v}")
-                ai_suggestions.append(" - ".join(parts))
-            else:
-                ai_suggestions.append(str(suggestion))
+        # 7. Collect Suggestions (already flattened to strings by ResumeAnalysis)
+        ai_suggestions = list(analysis_data.resume_analysis.suggestions)
         
         # Add System-generated Penalty Suggestions
         system_suggestions = []
         if missing_critical:
             system_suggestions.append(f"PENALIDADE CRÍTICA: Você não possui {len(missing_critical)} habilidades críticas ({', '.join(missing_critical[:3])}{'...' if len(missing_critical)>3 else ''}). Adicione-as à sua seção de Habilidades imediatamente para aumentar sua pontuação.")
         
-        word_count = len(resume_text.split())
+        word_count = parsed.word_count
         if word_count < 300:
             system_suggestions.append(f"PENALIDADE DE TAMANHO: Seu currículo é muito curto ({word_count} palavras). Expanda seus pontos de experiência para alcançar pelo menos 300 palavras.")
         elif word_count > 2000:
@@ -107,14 +147,25 @@ class ATSScoringService:
             ),
             missing_critical_skills=missing_critical,
             missing_bonus_skills=missing_bonus,
-            detected_yoe=analysis_data["resume_analysis"].get("candidate_yoe"),
-            required_yoe=analysis_data["jd_analysis"].get("required_yoe"),
+            detected_yoe=candidate_yoe,
+            required_yoe=jd_analysis.required_yoe,
             explanation=explanation,
-            suggestions=all_suggestions
+            suggestions=all_suggestions,
+            alignment=alignment or [],
+            alignment_complete=alignment is not None,
+            semantic_complete=semantic_complete,
+            analysis_repaired=analysis_data.repaired,
+            partial=alignment is None or not semantic_complete or analysis_data.repaired
         )
 
     @staticmethod
-    async def _get_ai_analysis(resume_text: str, jd_text: str) -> Dict[str, Any]:
+    async def _get_ai_analysis(resume_text: str, jd_text: str) -> ScoreAnalysis:
+        # The same resume against the same or a near-duplicate JD reuses the earlier analysis
+        fingerprint = JDDedupService.fingerprint(jd_text)
+        cached = JDDedupService.lookup(resume_text, fingerprint, ATSScoringService.SCORING_VERSION)
+        if cached is not None:
+            return cached
+
         prompt_template = """
         You are an ATS (Applicant Tracking System) Expert and Resume Coach. Analyze the following Resume and Job Description (JD).
         
@@ -156,58 +207,138 @@ class ATSScoringService:
         """
         
         prompt = AIAnalysisService.build_prompt(prompt_template, jd_text=jd_text, resume_text=resume_text)
-        logger.info(f"Sending prompt to AI (Length: {len(prompt)})")
+        logger.info("Sending prompt to AI (length: %d)", len(prompt))
         
         try:
-            response = await AIAnalysisService.run_prompt(prompt, temperature=0.0)
-            logger.info(f"AI Response keys: {response.keys()}")
+            response = await AIAnalysisService.run_structured(prompt, ScoreAnalysis, temperature=0.0)
+            logger.info(
+                "AI analysis: %d critical, %d bonus keywords",
+                len(response.jd_analysis.critical_keywords),
+                len(response.jd_analysis.bonus_keywords)
+            )
+            # A repaired reply may have lost keywords to truncation: use it once, never reuse it
+            if not response.repaired:
+                JDDedupService.remember(resume_text, fingerprint, ATSScoringService.SCORING_VERSION, response)
             return response
         except Exception as e:
             logger.error(f"AI Analysis Failed: {str(e)}")
             raise e
 
     @staticmethod
-    async def _calculate_semantic_similarity(text1: str, text2: str) -> float:
-        """Calculates cosine similarity between text embeddings."""
+    async def _calculate_semantic_similarity(
+        resume_text: str,
+        job_description: str,
+        parsed: Optional[ParsedResume] = None
+    ) -> Optional[float]:
+        """
+        Semantic score from chunk embeddings: resume sections and JD paragraphs are
+        embedded in one batched call and pooled by `chunk_similarity`.
+        None when the embeddings failed (or the deadline ran out), as opposed to a computed 0.
+        """
+        if parsed is None:
+            parsed = ResumeParsingService.get_or_parse(resume_text)
+        resume_chunks = ChunkingService.resume_chunks(parsed, resume_text)
+        jd_chunks = ChunkingService.text_chunks(job_description)
+        if not resume_chunks or not jd_chunks:
+            return 0.0
+
         try:
-            vec1 = await AIAnalysisService.get_embedding(text1)
-            vec2 = await AIAnalysisService.get_embedding(text2)
-            
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-            norm_a = math.sqrt(sum(a * a for a in vec1))
-            norm_b = math.sqrt(sum(b * b for b in vec2))
-            
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-                
-            similarity = dot_product / (norm_a * norm_b)
-            
-            # Threshold: < 0.5 implies low relevance
-            if similarity < 0.5:
-                return 0.0
-            
-            return similarity * 100
+            vectors = await AIAnalysisService.get_embeddings([c.text for c in resume_chunks + jd_chunks])
+            similarity = ATSScoringService.chunk_similarity(
+                vectors[:len(resume_chunks)], [c.weight for c in resume_chunks],
+                vectors[len(resume_chunks):], [c.weight for c in jd_chunks]
+            )
+            return ATSScoringService.similarity_to_score(similarity)
             
         except Exception as e:
             logger.error(f"Semantic scoring failed: {str(e)}")
+            metrics.inc("semantic.errors")
+            return None
+
+    @staticmethod
+    async def _calculate_alignment(job_description: str, parsed: ParsedResume) -> Optional[List[RequirementEvidence]]:
+        """
+        Best resume bullet for every JD requirement: both sides in one batched
+        embedding call, one similarity matrix. Failures (and an exhausted deadline) give None.
+        """
+        requirements = AlignmentService.requirements(job_description)
+        evidence = AlignmentService.evidence(parsed)
+        if not requirements or not evidence:
+            return [RequirementEvidence(requirement=r, similarity=0.0, matched=False) for r in requirements]
+
+        try:
+            vectors = await AIAnalysisService.get_embeddings(requirements + [text for text, _ in evidence])
+        except Exception as e:
+            logger.error(f"Requirement alignment failed: {str(e)}")
+            metrics.inc("alignment.errors")
+            return None
+
+        sims = ATSScoringService.similarity_matrix(vectors[:len(requirements)], vectors[len(requirements):])
+        alignment = AlignmentService.match(requirements, evidence, sims)
+        metrics.inc("alignment.requirements", len(requirements))
+        metrics.inc("alignment.matched", sum(1 for item in alignment if item.matched))
+        return alignment
+
+    @staticmethod
+    def similarity_matrix(rows: Sequence[Sequence[float]], cols: Sequence[Sequence[float]]) -> np.ndarray:
+        """Cosine similarity of every row vector against every column vector, as one matrix product."""
+        def unit(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+        return unit(rows) @ unit(cols).T
+
+    @staticmethod
+    def chunk_similarity(
+        resume_vectors: Sequence[Sequence[float]],
+        resume_weights: Sequence[float],
+        jd_vectors: Sequence[Sequence[float]],
+        jd_weights: Sequence[float],
+        pooling: Optional[str] = None
+    ) -> float:
+        """
+        Document similarity from chunk embeddings (EMBEDDING_POOLING).
+
+        - "maxsim": every JD chunk is matched by its most similar resume chunk and
+          the matches are averaged by JD chunk weight, so each requirement is judged
+          against the part of the resume that addresses it.
+        - "mean": weighted mean vector per document, then cosine.
+        """
+        pooling = pooling or settings.EMBEDDING_POOLING
+        if pooling == "mean":
+            resume = np.average(np.asarray(resume_vectors, dtype=np.float32), axis=0, weights=resume_weights)
+            jd = np.average(np.asarray(jd_vectors, dtype=np.float32), axis=0, weights=jd_weights)
+            return float(ATSScoringService.similarity_matrix([resume], [jd])[0, 0])
+
+        best = ATSScoringService.similarity_matrix(jd_vectors, resume_vectors).max(axis=1)
+        weights = np.asarray(jd_weights, dtype=np.float32)
+        return float(best @ weights / weights.sum())
+
+    @staticmethod
+    def similarity_to_score(similarity: float) -> float:
+        # Threshold: < 0.5 implies low relevance
+        if similarity < 0.5:
             return 0.0
+        
+        return similarity * 100
 
     @staticmethod
-    def _calculate_keyword_score(critical: List[Dict], bonus: List[Dict]) -> tuple[float, List[str], List[str]]:
+    def _calculate_keyword_score(critical: List[KeywordPresence], bonus: List[KeywordPresence]) -> tuple[float, List[str], List[str]]:
         # Weighted formula: 70% critical, 30% bonus
         
         total_crit = len(critical)
-        found_crit = sum(1 for k in critical if k.get("present_in_resume"))
+        found_crit = sum(1 for k in critical if k.present_in_resume)
         crit_rate = (found_crit / total_crit * 100) if total_crit > 0 else 100
         
         total_bonus = len(bonus)
-        found_bonus = sum(1 for k in bonus if k.get("present_in_resume"))
+        found_bonus = sum(1 for k in bonus if k.present_in_resume)
         bonus_rate = (found_bonus / total_bonus * 100) if total_bonus > 0 else 100
         
         score = (crit_rate * 0.70) + (bonus_rate * 0.30)
         
-        missing_crit_list = [k["keyword"] for k in critical if not k.get("present_in_resume")]
-        missing_bonus_list = [k["keyword"] for k in bonus if not k.get("present_in_resume")]
+        missing_crit_list = [k.keyword for k in critical if not k.present_in_resume]
+        missing_bonus_list = [k.keyword for k in bonus if not k.present_in_resume]
         
         return score, missing_crit_list, missing_bonus_list
 
@@ -225,7 +356,7 @@ class ATSScoringService:
             return 0.0
 
     @staticmethod
-    def _calculate_penalties(text: str, missing_critical: List[str]) -> int:
+    def _calculate_penalties(word_count: int, missing_critical: List[str]) -> int:
         penalties = 0
         
         # 1. Critical Keywords Penalty (capped)
@@ -235,7 +366,6 @@ class ATSScoringService:
         )
         
         # 2. Length Penalty (<300 or >2000 words)
-        word_count = len(text.split())
         if word_count < 300 or word_count > 2000:
             penalties += ATSScoringService.PENALTY_LENGTH
             
@@ -0,0 +1,228 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+
+from fastapi import BackgroundTasks, HTTPException, status
+
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceeded
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.schemas.analysis import BatchScoreItem, BatchScoreRequest
+from app.schemas.resume import ParsedResume
+from app.services.ai_analysis_service import AIAnalysisService
+from app.services.analysis_store_service import AnalysisStoreService
+from app.services.analysis_workflow_service import AnalysisWorkflowService
+from app.services.ats_scoring_service import ATSScoringService
+from app.services.chunking_service import ChunkingService
+from app.services.parsing_service import ResumeParsingService
+
+
+@dataclass
+class _Pair:
+    index: int
+    resume_text: str
+    parsed: ParsedResume
+    prompt_text: str
+    job_description: str
+    jd_hash: str
+    label: Optional[str] = None
+    resume_id: Optional[UUID] = None
+    # `analyses.resume_id`: only set for resumes read from the DB
+    stored_resume_id: Optional[UUID] = None
+
+
+@dataclass
+class BatchPlan:
+    """Resolved inputs of a batch: everything that can fail with a 4xx happens before any result is sent."""
+    request: BatchScoreRequest
+    user_id: str
+    pairs: List[_Pair]
+    failed: List[BatchScoreItem]
+
+
+class BatchScoringService:
+    """
+    /analysis/score/batch: one resume vs N job descriptions, or N resumes vs one job description.
+
+    Compared with N calls to /analysis/score, the shared side is loaded, parsed,
+    chunked and embedded once, the varying side is embedded in batched API calls,
+    similarities are pooled from chunk matrices, and the per-pair Gemini analyses
+    run with at most BATCH_SCORING_CONCURRENCY in flight. Stored results are
+    reused as in /score. Batch results have no requirement alignment, so they
+    are only cached in-process for later batches, never persisted or served by /score.
+    """
+
+    @staticmethod
+    async def prepare(request: BatchScoreRequest, user_id: str) -> BatchPlan:
+        size = len(request.job_descriptions) if request.shared_resume else len(request.resumes)
+        if size > settings.BATCH_SCORING_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A batch can hold at most {settings.BATCH_SCORING_MAX_ITEMS} items"
+            )
+
+        if request.shared_resume:
+            # Shared resume: one load, one parse, one prompt rendering
+            resume_text, stored_parse = await AnalysisWorkflowService.load_resume_text(
+                request.resume_id, request.resume_text, user_id
+            )
+            parsed = ResumeParsingService.get_or_parse(resume_text, stored=stored_parse)
+            prompt_text = ResumeParsingService.to_prompt_text(parsed) or resume_text
+            stored_resume_id = None if request.resume_text else request.resume_id
+            pairs = [
+                _Pair(
+                    index, resume_text, parsed, prompt_text, jd, AnalysisStoreService.jd_hash(jd),
+                    stored_resume_id=stored_resume_id
+                )
+                for index, jd in enumerate(request.job_descriptions)
+            ]
+            return BatchPlan(request, user_id, pairs, [])
+
+        # Shared JD: resumes are loaded concurrently; one missing resume only fails its own item
+        jd_hash = AnalysisStoreService.jd_hash(request.job_description)
+        loaded = await asyncio.gather(
+            *(AnalysisWorkflowService.load_resume_text(item.resume_id, item.resume_text, user_id) for item in request.resumes),
+            return_exceptions=True
+        )
+
+        pairs: List[_Pair] = []
+        failed: List[BatchScoreItem] = []
+        for index, (item, outcome) in enumerate(zip(request.resumes, loaded)):
+            if isinstance(outcome, Exception):
+                detail = outcome.detail if isinstance(outcome, HTTPException) else "Failed to load resume"
+                failed.append(BatchScoreItem(index=index, label=item.label, resume_id=item.resume_id, error=str(detail)))
+                continue
+
+            resume_text, stored_parse = outcome
+            parsed = ResumeParsingService.get_or_parse(resume_text, stored=stored_parse)
+            pairs.append(_Pair(
+                index, resume_text, parsed,
+                ResumeParsingService.to_prompt_text(parsed) or resume_text,
+                request.job_description, jd_hash,
+                label=item.label, resume_id=item.resume_id,
+                stored_resume_id=None if item.resume_text else item.resume_id
+            ))
+        return BatchPlan(request, user_id, pairs, failed)
+
+    @staticmethod
+    async def run(
+        plan: BatchPlan,
+        persisted: bool,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> AsyncIterator[BatchScoreItem]:
+        """Yields one item per pair in completion order (stored results and failures first)."""
+        for item in plan.failed:
+            yield item
+
+        pending = plan.pairs
+        if not plan.request.force_refresh:
+            stored = await asyncio.gather(*(
+                AnalysisStoreService.lookup(
+                    plan.user_id, pair.parsed.content_hash, pair.jd_hash, persisted=persisted, partial_ok=True
+                )
+                for pair in pending
+            ))
+            pending = []
+            for pair, result in zip(plan.pairs, stored):
+                if result is None:
+                    pending.append(pair)
+                else:
+                    yield BatchScoringService._item(pair, result=result, from_store=True)
+
+        if not pending:
+            return
+
+        sims = await BatchScoringService._similarities(plan.request.shared_resume, pending)
+        semaphore = asyncio.Semaphore(settings.BATCH_SCORING_CONCURRENCY)
+
+        async def score_pair(pair: _Pair, similarity: Optional[float]) -> BatchScoreItem:
+            async with semaphore:
+                try:
+                    analysis = await ATSScoringService._get_ai_analysis(pair.prompt_text, pair.job_description)
+                    result = ATSScoringService.build_result(
+                        analysis,
+                        ATSScoringService.similarity_to_score(similarity) if similarity is not None else None,
+                        pair.parsed
+                    )
+                except DeadlineExceeded:
+                    # Out of budget: the remaining pairs are reported, not started
+                    metrics.inc("batch_scoring.deadline_skipped")
+                    return BatchScoringService._item(pair, error="Request deadline exceeded")
+                except Exception as e:
+                    logger.error(f"Batch scoring failed for item {pair.index}: {str(e)}")
+                    metrics.inc("batch_scoring.pair_errors")
+                    return BatchScoringService._item(pair, error="Failed to calculate ATS score")
+
+            AnalysisStoreService.remember(plan.user_id, pair.parsed.content_hash, pair.jd_hash, result)
+            if persisted and background_tasks is not None and not result.partial:
+                background_tasks.add_task(
+                    AnalysisStoreService.persist,
+                    plan.user_id, pair.parsed.content_hash, pair.jd_hash, result,
+                    resume_id=pair.stored_resume_id
+                )
+            return BatchScoringService._item(pair, result=result)
+
+        tasks = [asyncio.create_task(score_pair(pair, sim)) for pair, sim in zip(pending, sims)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away (or the consumer stopped): drop the remaining Gemini calls
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _similarities(shared_resume: bool, pairs: List[_Pair]) -> List[Optional[float]]:
+        """
+        Chunks the shared side once and every varying document, embeds them in two
+        batched calls, then pools one chunk similarity matrix per pair.
+        None per pair when the embeddings failed.
+        """
+        if shared_resume:
+            shared = ChunkingService.resume_chunks(pairs[0].parsed, pairs[0].resume_text)
+            varying = [ChunkingService.text_chunks(pair.job_description) for pair in pairs]
+        else:
+            shared = ChunkingService.text_chunks(pairs[0].job_description)
+            varying = [ChunkingService.resume_chunks(pair.parsed, pair.resume_text) for pair in pairs]
+
+        try:
+            shared_vectors, varying_vectors = await asyncio.gather(
+                AIAnalysisService.get_embeddings([chunk.text for chunk in shared]),
+                AIAnalysisService.get_embeddings([chunk.text for chunks in varying for chunk in chunks])
+            )
+        except Exception as e:
+            # Same degradation as single scoring: no semantic component, results flagged partial
+            logger.error(f"Batch semantic scoring failed: {str(e)}")
+            return [None] * len(pairs)
+
+        shared_weights = [chunk.weight for chunk in shared]
+        similarities: List[Optional[float]] = []
+        offset = 0
+        for chunks in varying:
+            vectors, weights = varying_vectors[offset:offset + len(chunks)], [chunk.weight for chunk in chunks]
+            offset += len(chunks)
+            if not chunks or not shared:
+                similarities.append(0.0)
+            elif shared_resume:
+                similarities.append(ATSScoringService.chunk_similarity(shared_vectors, shared_weights, vectors, weights))
+            else:
+                similarities.append(ATSScoringService.chunk_similarity(vectors, weights, shared_vectors, shared_weights))
+        return similarities
+
+    @staticmethod
+    def _item(pair: _Pair, **values) -> BatchScoreItem:
+        return BatchScoreItem(index=pair.index, label=pair.label, resume_id=pair.resume_id, **values)
+
+    @staticmethod
+    def rank(items: List[BatchScoreItem]) -> List[BatchScoreItem]:
+        """Best score first (ties keep input order), failures last and unranked."""
+        scored = sorted(
+            (item for item in items if item.result is not None),
+            key=lambda item: (-item.result.final_score, item.index)
+        )
+        failed = sorted((item for item in items if item.result is None), key=lambda item: item.index)
+        for rank, item in enumerate(scored, start=1):
+            item.rank = rank
+        return scored + failed
@@ -0,0 +1,93 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.core.config import settings
+from app.schemas.resume import ParsedResume
+
+# Sections that carry no signal for semantic similarity
+NON_SEMANTIC_SECTIONS = {"header", "references"}
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class Chunk:
+    text: str
+    weight: float  # word count: longer chunks count more when pooling
+    key: Optional[str] = None  # resume section key, None for job descriptions
+
+
+class ChunkingService:
+    """
+    Splits resumes and job descriptions into embedding-sized chunks.
+
+    One embedding per document truncates long texts at the model's input window
+    and averages every topic into one vector. Chunks follow the structure we
+    detect (resume sections, JD paragraphs) and hold at most
+    EMBEDDING_CHUNK_MAX_WORDS words; for very long documents the limit is raised
+    to keep about EMBEDDING_MAX_CHUNKS chunks, so text is never dropped.
+    """
+
+    @staticmethod
+    def resume_chunks(parsed: ParsedResume, raw_text: str = "") -> List[Chunk]:
+        sections = [s for s in parsed.sections if s.key not in NON_SEMANTIC_SECTIONS and s.lines]
+        if not sections:
+            # No recognised headings: treat it like any other text
+            return ChunkingService.text_chunks(raw_text)
+
+        max_words = ChunkingService._budget(sum(len(line.split()) for s in sections for line in s.lines))
+        chunks: List[Chunk] = []
+        for section in sections:
+            # Each chunk repeats its heading so "Python" under Skills and under Experience embed differently
+            prefix = f"{section.heading}\n" if section.heading else ""
+            for text in ChunkingService._pack(section.lines, max_words):
+                chunks.append(Chunk(text=prefix + text, weight=len(text.split()), key=section.key))
+        return chunks
+
+    @staticmethod
+    def text_chunks(text: str) -> List[Chunk]:
+        """Paragraph-level chunks of unstructured text (job descriptions)."""
+        paragraphs = [
+            [line.strip() for line in block.splitlines() if line.strip()]
+            for block in _PARAGRAPH_BREAK.split(text or "")
+        ]
+        paragraphs = [lines for lines in paragraphs if lines]
+        max_words = ChunkingService._budget(sum(len(line.split()) for lines in paragraphs for line in lines))
+
+        texts = [text for lines in paragraphs for text in ChunkingService._pack(lines, max_words)]
+        if len(texts) > settings.EMBEDDING_MAX_CHUNKS:
+            # Many short paragraphs: let chunks span paragraph breaks
+            texts = ChunkingService._pack(texts, max_words, separator="\n\n")
+        return [Chunk(text=text, weight=len(text.split())) for text in texts]
+
+    @staticmethod
+    def _budget(total_words: int) -> int:
+        """Words per chunk: EMBEDDING_CHUNK_MAX_WORDS, raised so the document fits in EMBEDDING_MAX_CHUNKS."""
+        max_words = settings.EMBEDDING_CHUNK_MAX_WORDS
+        # Packing by line leaves chunks partly empty, hence the headroom of one half
+        needed = -(-total_words * 3 // (2 * settings.EMBEDDING_MAX_CHUNKS))
+        return max(max_words, needed)
+
+    @staticmethod
+    def _pack(lines: List[str], max_words: int, separator: str = "\n") -> List[str]:
+        """Greedily joins consecutive lines into chunks of at most `max_words` words."""
+        chunks: List[str] = []
+        current: List[str] = []
+        count = 0
+        for line in lines:
+            words = line.split()
+            if count and count + len(words) > max_words:
+                chunks.append(separator.join(current))
+                current, count = [], 0
+            # A single line longer than the budget is cut at word boundaries
+            while len(words) > max_words:
+                chunks.append(" ".join(words[:max_words]))
+                words = words[max_words:]
+                line = " ".join(words)
+            if words:
+                current.append(line)
+                count += len(words)
+        if current:
+            chunks.append(separator.join(current))
+        return chunks
@@ -0,0 +1,139 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, FrozenSet, Iterable, List, Optional, Type
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# Capabilities a backend can advertise. Callers ask for the ones they need and
+# the chain skips backends that cannot provide them.
+CAP_TEXT = "text"          # plain text extraction (every backend)
+CAP_LAYOUT = "layout"      # reading-order aware extraction (columns, tables)
+CAP_FAST = "fast"          # native engine, noticeably faster than pure Python
+
+
+class ExtractionBackend(ABC):
+    """
+    Interface for PDF text extraction engines.
+    Implementations return one string per page; cleaning is done by TextExtractionService.
+    """
+    name: str = ""
+    capabilities: FrozenSet[str] = frozenset({CAP_TEXT})
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Returns True if the engine's library can be imported."""
+        return True
+
+    @abstractmethod
+    def extract_pages(self, stream: BinaryIO) -> List[str]:
+        ...
+
+
+class PypdfBackend(ExtractionBackend):
+    """Default backend. Pure Python, always installed."""
+    name = "pypdf"
+    capabilities = frozenset({CAP_TEXT})
+
+    def extract_pages(self, stream: BinaryIO) -> List[str]:
+        import pypdf
+
+        reader = pypdf.PdfReader(stream)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+class PyMuPDFBackend(ExtractionBackend):
+    """Optional MuPDF engine (`pip install pymupdf`)."""
+    name = "pymupdf"
+    capabilities = frozenset({CAP_TEXT, CAP_LAYOUT, CAP_FAST})
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import fitz  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract_pages(self, stream: BinaryIO) -> List[str]:
+        import fitz
+
+        data = stream.read()
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            # "sort=True" orders blocks top-to-bottom, left-to-right
+            return [page.get_text("text", sort=True) for page in doc]
+
+
+class PdfiumBackend(ExtractionBackend):
+    """Optional PDFium engine (`pip install pypdfium2`)."""
+    name = "pypdfium2"
+    capabilities = frozenset({CAP_TEXT, CAP_FAST})
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def extract_pages(self, stream: BinaryIO) -> List[str]:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(stream)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
+
+BACKENDS: Dict[str, Type[ExtractionBackend]] = {
+    PypdfBackend.name: PypdfBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+    PdfiumBackend.name: PdfiumBackend,
+}
+
+_instances: Dict[str, ExtractionBackend] = {}
+
+
+def get_backend(name: str) -> Optional[ExtractionBackend]:
+    """Returns a cached backend instance, or None if unknown or not installed."""
+    if name in _instances:
+        return _instances[name]
+
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"Unknown PDF extraction backend '{name}'")
+        return None
+    if not backend_cls.is_available():
+        return None
+
+    _instances[name] = backend_cls()
+    return _instances[name]
+
+
+def get_backend_chain(required: Iterable[str] = (CAP_TEXT,)) -> List[ExtractionBackend]:
+    """
+    Resolves the ordered list of backends to try.
+
+    Order: the configured PDF_EXTRACTION_BACKEND, then PDF_EXTRACTION_FALLBACKS.
+    Backends that are not installed or lack a required capability are skipped.
+    pypdf is always appended last so extraction never has zero engines.
+    """
+    required = frozenset(required)
+    names = [settings.PDF_EXTRACTION_BACKEND, *settings.PDF_EXTRACTION_FALLBACKS]
+
+    chain: List[ExtractionBackend] = []
+    for name in dict.fromkeys(names):
+        backend = get_backend(name)
+        if backend is not None and required <= backend.capabilities:
+            chain.append(backend)
+
+    if not any(b.name == PypdfBackend.name for b in chain):
+        chain.append(get_backend(PypdfBackend.name))
+    return chain
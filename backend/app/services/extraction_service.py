@@ -1,12 +1,38 @@
-import io
-import pypdf
-from typing import Optional
-from app.clients.supabase import supabase
-from app.core.exceptions import ParsingError, StorageError
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, BinaryIO, Iterable
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import ParsingError
 from app.core.logging import logger
+from app.services.extraction_backends import CAP_TEXT, get_backend_chain
 
 class TextExtractionService:
-    BUCKET_NAME = "resumes"
+    # Dedicated pool so a bulk upload cannot starve the shared threadpool.
+    # Native backends (pymupdf, pdfium) release the GIL and run truly in parallel.
+    _pool: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    async def extract_text_in_pool(stream: BinaryIO, source: str = "upload") -> str:
+        """
+        `extract_text_from_stream` on the extraction pool (EXTRACTION_WORKERS threads),
+        awaited within the request deadline.
+        """
+        if TextExtractionService._pool is None:
+            TextExtractionService._pool = ThreadPoolExecutor(
+                max_workers=settings.EXTRACTION_WORKERS,
+                thread_name_prefix="pdf-extract"
+            )
+        loop = asyncio.get_running_loop()
+        return await Deadline.run(
+            loop.run_in_executor(
+                TextExtractionService._pool,
+                TextExtractionService.extract_text_from_stream,
+                stream,
+                source
+            ),
+            "extraction", settings.DEADLINE_MIN_EXTRACTION_SECONDS
+        )
 
     @staticmethod
     def _clean_text(text: str) -> str:
@@ -23,48 +49,43 @@ class TextExtractionService:
         return "\n".join(lines)
 
     @staticmethod
-    def extract_text_from_storage(file_path: str, client=None) -> str:
+    def extract_text_from_stream(
+        stream: BinaryIO,
+        source: str = "upload",
+        required_capabilities: Iterable[str] = (CAP_TEXT,)
+    ) -> str:
         """
-        Downloads PDF from Supabase Storage and extracts text content.
-        Uses pypdf for extraction and handles both text-based and empty/image PDFs gracefully.
+        Extracts text from a seekable PDF stream (e.g. a spooled upload buffer).
+        Avoids a storage round-trip when the bytes are already in memory.
+        Tries the configured backend chain in order and falls back on failure.
         """
-        logger.info(f"Starting text extraction for: {file_path}")
-        
-        target_client = client if client else supabase
+        last_error: Optional[Exception] = None
 
-        # 1. Download from Storage
-        try:
-            response = target_client.storage.from_(TextExtractionService.BUCKET_NAME).download(file_path)
-            if not response:
-                raise ValueError("Empty response from storage")
-            file_bytes = response
-        except Exception as e:
-            logger.error(f"Failed to download PDF from storage: {str(e)}")
-            raise StorageError(f"Could not retrieve file {file_path}")
+        for backend in get_backend_chain(required_capabilities):
+            try:
+                stream.seek(0)
+                pages = backend.extract_pages(stream)
+            except Exception as e:
+                logger.warning("%s extraction error for %s: %s", backend.name, source, e)
+                last_error = e
+                continue
 
-        # 2. Extract Text (pypdf)
-        try:
-            pdf_stream = io.BytesIO(file_bytes)
-            reader = pypdf.PdfReader(pdf_stream)
-            
             full_text = []
-            for i, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                if page_text:
+            for i, page_text in enumerate(pages):
+                if page_text and page_text.strip():
                     full_text.append(page_text)
                 else:
-                    logger.warning(f"Page {i+1} in {file_path} yielded no text (scanned image?)")
+                    logger.warning("Page %d in %s yielded no text (scanned image?)", i + 1, source)
 
             if not full_text:
-                logger.warning(f"No text extracted from {file_path}. Possibly an image-only PDF.")
+                logger.warning("No text extracted from %s. Possibly an image-only PDF.", source)
                 return ""
 
             raw_text = "\n\n".join(full_text)
             clean_text = TextExtractionService._clean_text(raw_text)
             
-            logger.info(f"Successfully extracted {len(clean_text)} characters from {file_path}")
+            logger.info("Successfully extracted %d characters from %s using %s", len(clean_text), source, backend.name)
             return clean_text
 
-        except Exception as e:
-            logger.error(f"pypdf extraction error for {file_path}: {str(e)}")
-            raise ParsingError("File content is corrupted or unreadable")
+        logger.error("All extraction backends failed for %s: %s", source, last_error)
+        raise ParsingError("File content is corrupted or unreadable")
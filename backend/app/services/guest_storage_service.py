@@ -0,0 +1,173 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import StorageError
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.repositories.storage import StorageRepository
+
+
+class GuestStorageService:
+    """
+    Lifecycle of guest uploads.
+
+    Guests have no DB rows, so their files are the only thing they leave behind.
+    They are stored under GUEST_STORAGE_PREFIX/<guest_id>/ and a background sweeper
+    deletes objects older than GUEST_STORAGE_TTL_SECONDS, listing and removing in
+    pages of GUEST_SWEEP_BATCH_SIZE. Every worker process may run the sweeper;
+    removals are idempotent.
+
+    Reported on /metrics: guest_storage.uploaded_* counters (growth), the
+    guest_storage.objects/bytes gauges (retained after the last sweep) and the
+    last sweep's throughput under "guest_storage_sweeper".
+    """
+
+    _task: Optional[asyncio.Task] = None
+    _last_sweep: Dict[str, Any] = {}
+
+    @staticmethod
+    def folder(guest_id: str) -> str:
+        return f"{settings.GUEST_STORAGE_PREFIX}/{guest_id}"
+
+    @staticmethod
+    def is_guest_path(path: str) -> bool:
+        return path.startswith(f"{settings.GUEST_STORAGE_PREFIX}/")
+
+    @staticmethod
+    def record_upload(path: str, size: int) -> None:
+        if GuestStorageService.is_guest_path(path):
+            metrics.inc("guest_storage.uploaded_objects")
+            metrics.inc("guest_storage.uploaded_bytes", size)
+
+    @classmethod
+    async def start(cls) -> None:
+        if not settings.GUEST_SWEEP_ENABLED:
+            return
+        if cls._task is not None and not cls._task.done():
+            return
+        cls._task = asyncio.create_task(cls._loop(), name="guest-storage-sweeper")
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task is None:
+            return
+        cls._task.cancel()
+        await asyncio.gather(cls._task, return_exceptions=True)
+        cls._task = None
+
+    @classmethod
+    async def _loop(cls) -> None:
+        while True:
+            try:
+                await cls.sweep()
+            except StorageError:
+                # Supabase not configured (local mode): nothing is stored, nothing to sweep
+                logger.info("Guest storage sweeper disabled: Supabase is not configured")
+                return
+            except Exception as e:
+                metrics.inc("guest_storage.sweep_errors")
+                logger.error(f"Guest storage sweep failed: {str(e)}")
+            await asyncio.sleep(settings.GUEST_SWEEP_INTERVAL_SECONDS)
+
+    @staticmethod
+    def _timestamp(entry: Dict[str, Any]) -> Optional[float]:
+        value = entry.get("updated_at") or entry.get("created_at")
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _size(entry: Dict[str, Any]) -> int:
+        return int((entry.get("metadata") or {}).get("size") or 0)
+
+    @classmethod
+    async def _list_all(cls, prefix: str, stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Every entry directly under `prefix`, one page of GUEST_SWEEP_BATCH_SIZE per call."""
+        entries: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            page = await StorageRepository.list(prefix, limit=settings.GUEST_SWEEP_BATCH_SIZE, offset=offset)
+            stats["list_calls"] += 1
+            entries.extend(page or [])
+            if not page or len(page) < settings.GUEST_SWEEP_BATCH_SIZE:
+                return entries
+            offset += len(page)
+
+    @classmethod
+    async def _remove(cls, batch: List[Tuple[str, int]], stats: Dict[str, Any]) -> None:
+        stats["remove_calls"] += 1
+        try:
+            await StorageRepository.remove([path for path, _ in batch])
+        except Exception as e:
+            # Left for the next sweep
+            metrics.inc("guest_storage.remove_errors")
+            logger.error(f"Failed to remove {len(batch)} guest objects: {str(e)}")
+            stats["objects_retained"] += len(batch)
+            stats["bytes_retained"] += sum(size for _, size in batch)
+            return
+        stats["objects_deleted"] += len(batch)
+        stats["bytes_deleted"] += sum(size for _, size in batch)
+
+    @classmethod
+    async def sweep(cls, now: Optional[float] = None) -> Dict[str, Any]:
+        """Deletes expired guest objects once. Returns (and publishes) the sweep's stats."""
+        started_at = time.perf_counter()
+        cutoff = (now or time.time()) - settings.GUEST_STORAGE_TTL_SECONDS
+        prefix = settings.GUEST_STORAGE_PREFIX
+        stats: Dict[str, Any] = {
+            "folders": 0, "objects_scanned": 0, "objects_deleted": 0, "bytes_deleted": 0,
+            "objects_retained": 0, "bytes_retained": 0, "list_calls": 0, "remove_calls": 0,
+        }
+
+        # Folders are listed completely before anything is removed: deleting a
+        # folder's last object also drops the folder and would shift the offsets.
+        folders = [entry["name"] for entry in await cls._list_all(prefix, stats) if entry.get("id") is None]
+        stats["folders"] = len(folders)
+
+        expired: List[Tuple[str, int]] = []
+        for folder in folders:
+            for entry in await cls._list_all(f"{prefix}/{folder}", stats):
+                if entry.get("id") is None:
+                    continue
+                stats["objects_scanned"] += 1
+                size = cls._size(entry)
+                modified = cls._timestamp(entry)
+                if modified is not None and modified < cutoff:
+                    expired.append((f"{prefix}/{folder}/{entry['name']}", size))
+                else:
+                    stats["objects_retained"] += 1
+                    stats["bytes_retained"] += size
+
+            # The folder is fully listed, so its expired objects can go now
+            while len(expired) >= settings.GUEST_SWEEP_BATCH_SIZE:
+                batch, expired = expired[:settings.GUEST_SWEEP_BATCH_SIZE], expired[settings.GUEST_SWEEP_BATCH_SIZE:]
+                await cls._remove(batch, stats)
+        if expired:
+            await cls._remove(expired, stats)
+
+        elapsed = time.perf_counter() - started_at
+        stats["duration_seconds"] = round(elapsed, 3)
+        stats["objects_per_second"] = round(stats["objects_scanned"] / elapsed, 1) if elapsed > 0 else None
+        stats["finished_at"] = time.time()
+
+        metrics.inc("guest_storage.sweeps")
+        metrics.inc("guest_storage.objects_deleted", stats["objects_deleted"])
+        metrics.inc("guest_storage.bytes_deleted", stats["bytes_deleted"])
+        metrics.set_gauge("guest_storage.objects", stats["objects_retained"])
+        metrics.set_gauge("guest_storage.bytes", stats["bytes_retained"])
+        cls._last_sweep = stats
+
+        logger.info(
+            f"Guest storage sweep: {stats['objects_deleted']}/{stats['objects_scanned']} objects deleted "
+            f"({stats['bytes_deleted']} bytes) in {stats['duration_seconds']}s"
+        )
+        return stats
+
+
+metrics.register("guest_storage_sweeper", lambda: dict(GuestStorageService._last_sweep))
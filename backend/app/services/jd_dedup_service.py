@@ -0,0 +1,124 @@
+import hashlib
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.lsh import MinHasher, MinHashLSH
+from app.core.metrics import metrics
+from app.schemas.ai import ScoreAnalysis
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass
+class JDFingerprint:
+    key: str  # sha256 of the normalised JD words
+    signature: Optional[np.ndarray]  # None when the JD has no words
+
+
+class JDDedupService:
+    """
+    Reuses Gemini analyses across near-duplicate job descriptions.
+
+    The same posting is often pasted with a tracking footer, reordered benefits
+    or different whitespace. JDs are reduced to word shingles and MinHash
+    signatures and indexed with banded LSH; a JD whose estimated Jaccard
+    similarity to an indexed one is at least JD_DEDUP_THRESHOLD reuses that JD's
+    analysis. The analysis also depends on the resume (keyword presence,
+    candidate YoE, suggestions), so analyses are stored per (resume digest, JD)
+    and only reused for the same resume text.
+    """
+
+    _hasher = MinHasher(num_perm=settings.JD_DEDUP_NUM_PERM)
+    _index = MinHashLSH(
+        threshold=settings.JD_DEDUP_THRESHOLD,
+        num_perm=settings.JD_DEDUP_NUM_PERM,
+        max_entries=settings.JD_DEDUP_MAX_ENTRIES
+    )
+    _analyses: LRUCache[ScoreAnalysis] = LRUCache(
+        max_entries=settings.JD_DEDUP_MAX_ENTRIES,
+        ttl_seconds=settings.JD_DEDUP_TTL_SECONDS
+    )
+    _stats = {"exact_hits": 0, "near_hits": 0, "misses": 0}
+
+    @staticmethod
+    def _words(job_description: str) -> List[str]:
+        return _WORD.findall(unicodedata.normalize("NFKC", job_description or "").casefold())
+
+    @staticmethod
+    def _shingles(words: List[str]) -> List[str]:
+        size = settings.JD_DEDUP_SHINGLE_WORDS
+        if len(words) <= size:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+    @classmethod
+    def fingerprint(cls, job_description: str) -> JDFingerprint:
+        words = cls._words(job_description)
+        key = hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+        return JDFingerprint(key=key, signature=cls._hasher.signature(cls._shingles(words)))
+
+    @staticmethod
+    def _resume_key(resume_text: str, version: int) -> str:
+        digest = hashlib.sha256((resume_text or "").encode("utf-8")).hexdigest()
+        return f"{digest}:{version}"
+
+    @classmethod
+    def lookup(cls, resume_text: str, fingerprint: JDFingerprint, version: int) -> Optional[ScoreAnalysis]:
+        """A copy of the analysis of this resume against this JD or a near-duplicate, or None."""
+        if not settings.JD_DEDUP_ENABLED or fingerprint.signature is None:
+            return None
+
+        resume_key = cls._resume_key(resume_text, version)
+        candidates: List[Tuple[str, float]] = [(fingerprint.key, 1.0)]
+        candidates += [(key, sim) for key, sim in cls._index.query(fingerprint.signature) if key != fingerprint.key]
+        for jd_key, similarity in candidates:
+            analysis = cls._analyses.get((resume_key, jd_key))
+            if analysis is None:
+                continue
+            if jd_key == fingerprint.key:
+                cls._stats["exact_hits"] += 1
+                metrics.inc("jd_dedup.exact_hits")
+            else:
+                cls._stats["near_hits"] += 1
+                metrics.inc("jd_dedup.near_hits")
+                logger.info("Reusing analysis of a near-duplicate JD (estimated similarity %.3f)", similarity)
+            # Callers get their own copy, as they would from a fresh call
+            return analysis.model_copy(deep=True)
+
+        cls._stats["misses"] += 1
+        metrics.inc("jd_dedup.misses")
+        return None
+
+    @classmethod
+    def remember(cls, resume_text: str, fingerprint: JDFingerprint, version: int, analysis: ScoreAnalysis) -> None:
+        if not settings.JD_DEDUP_ENABLED or fingerprint.signature is None:
+            return
+        cls._index.insert(fingerprint.key, fingerprint.signature)
+        cls._analyses.set((cls._resume_key(resume_text, version), fingerprint.key), analysis.model_copy(deep=True))
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        lookups = sum(cls._stats.values())
+        hits = cls._stats["exact_hits"] + cls._stats["near_hits"]
+        return {
+            "enabled": settings.JD_DEDUP_ENABLED,
+            "threshold": cls._index.threshold,
+            "num_perm": cls._index.num_perm,
+            "bands": cls._index.bands,
+            "rows": cls._index.rows,
+            "indexed_jds": len(cls._index),
+            "stored_analyses": len(cls._analyses),
+            **cls._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "near_hit_rate": round(cls._stats["near_hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+metrics.register("jd_dedup", JDDedupService.stats)
@@ -0,0 +1,322 @@
+import asyncio
+import contextlib
+import hashlib
+import re
+import time
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Pattern, Sequence, Set, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.embedding_store import EmbeddingStore
+from app.core.exceptions import NexusError
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.schemas.ai import KeywordPresence, ScoreAnalysis
+from app.schemas.resume import ParsedResume, ResumeSection
+from app.schemas.scoring import ATSScoreResult
+from app.services.ai_analysis_service import AIAnalysisService
+from app.services.ats_scoring_service import ATSScoringService
+from app.services.chunking_service import Chunk, ChunkingService
+from app.services.parsing_service import ResumeParsingService
+
+# Embeddings are pure functions of their text, so they are shared across sessions.
+# Kept quantized in one array (optionally memory-mapped) rather than as lists of floats.
+_embedding_cache = EmbeddingStore(
+    capacity=settings.EMBEDDING_STORE_CAPACITY,
+    dtype=settings.EMBEDDING_STORE_DTYPE,
+    path=settings.EMBEDDING_STORE_PATH or None
+)
+metrics.register("live_embedding_store", _embedding_cache.stats)
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _section_text(section: ResumeSection) -> str:
+    return "\n".join(([section.heading] if section.heading else []) + section.lines)
+
+
+async def _cached_embeddings(texts: List[str]) -> List[Sequence[float]]:
+    """Embeddings for `texts`; only the texts not cached yet hit the API, in one batched call."""
+    keys = [_digest(text) for text in texts]
+    vectors = dict(zip(keys, _embedding_cache.get_many(keys)))
+    missing = list(dict.fromkeys(text for key, text in zip(keys, texts) if vectors[key] is None))
+    if missing:
+        embedded = await AIAnalysisService.get_embeddings(missing)
+        _embedding_cache.put_many([_digest(text) for text in missing], embedded)
+        vectors.update(zip((_digest(text) for text in missing), embedded))
+    return [vectors[key] for key in keys]
+
+
+class LiveScoringSession:
+    """
+    Incremental rescoring of one resume against one job description.
+
+    The first call runs the full AI analysis once. Every later edit is diffed at
+    section level and only the changed sections get new keyword matches and
+    chunk embeddings; the JD analysis, JD chunk embeddings and unchanged sections are reused.
+    No generative-model call happens after the baseline.
+    """
+
+    def __init__(self, job_description: str):
+        self.job_description = job_description
+
+        self._analysis: Optional[ScoreAnalysis] = None
+        self._jd_chunks: List[Chunk] = []
+        self._jd_vectors: List[List[float]] = []
+        self._keywords: List[str] = []
+        self._patterns: Dict[str, Pattern] = {}
+        # Keywords the AI saw as present (synonyms, paraphrases) that plain matching cannot confirm
+        self._semantic_only: Set[str] = set()
+
+        self._section_hashes: Dict[str, str] = {}
+        self._section_matches: Dict[str, Set[str]] = {}  # section hash -> matched keywords
+        self._baseline_months: Optional[int] = None
+        self._baseline_yoe: Optional[float] = None
+
+    @property
+    def started(self) -> bool:
+        return self._analysis is not None
+
+    async def start(self, resume_text: str) -> Tuple[ATSScoreResult, List[str]]:
+        parsed = ResumeParsingService.get_or_parse(resume_text)
+
+        jd_chunks = ChunkingService.text_chunks(self.job_description)
+        analysis, jd_vectors = await asyncio.gather(
+            ATSScoringService._get_ai_analysis(
+                ResumeParsingService.to_prompt_text(parsed) or resume_text,
+                self.job_description
+            ),
+            _cached_embeddings([chunk.text for chunk in jd_chunks])
+        )
+        jd_analysis = analysis.jd_analysis
+        self._analysis = analysis
+        self._jd_chunks = jd_chunks
+        self._jd_vectors = jd_vectors
+
+        entries = jd_analysis.critical_keywords + jd_analysis.bonus_keywords
+        self._keywords = [entry.keyword for entry in entries if entry.keyword]
+        self._patterns = {
+            keyword: re.compile(rf"(?<!\w){re.escape(keyword)}(?!\w)", re.IGNORECASE)
+            for keyword in self._keywords
+        }
+
+        changed = self._diff_sections(parsed)
+        matched = self._matched_keywords(parsed)
+        self._semantic_only = {
+            entry.keyword for entry in entries
+            if entry.present_in_resume and entry.keyword not in matched
+        }
+
+        self._baseline_yoe = analysis.resume_analysis.candidate_yoe
+        self._baseline_months = parsed.total_experience_months
+
+        return await self._score(parsed, matched), changed
+
+    async def update(self, resume_text: str) -> Tuple[ATSScoreResult, List[str]]:
+        if not self.started:
+            raise NexusError("Live scoring session has not been started")
+
+        parsed = ResumeParsingService.get_or_parse(resume_text)
+        changed = self._diff_sections(parsed)
+        return await self._score(parsed, self._matched_keywords(parsed)), changed
+
+    def _diff_sections(self, parsed: ParsedResume) -> List[str]:
+        """Returns the ids ("experience:0", ...) of sections added, removed or edited since last time."""
+        hashes: Dict[str, str] = {}
+        seen: Dict[str, int] = {}
+        for section in parsed.sections:
+            index = seen.get(section.key, 0)
+            seen[section.key] = index + 1
+            hashes[f"{section.key}:{index}"] = _digest(_section_text(section))
+
+        changed = [sid for sid in hashes if self._section_hashes.get(sid) != hashes[sid]]
+        changed += [sid for sid in self._section_hashes if sid not in hashes]
+
+        # Keyword matches are recomputed for changed sections only
+        live = set(hashes.values())
+        for section in parsed.sections:
+            digest = _digest(_section_text(section))
+            if digest not in self._section_matches:
+                text = _section_text(section)
+                self._section_matches[digest] = {k for k, p in self._patterns.items() if p.search(text)}
+        for digest in list(self._section_matches):
+            if digest not in live:
+                del self._section_matches[digest]
+
+        self._section_hashes = hashes
+        return changed
+
+    def _matched_keywords(self, parsed: ParsedResume) -> Set[str]:
+        matched: Set[str] = set()
+        for section in parsed.sections:
+            matched |= self._section_matches.get(_digest(_section_text(section)), set())
+        return matched
+
+    async def _semantic_score(self, parsed: ParsedResume) -> Optional[float]:
+        # Section chunks, as in full scoring, so live and final scores agree
+        chunks = ChunkingService.resume_chunks(parsed)
+        if not chunks or not self._jd_chunks:
+            return 0.0
+
+        try:
+            # Only chunks whose text is new hit the embedding API
+            vectors = await _cached_embeddings([chunk.text for chunk in chunks])
+        except Exception as e:
+            logger.error(f"Live semantic scoring failed: {str(e)}")
+            return None  # the pushed score is flagged partial
+
+        return ATSScoringService.similarity_to_score(
+            ATSScoringService.chunk_similarity(
+                vectors, [chunk.weight for chunk in chunks],
+                self._jd_vectors, [chunk.weight for chunk in self._jd_chunks]
+            )
+        )
+
+    async def _score(self, parsed: ParsedResume, matched: Set[str]) -> ATSScoreResult:
+        jd_analysis = self._analysis.jd_analysis
+
+        def with_presence(entries: List[KeywordPresence]) -> List[KeywordPresence]:
+            return [
+                entry.model_copy(update={"present_in_resume": entry.keyword in matched or entry.keyword in self._semantic_only})
+                for entry in entries
+            ]
+
+        candidate_yoe = self._baseline_yoe
+        if candidate_yoe is not None and self._baseline_months is not None and parsed.total_experience_months is not None:
+            # Shift the AI's estimate by the experience the user added or removed
+            candidate_yoe = round(candidate_yoe + (parsed.total_experience_months - self._baseline_months) / 12, 1)
+
+        analysis_data = ScoreAnalysis(
+            jd_analysis=jd_analysis.model_copy(update={
+                "critical_keywords": with_presence(jd_analysis.critical_keywords),
+                "bonus_keywords": with_presence(jd_analysis.bonus_keywords),
+            }),
+            resume_analysis=self._analysis.resume_analysis.model_copy(update={"candidate_yoe": candidate_yoe}),
+        )
+
+        if self._analysis.repaired:
+            analysis_data.mark_repaired()
+
+        sem_score = await self._semantic_score(parsed)
+        return ATSScoringService.build_result(analysis_data, sem_score, parsed)
+
+
+class LiveScoringService:
+    """
+    Drives a live scoring session over a message channel (the WebSocket endpoint).
+
+    Client messages:
+        {"type": "start", "job_description": "...", "resume_text": "..."}
+        {"type": "edit", "resume_text": "..."}
+    Server messages:
+        {"type": "score", "result": {...}, "changed_sections": [...], "elapsed_ms": 12}
+        {"type": "error", "detail": "..."}
+
+    Edits are debounced: a score is pushed once the client has been quiet for
+    LIVE_SCORING_DEBOUNCE_MS, always for the latest text.
+
+    Every debounced re-score runs inside `admit()` (an admission slot); an
+    HTTPException from it skips that re-score with an error carrying `retry_after`,
+    and the next edit tries again.
+    """
+
+    @staticmethod
+    def flush() -> None:
+        """Persists the shared embedding store (when EMBEDDING_STORE_PATH is set)."""
+        _embedding_cache.flush()
+
+    @staticmethod
+    async def serve(
+        receive: Callable[[], Awaitable[Dict[str, Any]]],
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        debounce_seconds: Optional[float] = None,
+        admit: Optional[Callable[[], AsyncContextManager[None]]] = None
+    ) -> None:
+        debounce = debounce_seconds if debounce_seconds is not None else settings.LIVE_SCORING_DEBOUNCE_MS / 1000
+        session: Optional[LiveScoringSession] = None
+        latest_text: Optional[str] = None
+        edited = asyncio.Event()
+
+        async def scorer() -> None:
+            while True:
+                await edited.wait()
+                # Debounce: keep waiting while edits keep arriving
+                while True:
+                    edited.clear()
+                    try:
+                        await asyncio.wait_for(edited.wait(), timeout=debounce)
+                    except asyncio.TimeoutError:
+                        break
+
+                text = latest_text
+                started_at = time.perf_counter()
+                async with contextlib.AsyncExitStack() as stack:
+                    if admit is not None:
+                        try:
+                            await stack.enter_async_context(admit())
+                        except HTTPException as e:
+                            await send({
+                                "type": "error",
+                                "detail": e.detail,
+                                "retry_after": int((e.headers or {}).get("Retry-After", 0))
+                            })
+                            continue
+                    try:
+                        if session.started:
+                            result, changed = await session.update(text)
+                        else:
+                            result, changed = await session.start(text)
+                    except Exception as e:
+                        logger.error(f"Live scoring failed: {str(e)}")
+                        await send({"type": "error", "detail": "Failed to calculate ATS score"})
+                        continue
+
+                await send({
+                    "type": "score",
+                    "result": result.model_dump(),
+                    "changed_sections": changed,
+                    "elapsed_ms": int((time.perf_counter() - started_at) * 1000),
+                })
+
+        scorer_task: Optional[asyncio.Task] = None
+        try:
+            while True:
+                try:
+                    message = await receive()
+                except (ValueError, KeyError):
+                    # Not JSON, or a binary frame (no "text" key); the session stays open
+                    await send({"type": "error", "detail": "Messages must be JSON objects"})
+                    continue
+                if not isinstance(message, dict):
+                    await send({"type": "error", "detail": "Messages must be JSON objects"})
+                    continue
+                kind = message.get("type")
+                text = message.get("resume_text")
+
+                if kind == "start":
+                    job_description = message.get("job_description")
+                    if not job_description or not text:
+                        await send({"type": "error", "detail": "start requires job_description and resume_text"})
+                        continue
+                    if scorer_task:
+                        scorer_task.cancel()
+                    session = LiveScoringSession(job_description)
+                    scorer_task = asyncio.create_task(scorer())
+                elif kind == "edit":
+                    if session is None:
+                        await send({"type": "error", "detail": "Send a start message first"})
+                        continue
+                    if not text:
+                        await send({"type": "error", "detail": "edit requires resume_text"})
+                        continue
+                else:
+                    await send({"type": "error", "detail": f"Unknown message type: {kind}"})
+                    continue
+
+                latest_text = text
+                edited.set()
+        finally:
+            if scorer_task:
+                scorer_task.cancel()
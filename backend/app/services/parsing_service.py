@@ -0,0 +1,298 @@
+import hashlib
+import re
+import unicodedata
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import LRUCache
+from app.core.logging import logger
+from app.schemas.resume import ParsedResume, ResumeSection, ExperienceEntry
+
+# Canonical section keys and the headings (accent-free, lowercase) that map to them.
+# Covers the English and Portuguese headings we see in uploaded resumes.
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "summary": (
+        "summary", "professional summary", "profile", "professional profile", "about me", "about",
+        "objective", "career objective", "resumo", "resumo profissional", "perfil", "perfil profissional",
+        "sobre mim", "objetivo", "objetivo profissional",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience", "employment history", "work history",
+        "employment", "experiencia", "experiencias", "experiencia profissional", "experiencias profissionais",
+        "historico profissional",
+    ),
+    "education": (
+        "education", "academic background", "academic education", "formacao", "formacao academica",
+        "educacao", "escolaridade",
+    ),
+    "skills": (
+        "skills", "key skills", "technical skills", "core competencies", "competencies", "tech stack",
+        "additional skills", "additional skills / tools", "tools", "habilidades", "habilidades tecnicas",
+        "competencias", "competencias tecnicas", "conhecimentos", "conhecimentos tecnicos", "tecnologias",
+    ),
+    "projects": ("projects", "personal projects", "projetos", "projetos pessoais"),
+    "certifications": (
+        "certifications", "certificates", "licenses & certifications", "courses", "certificacoes",
+        "certificados", "cursos", "cursos e certificacoes",
+    ),
+    "languages": ("languages", "idiomas", "linguas"),
+    "references": ("references", "referencias"),
+}
+_HEADING_LOOKUP = {heading: key for key, headings in SECTION_HEADINGS.items() for heading in headings}
+
+BULLET_PREFIX = re.compile(r"^\s*(?:[•●▪◦‣∙·\-–—*>]|\d{1,2}[.)])\s+")
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "fev": 2, "mar": 3, "apr": 4, "abr": 4, "may": 5, "mai": 5, "jun": 6,
+    "jul": 7, "aug": 8, "ago": 8, "sep": 9, "set": 9, "oct": 10, "out": 10, "nov": 11, "dec": 12, "dez": 12,
+}
+_DATE = r"(?:(?P<{p}mon>jan|feb|fev|mar|apr|abr|may|mai|jun|jul|aug|ago|sep|set|oct|out|nov|dec|dez)[a-zç]*\.?\s*(?:de\s+)?|(?P<{p}num>\d{{1,2}})\s*/\s*)?(?P<{p}year>(?:19|20)\d{{2}})"
+_PRESENT = r"(?P<present>present|current|now|today|atual|atualmente|presente|hoje|o momento|momento)"
+DATE_RANGE = re.compile(
+    _DATE.format(p="s_") + r"\s*(?:-|–|—|to|ate|a)\s*(?:" + _DATE.format(p="e_") + "|" + _PRESENT + r")",
+    re.IGNORECASE
+)
+
+# Phones: a standalone run of 9+ characters of digits and separators. Not part of a
+# longer token ("01/2019") and not a year range ("2019 - 2023"), so dates survive.
+_PHONE = r"(?<![\w/])(?!(?:19|20)\d{2}\s*[-–—]\s*(?:19|20)\d{2}(?![\w/]))\+?\(?\d[\d\s().-]{7,}\d(?![\w/])"
+CONTACT_TOKEN = re.compile(
+    r"(\S+@\S+\.\S+|https?://\S+|www\.\S+|linkedin\.com/\S+|github\.com/\S+|" + _PHONE + ")",
+    re.IGNORECASE
+)
+# Contact details sit at the very top; header lines past these are passed through unchanged
+CONTACT_LINES = 4
+
+
+def _normalize(line: str) -> str:
+    line = re.sub(r"[‐‑‒–—―]", "-", line)
+    text = unicodedata.normalize("NFKD", line).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"\s+", " ", text).strip(" #:*_|\t").lower()
+
+
+class ResumeParsingService:
+    """
+    Local, heuristic resume parser (no LLM).
+    Splits raw text into sections, experience entries with date ranges, and bullets.
+    """
+    PARSER_VERSION = 1
+
+    _cache: LRUCache[ParsedResume] = LRUCache(max_entries=256)
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_or_parse(text: str, stored: Optional[Dict[str, Any]] = None) -> ParsedResume:
+        """
+        Returns the parse for `text`, computed at most once per content hash while it
+        stays in the in-process LRU. `stored` is the `parsed_content` of a resume row,
+        if it has one; it is reused when its hash and version match.
+        """
+        content_hash = ResumeParsingService.content_hash(text)
+
+        if stored and stored.get("content_hash") == content_hash and stored.get("version") == ResumeParsingService.PARSER_VERSION:
+            try:
+                parsed = ParsedResume.model_validate(stored)
+                ResumeParsingService._cache.set(content_hash, parsed)
+                return parsed
+            except Exception as e:
+                logger.warning(f"Stored parsed_content is invalid, re-parsing: {e}")
+
+        parsed = ResumeParsingService._cache.get(content_hash)
+        if parsed is None:
+            parsed = ResumeParsingService.parse(text, content_hash=content_hash)
+            ResumeParsingService._cache.set(content_hash, parsed)
+        return parsed
+
+    @staticmethod
+    def parse(text: str, content_hash: Optional[str] = None) -> ParsedResume:
+        lines = [line.strip() for line in (text or "").splitlines() if line.strip()]
+
+        sections: List[ResumeSection] = []
+        current = ResumeSection(key="header")
+        for line in lines:
+            key = ResumeParsingService._match_heading(line)
+            if key:
+                if current.lines or current.key != "header":
+                    sections.append(current)
+                current = ResumeSection(key=key, heading=line.strip(" #:*"))
+                continue
+
+            current.lines.append(line)
+            bullet = BULLET_PREFIX.match(line)
+            if bullet:
+                current.bullets.append(line[bullet.end():].strip())
+            elif current.bullets and line[:1].islower():
+                # PDF extraction wraps long bullets; lowercase starts are continuations
+                current.bullets[-1] = f"{current.bullets[-1]} {line}"
+        if current.lines or current.key != "header":
+            sections.append(current)
+
+        experience: List[ExperienceEntry] = []
+        for section in sections:
+            if section.key == "experience":
+                experience.extend(ResumeParsingService._parse_experience(section.lines))
+
+        return ParsedResume(
+            version=ResumeParsingService.PARSER_VERSION,
+            content_hash=content_hash or ResumeParsingService.content_hash(text),
+            word_count=len((text or "").split()),
+            sections=sections,
+            experience=experience,
+            total_experience_months=ResumeParsingService._total_months(experience)
+        )
+
+    @staticmethod
+    def section_text(parsed: ParsedResume, keys: Iterable[str]) -> str:
+        """Concatenates the lines of the requested sections, in document order."""
+        wanted = set(keys)
+        return "\n".join(line for s in parsed.sections if s.key in wanted for line in s.lines)
+
+    @staticmethod
+    def to_prompt_text(parsed: ParsedResume, exclude: Iterable[str] = ("references",)) -> str:
+        """
+        Compact rendering for LLM prompts: canonical headings, no contact details
+        (emails, phones, URLs) and no excluded sections. Contact details are only
+        removed from the first CONTACT_LINES lines: when no heading is recognised
+        the "header" is the whole resume, whose dates and bullets must survive.
+        """
+        excluded = set(exclude)
+        blocks = []
+        for section in parsed.sections:
+            if section.key in excluded:
+                continue
+            lines = section.lines
+            if section.key == "header":
+                lines = [
+                    ResumeParsingService._strip_contact(line) if index < CONTACT_LINES else line
+                    for index, line in enumerate(lines)
+                ]
+                lines = [line for line in lines if line]
+            if not lines:
+                continue
+            title = section.key.title() if section.key != "header" else None
+            blocks.append("\n".join(([f"## {title}"] if title else []) + lines))
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def _strip_contact(line: str) -> str:
+        scrubbed = CONTACT_TOKEN.sub("", line)
+        # Only tidy the separators a removed token leaves behind ("Name | | x"); untouched lines keep their bullets
+        return scrubbed.strip(" |,;•-") if scrubbed != line else line
+
+    @staticmethod
+    def _match_heading(line: str) -> Optional[str]:
+        if len(line) > 40 or BULLET_PREFIX.match(line):
+            return None
+        normalized = _normalize(line)
+        if normalized in _HEADING_LOOKUP:
+            return _HEADING_LOOKUP[normalized]
+        # ALL-CAPS short lines that start with a known heading ("EXPERIENCE & PROJECTS")
+        if line.isupper() and len(normalized.split()) <= 4:
+            for heading, key in _HEADING_LOOKUP.items():
+                if normalized.startswith(heading):
+                    return key
+        return None
+
+    @staticmethod
+    def _parse_experience(lines: List[str]) -> List[ExperienceEntry]:
+        entries: List[ExperienceEntry] = []
+        current: Optional[ExperienceEntry] = None
+        pending: List[str] = []  # non-bullet lines seen since the last bullet
+
+        for line in lines:
+            bullet = BULLET_PREFIX.match(line)
+            date_range = None if bullet else DATE_RANGE.search(_normalize(line))
+
+            if date_range:
+                start, end = ResumeParsingService._range_bounds(date_range)
+                current = ExperienceEntry(
+                    header=pending + [line],
+                    start=start,
+                    end=end,
+                    months=ResumeParsingService._months_between(start, end)
+                )
+                entries.append(current)
+                pending = []
+            elif bullet:
+                if current is None:
+                    current = ExperienceEntry(header=pending)
+                    entries.append(current)
+                    pending = []
+                elif pending:
+                    current.header.extend(pending)
+                    pending = []
+                current.bullets.append(line[bullet.end():].strip())
+            elif current is not None and current.bullets and line[:1].islower():
+                current.bullets[-1] = f"{current.bullets[-1]} {line}"
+            else:
+                pending.append(line)
+
+        if pending and current is not None:
+            current.header.extend(pending)
+        elif pending:
+            entries.append(ExperienceEntry(header=pending))
+        return entries
+
+    @staticmethod
+    def _range_bounds(match: re.Match) -> Tuple[Optional[str], Optional[str]]:
+        def bound(prefix: str) -> Optional[str]:
+            year = match.group(f"{prefix}year")
+            if not year:
+                return None
+            month = None
+            if match.group(f"{prefix}mon"):
+                month = _MONTHS.get(match.group(f"{prefix}mon")[:3].lower())
+            elif match.group(f"{prefix}num"):
+                month = int(match.group(f"{prefix}num"))
+                month = month if 1 <= month <= 12 else None
+            return f"{year}-{month:02d}" if month else year
+
+        end = "present" if match.group("present") else bound("e_")
+        return bound("s_"), end
+
+    @staticmethod
+    def _to_month_index(value: Optional[str], is_end: bool) -> Optional[int]:
+        if not value:
+            return None
+        if value == "present":
+            today = date.today()
+            return today.year * 12 + today.month - 1
+        year, _, month = value.partition("-")
+        # Year-only bounds cover the whole year
+        month_num = int(month) if month else (12 if is_end else 1)
+        return int(year) * 12 + month_num - 1
+
+    @staticmethod
+    def _months_between(start: Optional[str], end: Optional[str]) -> Optional[int]:
+        a = ResumeParsingService._to_month_index(start, is_end=False)
+        b = ResumeParsingService._to_month_index(end, is_end=True)
+        if a is None or b is None or b < a:
+            return None
+        return b - a + 1
+
+    @staticmethod
+    def _total_months(entries: List[ExperienceEntry]) -> Optional[int]:
+        """Total experience with overlapping roles merged."""
+        intervals = []
+        for entry in entries:
+            a = ResumeParsingService._to_month_index(entry.start, is_end=False)
+            b = ResumeParsingService._to_month_index(entry.end, is_end=True)
+            if a is not None and b is not None and b >= a:
+                intervals.append((a, b))
+        if not intervals:
+            return None
+
+        intervals.sort()
+        total = 0
+        cur_start, cur_end = intervals[0]
+        for a, b in intervals[1:]:
+            if a <= cur_end + 1:
+                cur_end = max(cur_end, b)
+            else:
+                total += cur_end - cur_start + 1
+                cur_start, cur_end = a, b
+        total += cur_end - cur_start + 1
+        return total
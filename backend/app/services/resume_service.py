@@ -1,55 +1,269 @@
+import asyncio
+import base64
+import json
+import os
+import re
 import uuid
-from typing import BinaryIO
+import zipfile
+import httpx
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
-from app.clients.supabase import supabase
+from starlette.concurrency import run_in_threadpool
+from app.clients.supabase import AsyncSupabaseClient
+from app.repositories.resumes import ResumeRepository
+from app.repositories.storage import StorageRepository
+from app.repositories.resume_text import ResumeTextRepository
 from app.core.config import settings
-from supabase import create_client, ClientOptions
-from app.schemas.resume import ResumeCreate, ResumeResponse
+from app.schemas.resume import BulkUploadItem, BulkUploadResponse, ResumeCreate, ResumeListItem, ResumeResponse
 from app.core.exceptions import NexusError, StorageError, ParsingError
 from app.core.logging import logger
+from app.core.cache import LRUCache
+from app.core.http_cache import RangeNotSatisfiable, etag_matches, is_single_range, make_etag, parse_range
+from app.core.uploads import SpooledUpload, spool_stream, spool_upload
+from app.services.guest_storage_service import GuestStorageService
 from app.services.extraction_service import TextExtractionService
+from app.services.parsing_service import ResumeParsingService
+
+@dataclass
+class ResumeDownload:
+    """A download ready to be sent: either an in-memory body or a chunk stream (or neither, for 304/416)."""
+    status_code: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[bytes] = None
+    stream: Optional[AsyncIterator[bytes]] = None
 
 class ResumeService:
     BUCKET_NAME = "resumes"
     ALLOWED_CONTENT_TYPE = "application/pdf"
-    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+    MAX_FILE_SIZE = settings.MAX_UPLOAD_SIZE  # 5 MB
+    ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+    _download_cache: LRUCache[Tuple[str, bytes]] = LRUCache(
+        max_entries=256,
+        max_bytes=settings.DOWNLOAD_CACHE_MAX_BYTES,
+        ttl_seconds=settings.DOWNLOAD_CACHE_TTL_SECONDS,
+        sizeof=lambda entry: len(entry[1])
+    )
+    _signed_urls: LRUCache[str] = LRUCache(max_entries=1024)
+
+    # Columns GET /resumes may project; the blobs are opt-in via `fields`
+    LIST_FIELDS = ("id", "user_id", "file_name", "file_path", "created_at", "updated_at", "parsed_content", "raw_text")
+    LIST_SUMMARY_FIELDS = ("id", "user_id", "file_name", "file_path", "created_at", "updated_at")
+
+    @staticmethod
+    def _storage_http() -> httpx.AsyncClient:
+        # Signed URLs live on the Supabase host, so they share its connection pool
+        return AsyncSupabaseClient.get_http_client()
+
+    @staticmethod
+    async def _signed_url(storage_path: str, file_name: str) -> str:
+        """Signed URLs are reused for most of their lifetime to skip a storage round-trip."""
+        url = ResumeService._signed_urls.get(storage_path)
+        if url:
+            return url
+
+        try:
+            url = await StorageRepository.create_signed_url(
+                storage_path,
+                settings.SIGNED_URL_TTL_SECONDS,
+                bucket=ResumeService.BUCKET_NAME
+            )
+            if not url:
+                raise ValueError("Storage returned no signed URL")
+        except Exception as e:
+            logger.error(f"Download failed for {storage_path}: {str(e)}")
+            if "not found" in str(e).lower():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Resume file '{file_name}' not found."
+                )
+            raise StorageError(detail="Failed to download file from storage")
+
+        # Expire well before the URL does
+        ResumeService._signed_urls.set(storage_path, url, ttl_seconds=settings.SIGNED_URL_TTL_SECONDS * 0.8)
+        return url
+
+    @staticmethod
+    def encode_cursor(row: Dict) -> str:
+        payload = json.dumps([row["created_at"], row["id"]]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, last_id = json.loads(base64.urlsafe_b64decode(padded))
+            # Validates both parts before they are placed in a PostgREST filter
+            datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+            return str(created_at), str(uuid.UUID(str(last_id)))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    @staticmethod
+    def _list_columns(fields: Optional[str]) -> List[str]:
+        if not fields:
+            return list(ResumeService.LIST_SUMMARY_FIELDS)
+
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in ResumeService.LIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(ResumeService.LIST_FIELDS)}."
+            )
+        # The keyset columns are always returned so the next cursor can be built
+        return ["id", "created_at"] + [name for name in requested if name not in ("id", "created_at")]
 
     @staticmethod
-    async def download_resume(user_id: str, file_name: str) -> bytes:
+    async def list_resumes(
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List[ResumeListItem], Optional[str]]:
         """
-        Downloads a resume from Supabase Storage.
+        One newest-first page of the user's resumes and the cursor for the next page (None on the last one).
+        Only summary columns are read unless `fields` asks for `raw_text` / `parsed_content`.
         """
-        storage_path = f"{user_id}/{file_name}"
-        
+        columns = ResumeService._list_columns(fields)
+        after = ResumeService.decode_cursor(cursor) if cursor else None
+
         try:
-            # Check if file exists (optional, but good for better error messages)
-            # For now, we try to download directly.
-            
-            res = supabase.storage.from_(ResumeService.BUCKET_NAME).download(storage_path)
-            
-            if not res:
-                raise ResourceNotFound(resource="Resume File", resource_id=file_name)
-                
-            return res
-            
-        except Exception as e:
-            # Supabase might raise different errors for not found vs other issues
-            # We assume generic 404 if it fails in a certain way, or log it.
+            uuid.UUID(user_id)
+        except ValueError:
+            # Non-UUID session ids can never own rows
+            return [], None
+
+        try:
+            # One extra row tells whether another page exists
+            rows = await ResumeRepository.list_page(user_id, limit + 1, after=after, columns=",".join(columns))
+        except StorageError:
+            # Supabase not configured (local guest mode): nothing is persisted
+            return [], None
+
+        next_cursor = ResumeService.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [ResumeListItem(**row) for row in rows[:limit]], next_cursor
+
+    @staticmethod
+    def _from_memory(etag: str, content: bytes, range_header: Optional[str], if_none_match: Optional[str]) -> "ResumeDownload":
+        headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+        if etag_matches(if_none_match, etag):
+            return ResumeDownload(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        size = len(content)
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{size}"
+            return ResumeDownload(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+        if byte_range is None:
+            headers["Content-Length"] = str(size)
+            return ResumeDownload(status_code=status.HTTP_200_OK, headers=headers, body=content)
+
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return ResumeDownload(status_code=status.HTTP_206_PARTIAL_CONTENT, headers=headers, body=content[start:end + 1])
+
+    @staticmethod
+    async def download_resume(
+        user_id: str,
+        file_name: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        guest: bool = False
+    ) -> "ResumeDownload":
+        """
+        Serves a resume from Supabase Storage without buffering it.
+
+        - Small, recently served files come from a bounded in-process cache.
+        - Otherwise the object is proxied chunk by chunk from a signed URL, forwarding
+          Range and If-None-Match so storage answers 206/304 itself.
+        """
+        if "/" in file_name or "\\" in file_name or ".." in file_name:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file name.")
+
+        storage_path = f"{ResumeService.storage_folder(user_id, guest)}/{file_name}"
+
+        cached = ResumeService._download_cache.get(storage_path)
+        if cached:
+            return ResumeService._from_memory(cached[0], cached[1], range_header, if_none_match)
+
+        url = await ResumeService._signed_url(storage_path, file_name)
+        upstream_headers = {}
+        if is_single_range(range_header):
+            upstream_headers["Range"] = range_header
+        if if_none_match:
+            upstream_headers["If-None-Match"] = if_none_match
+
+        client = ResumeService._storage_http()
+        try:
+            response = await client.send(client.build_request("GET", url, headers=upstream_headers), stream=True)
+        except httpx.HTTPError as e:
             logger.error(f"Download failed for {storage_path}: {str(e)}")
-            # If it's a specific storage error, re-raise as 404
-            if "not found" in str(e).lower() or "Object not found" in str(e):
-                 raise HTTPException(
+            raise StorageError(detail="Failed to download file from storage")
+
+        headers = {"Accept-Ranges": "bytes"}
+        for name in ("ETag", "Content-Length", "Content-Range", "Last-Modified"):
+            if name in response.headers:
+                headers[name] = response.headers[name]
+
+        if response.status_code in (
+            status.HTTP_304_NOT_MODIFIED,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        ):
+            await response.aclose()
+            return ResumeDownload(status_code=response.status_code, headers=headers)
+
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_206_PARTIAL_CONTENT):
+            await response.aclose()
+            logger.error(f"Download failed for {storage_path}: storage returned {response.status_code}")
+            if response.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_404_NOT_FOUND):
+                # The object may have been deleted since the URL was signed
+                ResumeService._signed_urls.pop(storage_path)
+                raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Resume file '{file_name}' not found."
                 )
             raise StorageError(detail="Failed to download file from storage")
 
+        content_length = int(response.headers.get("Content-Length") or 0)
+        cacheable = (
+            response.status_code == status.HTTP_200_OK
+            and 0 < content_length <= settings.DOWNLOAD_CACHE_MAX_FILE_SIZE
+        )
+
+        async def body() -> AsyncIterator[bytes]:
+            # Only files small enough for the cache are ever accumulated
+            collected = bytearray() if cacheable else None
+            try:
+                async for chunk in response.aiter_bytes(settings.DOWNLOAD_CHUNK_SIZE):
+                    if collected is not None:
+                        collected.extend(chunk)
+                    yield chunk
+            finally:
+                await response.aclose()
+
+            if collected is not None and len(collected) == content_length:
+                content = bytes(collected)
+                etag = headers.get("ETag") or make_etag(content)
+                ResumeService._download_cache.set(storage_path, (etag, content))
+
+        return ResumeDownload(status_code=response.status_code, headers=headers, stream=body())
+
+    @staticmethod
+    def invalidate_download(storage_path: str) -> None:
+        ResumeService._download_cache.pop(storage_path)
+
     @staticmethod
     async def validate_file(file: UploadFile) -> None:
         """
-        Validates file type and size.
-        Note: Actual size validation for streaming uploads is tricky in FastAPI without reading chunks.
-        We rely on Supabase Storage limits as a hard stop, but check content-type here.
+        Validates the declared content type.
+        Size and PDF signature are enforced while streaming (see `spool_upload`),
+        and oversized request bodies are cut off by `BodySizeLimitMiddleware`.
         """
         if file.content_type != ResumeService.ALLOWED_CONTENT_TYPE:
             raise HTTPException(
@@ -58,86 +272,252 @@ class ResumeService:
             )
 
     @staticmethod
-    async def upload_resume(user_id: str, file: UploadFile, jwt_token: str = None) -> ResumeResponse:
-        """
-        Orchestrates the resume upload workflow.
-        Handles both authenticated users and guest sessions (no DB persistence for guests).
-        """
-        await ResumeService.validate_file(file)
+    def storage_folder(user_id: str, guest: bool) -> str:
+        """Guest files live under GUEST_STORAGE_PREFIX, where the sweeper expires them."""
+        return GuestStorageService.folder(user_id) if guest else user_id
 
-        import re
-        safe_filename = re.sub(r'[^a-zA-Z0-9_.-]', '_', file.filename)
-        storage_path = f"{user_id}/{safe_filename}"
+    @staticmethod
+    def _safe_filename(filename: str) -> str:
+        return re.sub(r'[^a-zA-Z0-9_.-]', '_', filename)
 
-        # Determine if we should use a scoped client (Auth) or global (Guest)
-        client = supabase
-        if jwt_token:
+    @staticmethod
+    async def _ingest(
+        user_id: str,
+        upload: SpooledUpload,
+        file_name: str,
+        storage_path: str,
+        client
+    ) -> Tuple[ResumeResponse, bool]:
+        """
+        Stores a validated upload and extracts its text concurrently.
+        Returns the resume and whether the storage upload succeeded. Closes the upload.
+        """
+        async def store() -> bool:
+            # 1. Upload to Supabase Storage
             try:
-                client = create_client(
-                    settings.SUPABASE_URL,
-                    settings.SUPABASE_KEY,
-                    options=ClientOptions(headers={"Authorization": f"Bearer {jwt_token}"})
+                # Upsert ensures we don't fail on duplicate uploads for the same session
+                await StorageRepository.upload(
+                    storage_path,
+                    content,
+                    content_type=ResumeService.ALLOWED_CONTENT_TYPE,
+                    upsert=True,
+                    bucket=ResumeService.BUCKET_NAME,
+                    client=client
                 )
+                stored = True
             except Exception as e:
-                logger.warning(f"Failed to create scoped client: {e}. Falling back to global client.")
-                client = supabase
+                logger.error(f"Supabase Storage Upload Error: {str(e)}")
+                stored = False
 
-        try:
-            content = await file.read()
-            if len(content) > ResumeService.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="File too large. Maximum size is 5MB."
-                )
-        except Exception as e:
-            logger.error(f"Error reading file upload: {str(e)}")
-            raise HTTPException(status_code=500, detail="Could not read file content")
+            if stored:
+                GuestStorageService.record_upload(storage_path, len(content))
+            # Upserts reuse the path, so drop any cached copy of the previous file
+            ResumeService.invalidate_download(storage_path)
+            ResumeTextRepository.invalidate(user_id)
+            return stored
 
-        # 1. Upload to Supabase Storage
-        try:
-            # Upsert ensures we don't fail on duplicate uploads for the same session
-            res = client.storage.from_(ResumeService.BUCKET_NAME).upload(
-                path=storage_path,
-                file=content,
-                file_options={"content-type": "application/pdf", "upsert": "true"}
-            )
-        except Exception as e:
-            logger.error(f"Supabase Storage Upload Error: {str(e)}")
-            # Fallback: Proceed to text extraction even if storage fails (Guest Mode robustness)
-            logger.info("Proceeding to text extraction despite storage upload failure.")
+        async def extract() -> str:
+            # 2. Extract text straight from the spooled buffer (no storage round-trip)
+            try:
+                return await TextExtractionService.extract_text_in_pool(upload.rewind(), storage_path)
+            except ParsingError as e:
+                logger.error(f"In-memory PDF extraction failed: {e}")
+                return ""
 
-        # 2. Trigger Text Extraction
-        # Priority: Storage -> In-Memory Fallback
         try:
-            extracted_text = TextExtractionService.extract_text_from_storage(storage_path, client=client)
-        except Exception as e:
-            logger.warning(f"Storage extraction failed: {e}. Trying in-memory fallback.")
-            
-            # In-Memory Fallback using PyPDF2
-            from io import BytesIO
-            import PyPDF2
-            try:
-                reader = PyPDF2.PdfReader(BytesIO(content))
-                text = []
-                for page in reader.pages:
-                    text.append(page.extract_text())
-                extracted_text = "\n".join(text)
-            except Exception as pdf_err:
-                logger.error(f"In-memory PDF extraction failed: {pdf_err}")
-                extracted_text = ""
-
-        # 3. Return Response (Skip DB Persistence for Guests)
-        import uuid
-        from datetime import datetime
-        
-        return ResumeResponse(
+            # storage3 only accepts bytes or real file objects, so this is the single
+            # materialization of the (size-bounded) buffer.
+            content = upload.rewind().read()
+            # The storage upload (network) and extraction (worker thread) overlap
+            stored, extracted_text = await asyncio.gather(store(), extract())
+        finally:
+            upload.close()
+
+        # 3. Structured parse, deduped by content hash in ResumeParsingService's LRU.
+        # It is only returned here (no `resumes` row is written on upload); a row that
+        # carries it back as `parsed_content` is reused on reads while hash and version match.
+        parsed_content = {}
+        if extracted_text:
+            parsed_content = ResumeParsingService.get_or_parse(extracted_text).model_dump()
+
+        # 4. Return Response (Skip DB Persistence for Guests)
+        resume = ResumeResponse(
             id=uuid.uuid4(),
             user_id=uuid.UUID(user_id) if len(user_id) == 36 else uuid.uuid4(),
-            file_name=file.filename,
+            file_name=file_name,
             file_path=storage_path,
-            parsed_content={},
+            parsed_content=parsed_content,
             raw_text=extracted_text,
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
+        return resume, stored
+
+    @staticmethod
+    async def upload_resume(user_id: str, file: UploadFile, jwt_token: str = None) -> ResumeResponse:
+        """
+        Orchestrates the resume upload workflow.
+        Handles both authenticated users and guest sessions (no DB persistence for guests).
+        """
+        await ResumeService.validate_file(file)
+
+        folder = ResumeService.storage_folder(user_id, guest=jwt_token is None)
+        storage_path = f"{folder}/{ResumeService._safe_filename(file.filename)}"
+
+        # Stream the upload into a bounded spooled buffer.
+        # Size and PDF signature are enforced chunk by chunk; HTTPExceptions propagate as-is.
+        upload = await spool_upload(
+            file,
+            max_size=ResumeService.MAX_FILE_SIZE,
+            chunk_size=settings.UPLOAD_CHUNK_SIZE
+        )
+
+        # Determine if we should use a scoped client (Auth) or global (Guest)
+        client = await AsyncSupabaseClient.resolve(jwt_token)
+
+        # Storage failures are tolerated here: the extracted text is still returned (Guest Mode robustness)
+        resume, stored = await ResumeService._ingest(user_id, upload, file.filename, storage_path, client)
+        if not stored:
+            logger.info("Proceeding with extracted text despite storage upload failure.")
+        return resume
+
+    @staticmethod
+    def _is_zip(file: UploadFile) -> bool:
+        return (
+            file.content_type in ResumeService.ZIP_CONTENT_TYPES
+            or (file.filename or "").lower().endswith(".zip")
+        )
+
+    @staticmethod
+    async def bulk_upload(user_id: str, files: List[UploadFile], jwt_token: str = None) -> BulkUploadResponse:
+        """
+        Ingests many PDFs, given as separate files and/or ZIP archives.
+
+        - Files and archive members are read one at a time into bounded buffers;
+          archives are never loaded whole (Starlette already spooled them to disk).
+        - Up to BULK_UPLOAD_CONCURRENCY files are in flight: each is uploaded to
+          storage while its text is extracted on the extraction pool.
+        - Per-file (MAX_UPLOAD_SIZE) and per-request (BULK_UPLOAD_MAX_TOTAL_SIZE,
+          BULK_UPLOAD_MAX_FILES) limits fail the affected files, not the request.
+        """
+        client = await AsyncSupabaseClient.resolve(jwt_token)
+        folder = ResumeService.storage_folder(user_id, guest=jwt_token is None)
+        slots = asyncio.Semaphore(settings.BULK_UPLOAD_CONCURRENCY)
+        items: List[Optional[BulkUploadItem]] = []
+        tasks: List[asyncio.Task] = []
+        used_names: Dict[str, int] = {}
+        total_size = 0
+
+        def unique_path(file_name: str) -> str:
+            # Two files with the same name in one batch must not overwrite each other
+            safe = ResumeService._safe_filename(os.path.basename(file_name)) or "resume.pdf"
+            count = used_names.get(safe, 0)
+            used_names[safe] = count + 1
+            if count:
+                stem, ext = os.path.splitext(safe)
+                safe = f"{stem}-{count + 1}{ext}"
+            return f"{folder}/{safe}"
+
+        def fail(file_name: str, error: str) -> None:
+            items.append(BulkUploadItem(file_name=file_name, status="failed", error=error))
+
+        async def process(slot: int, upload: SpooledUpload) -> None:
+            try:
+                resume, stored = await ResumeService._ingest(
+                    user_id, upload, os.path.basename(upload.filename), unique_path(upload.filename), client
+                )
+                if not stored:
+                    items[slot] = BulkUploadItem(file_name=upload.filename, status="failed", size=upload.size, error="Storage upload failed")
+                else:
+                    items[slot] = BulkUploadItem(
+                        file_name=upload.filename,
+                        status="uploaded",
+                        size=upload.size,
+                        resume=resume,
+                        warning=None if resume.raw_text else "No text could be extracted (scanned or image-only PDF?)"
+                    )
+            except Exception as e:
+                logger.error(f"Bulk upload failed for {upload.filename}: {str(e)}")
+                items[slot] = BulkUploadItem(file_name=upload.filename, status="failed", size=upload.size, error="Processing failed")
+            finally:
+                slots.release()
+
+        async def admit(file_name: str, spool: Callable[[], Awaitable[SpooledUpload]]) -> None:
+            """Buffers one file (waiting for a free slot first) and starts processing it."""
+            nonlocal total_size
+            # Only files that were accepted for processing count; failed or skipped entries do not
+            if len(tasks) >= settings.BULK_UPLOAD_MAX_FILES:
+                fail(file_name, f"Too many files. A batch can hold at most {settings.BULK_UPLOAD_MAX_FILES} files.")
+                return
+            if total_size >= settings.BULK_UPLOAD_MAX_TOTAL_SIZE:
+                fail(file_name, "Batch size limit reached.")
+                return
+
+            await slots.acquire()
+            try:
+                upload = await spool()
+            except HTTPException as e:
+                slots.release()
+                fail(file_name, str(e.detail))
+                return
+            except Exception as e:
+                slots.release()
+                logger.error(f"Failed to read {file_name}: {str(e)}")
+                fail(file_name, "Could not read file.")
+                return
+
+            total_size += upload.size
+            if total_size > settings.BULK_UPLOAD_MAX_TOTAL_SIZE:
+                upload.close()
+                slots.release()
+                fail(file_name, "Batch size limit reached.")
+                return
+
+            items.append(None)  # filled in by process()
+            tasks.append(asyncio.create_task(process(len(items) - 1, upload)))
+
+        try:
+            for file in files:
+                file_name = file.filename or "upload"
+                if not ResumeService._is_zip(file):
+                    await admit(file_name, lambda file=file: spool_upload(
+                        file, max_size=ResumeService.MAX_FILE_SIZE, chunk_size=settings.UPLOAD_CHUNK_SIZE
+                    ))
+                    continue
+
+                try:
+                    archive = await run_in_threadpool(zipfile.ZipFile, file.file)
+                except (zipfile.BadZipFile, OSError):
+                    fail(file_name, "Invalid ZIP archive.")
+                    continue
+
+                with archive:
+                    for info in archive.infolist():
+                        member = info.filename
+                        if info.is_dir() or member.startswith("__MACOSX/") or os.path.basename(member).startswith("."):
+                            continue
+                        if not member.lower().endswith(".pdf"):
+                            fail(member, "Only PDF files are allowed.")
+                            continue
+
+                        def spool_member(info=info, member=member) -> Awaitable[SpooledUpload]:
+                            def read() -> SpooledUpload:
+                                with archive.open(info) as stream:
+                                    return spool_stream(
+                                        stream, member,
+                                        max_size=ResumeService.MAX_FILE_SIZE,
+                                        chunk_size=settings.UPLOAD_CHUNK_SIZE
+                                    )
+                            # Decompression is CPU work; keep it off the event loop
+                            return run_in_threadpool(read)
+
+                        await admit(member, spool_member)
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
+        uploaded = sum(1 for item in items if item.status == "uploaded")
+        return BulkUploadResponse(items=items, uploaded=uploaded, failed=len(items) - uploaded)
@@ -1,8 +1,51 @@
-from typing import List, Dict, Any
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from app.services.ai_analysis_service import AIAnalysisService
-from app.core.exceptions import AIProcessingError
+from app.services.parsing_service import CONTACT_TOKEN, ResumeParsingService
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.exceptions import AIProcessingError, DeadlineExceeded
 from app.core.logging import logger
-from app.schemas.analysis import RewriteResult, OptimizeResult
+from app.core.metrics import metrics
+from app.schemas.ai import BulletRewrite, OptimizedResume, SectionRewrite
+from app.schemas.analysis import RewriteResult, OptimizeResult, OptimizeMode
+from app.schemas.resume import ParsedResume
+
+# Output headings, in output order, for the parsed section keys we regenerate
+_SECTION_TITLES = {
+    "summary": "Professional Summary",
+    "skills": "Key Skills",
+    "experience": "Professional Experience",
+    "education": "Education",
+    "projects": "Projects",
+    "certifications": "Certifications",
+    "languages": "Languages",
+}
+
+_SECTION_INSTRUCTIONS = {
+    "summary": "Write a 3-4 sentence professional summary positioning the candidate for this job.",
+    "skills": (
+        "List the skills as short Markdown bullets grouped by theme (e.g. '- **Languages:** Python, Go'). "
+        "Add the missing critical and bonus skills the candidate can credibly claim from the resume."
+    ),
+    "experience": (
+        "Start with one line '### Title | Company | Dates' using the title, employer and dates exactly as written, "
+        "followed by 3-6 Markdown bullets ('- ') with strong action verbs and measurable impact aligned with the job description."
+    ),
+    "education": "Keep institutions, degrees and dates exactly as written; one Markdown bullet per entry.",
+}
+_DEFAULT_INSTRUCTIONS = "Keep every fact as written; tighten the wording and surface keywords relevant to the job description."
+
+
+@dataclass
+class SectionJob:
+    """One independently generated part of the optimized resume."""
+    key: str  # parsed section key; selects the output heading
+    name: str  # reported in OptimizeResult.failed_sections, e.g. "Professional Experience (2/3)"
+    source: str  # original text of this part, used as-is if generation fails
+    instructions: str
 
 class RewriteService:
     """
@@ -16,11 +59,23 @@ class RewriteService:
         job_description: str,
         missing_critical_skills: List[str],
         missing_bonus_skills: List[str],
-        suggestions: List[str]
+        suggestions: List[str],
+        mode: Optional[OptimizeMode] = None,
+        parsed: Optional[ParsedResume] = None
     ) -> OptimizeResult:
         """
         Generates a complete, rewritten resume optimized for the given job description.
+        In "sections" mode (OPTIMIZE_MODE) each section is generated concurrently
+        instead of in one long generation; see `_optimize_by_section`.
         """
+        if OptimizeMode(mode or settings.OPTIMIZE_MODE) == OptimizeMode.SECTIONS:
+            parsed = parsed or ResumeParsingService.get_or_parse(resume_text)
+            header, jobs = RewriteService._section_jobs(parsed)
+            if jobs:
+                return await RewriteService._optimize_by_section(
+                    parsed, header, jobs, job_description, missing_critical_skills, missing_bonus_skills, suggestions
+                )
+            logger.info("Resume sections not detected reliably, optimizing in a single generation")
         
         prompt = f"""
         You are working inside the Nexus Career AI project.
@@ -73,22 +128,170 @@ class RewriteService:
         """
         
         try:
-            response_data = await AIAnalysisService.run_prompt(
+            response = await AIAnalysisService.run_structured(
                 prompt=prompt,
+                response_model=OptimizedResume,
                 temperature=0.7
             )
             
-            return OptimizeResult(
-                optimized_resume_text=response_data.get("optimized_resume_text", "Failed to generate optimized text.")
-            )
+            return OptimizeResult(optimized_resume_text=response.optimized_resume_text)
             
         except AIProcessingError as e:
             logger.error(f"AI Optimization failed: {str(e)}")
             raise e
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in RewriteService: {str(e)}")
             raise AIProcessingError("Failed to generate optimized resume")
 
+    @staticmethod
+    def _section_jobs(parsed: ParsedResume) -> Tuple[str, List[SectionJob]]:
+        """
+        (Markdown header, jobs in output order): Summary and Key Skills always,
+        one job per experience role, then Education and the other known sections
+        present in the resume. The header (name and contact lines) is kept as written.
+        Returns no jobs, i.e. a single generation, when no experience section is
+        detected or the text before the first heading is more than name and contact
+        lines: that text would be neither rewritten nor passed through in order.
+        """
+        present = {section.key for section in parsed.sections if section.lines}
+        if "experience" not in present:
+            return "", []
+
+        header_lines = ResumeParsingService.section_text(parsed, ["header"]).splitlines()
+        name, contact = header_lines[:1], header_lines[1:]
+        if name and CONTACT_TOKEN.search(name[0]):
+            name, contact = [], header_lines
+        if any(not RewriteService._is_contact_line(line) for line in contact):
+            return "", []
+        header = "\n".join([f"# {line}" for line in name] + ([" | ".join(contact)] if contact else []))
+
+        jobs: List[SectionJob] = []
+        for key, title in _SECTION_TITLES.items():
+            instructions = _SECTION_INSTRUCTIONS.get(key, _DEFAULT_INSTRUCTIONS)
+            if key == "experience" and parsed.experience:
+                roles = parsed.experience
+                for number, role in enumerate(roles, start=1):
+                    heading = [f"### {' | '.join(role.header)}"] if role.header else []
+                    source = "\n".join(heading + [f"- {bullet}" for bullet in role.bullets])
+                    jobs.append(SectionJob(key, f"{title} ({number}/{len(roles)})", source, instructions))
+            elif key in present or key in ("summary", "skills"):
+                jobs.append(SectionJob(key, title, ResumeParsingService.section_text(parsed, [key]), instructions))
+        return header, jobs
+
+    @staticmethod
+    def _is_contact_line(line: str) -> bool:
+        """True if the line holds only contact details (emails, phones, URLs) and separators."""
+        return bool(CONTACT_TOKEN.search(line)) and not ResumeParsingService._strip_contact(line)
+
+    @staticmethod
+    async def _optimize_by_section(
+        parsed: ParsedResume,
+        header: str,
+        jobs: List[SectionJob],
+        job_description: str,
+        missing_critical_skills: List[str],
+        missing_bonus_skills: List[str],
+        suggestions: List[str]
+    ) -> OptimizeResult:
+        """
+        Generates every section concurrently (up to OPTIMIZE_SECTION_CONCURRENCY)
+        from one shared context header, then assembles the Markdown in order.
+        Latency is that of the longest section rather than of the whole resume.
+        Failed sections are retried on their own (OPTIMIZE_SECTION_RETRIES) while
+        the request deadline leaves room for another call; a section that still
+        fails is kept as written and reported in `failed_sections`.
+        """
+        context = f"""
+        You are working inside the Nexus Career AI project, rewriting a resume section by section so it is
+        optimized for ATS and tailored to the job description below. Other sections are written in parallel
+        from this same context, so write only the part you are asked for.
+        
+        Job description:
+        "{job_description}"
+        
+        Original resume:
+        "{ResumeParsingService.to_prompt_text(parsed)}"
+        
+        Identified gaps (critical and bonus skills):
+        Critical: {', '.join(missing_critical_skills)}
+        Bonus: {', '.join(missing_bonus_skills)}
+        
+        Improvement suggestions already generated:
+        {chr(10).join(['- ' + str(s) for s in suggestions])}
+        
+        Rules:
+        - Do NOT invent employers, titles, dates, degrees or numbers that are not in the original resume.
+        - Incorporate the suggestions and missing keywords where they fit this part naturally.
+        - Use clear, concise, ATS-friendly Markdown (no tables or graphics).
+        - Do NOT include placeholders like [Your Name].
+        """
+        semaphore = asyncio.Semaphore(settings.OPTIMIZE_SECTION_CONCURRENCY)
+
+        async def generate(job: SectionJob) -> str:
+            prompt = f"""{context}
+        Task:
+        Rewrite ONLY this part of the resume: {job.name}.
+        
+        Original text of this part:
+        "{job.source or '(not present in the original resume; write it from the rest of the resume)'}"
+        
+        {job.instructions}
+        
+        Output Requirements:
+        - Return a STRICT JSON object with a single field "markdown" holding the rewritten text.
+        - Do NOT include the "## {_SECTION_TITLES[job.key]}" heading; it is added when the resume is assembled.
+        """
+            async with semaphore:
+                response = await AIAnalysisService.run_structured(prompt=prompt, response_model=SectionRewrite, temperature=0.7)
+            if not response.markdown.strip():
+                raise AIProcessingError(f"AI returned no text for {job.name}")
+            lines = response.markdown.strip().splitlines()
+            # Level 1-2 headings belong to the assembled document, not to a section
+            if lines and lines[0].lstrip().startswith(("# ", "## ")):
+                lines = lines[1:]
+            return "\n".join(lines).strip()
+
+        started = time.perf_counter()
+        results: List[Any] = list(await asyncio.gather(*(generate(job) for job in jobs), return_exceptions=True))
+        for _ in range(settings.OPTIMIZE_SECTION_RETRIES):
+            failed = [i for i, result in enumerate(results) if isinstance(result, Exception)]
+            if not failed or not Deadline.allows(settings.DEADLINE_MIN_AI_SECONDS):
+                break
+            logger.warning(
+                "Retrying %d failed resume section(s): %s", len(failed), ", ".join(jobs[i].name for i in failed)
+            )
+            metrics.inc("optimize.sections.retried", len(failed))
+            retried = await asyncio.gather(*(generate(jobs[i]) for i in failed), return_exceptions=True)
+            for i, result in zip(failed, retried):
+                results[i] = result
+
+        failed_sections = [job.name for job, result in zip(jobs, results) if isinstance(result, Exception)]
+        if len(failed_sections) == len(jobs):
+            logger.error(f"AI Optimization failed for every section: {str(results[0])}")
+            if any(isinstance(result, DeadlineExceeded) for result in results):
+                raise DeadlineExceeded("optimize")
+            raise AIProcessingError("Failed to generate optimized resume")
+        metrics.inc("optimize.sections.generated", len(jobs) - len(failed_sections))
+        metrics.inc("optimize.sections.failed", len(failed_sections))
+
+        bodies: Dict[str, List[str]] = {}
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.warning("Keeping %s as written: %s", job.name, result)
+                result = job.source
+            if result:
+                bodies.setdefault(job.key, []).append(result)
+
+        blocks = [header] if header else []
+        blocks += [f"## {_SECTION_TITLES[key]}\n\n" + "\n\n".join(parts) for key, parts in bodies.items()]
+        logger.info(
+            "Optimized resume in %d sections in %.2fs (%d kept as written)",
+            len(jobs), time.perf_counter() - started, len(failed_sections)
+        )
+        return OptimizeResult(optimized_resume_text="\n\n".join(blocks), failed_sections=failed_sections)
+
     @staticmethod
     async def rewrite_bullet_point(
         original_text: str,
@@ -125,16 +328,17 @@ class RewriteService:
         """
 
         try:
-            response_data = await AIAnalysisService.run_prompt(
+            response = await AIAnalysisService.run_structured(
                 prompt=prompt,
+                response_model=BulletRewrite,
                 temperature=0.4  # Lower temperature for deterministic/conservative output
             )
 
             return RewriteResult(
                 original_text=original_text,
-                rewritten_text=response_data.get("rewritten_text", original_text),
-                explanation=response_data.get("explanation", "No explanation provided."),
-                applied_keywords=response_data.get("applied_keywords", [])
+                rewritten_text=response.rewritten_text or original_text,
+                explanation=response.explanation,
+                applied_keywords=response.applied_keywords
             )
 
         except AIProcessingError as e:
@@ -145,6 +349,8 @@ class RewriteService:
                 explanation="AI optimization unavailable at the moment.",
                 applied_keywords=[]
             )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Unexpected error in RewriteService: {str(e)}")
             raise AIProcessingError("Failed to generate rewrite suggestion")
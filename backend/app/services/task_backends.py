@@ -0,0 +1,343 @@
+import heapq
+import itertools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# Task states. "queued" and "running" are live; the other two are final.
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINAL_STATES = frozenset({SUCCEEDED, FAILED})
+
+
+@dataclass
+class Task:
+    id: str
+    type: str
+    user_id: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = 1
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # Earliest time the task may be claimed: the retry delay while queued,
+    # the lease expiry while running.
+    run_after: float = 0.0
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def new(cls, task_type: str, user_id: str, payload: Dict[str, Any], max_attempts: int) -> "Task":
+        now = time.time()
+        return cls(
+            id=str(uuid.uuid4()),
+            type=task_type,
+            user_id=user_id,
+            payload=payload,
+            max_attempts=max_attempts,
+            run_after=now,
+            created_at=now,
+            updated_at=now
+        )
+
+
+class TaskBackend(ABC):
+    """
+    Storage for background tasks.
+
+    `claim` must be atomic: a task is handed to one worker at a time. A claimed
+    task holds a lease until `run_after`; if its worker dies the task becomes
+    claimable again once the lease expires (or fails if it has no attempts left).
+    """
+    name: str = ""
+
+    @abstractmethod
+    async def put(self, task: Task) -> None:
+        ...
+
+    @abstractmethod
+    async def put_limited(self, task: Task, max_active: int) -> bool:
+        """
+        Stores a new task unless its user already has `max_active` queued or
+        running tasks. Check and insert are atomic. Returns whether it was stored.
+        """
+        ...
+
+    @abstractmethod
+    async def get(self, task_id: str) -> Optional[Task]:
+        ...
+
+    @abstractmethod
+    async def save(self, task: Task) -> None:
+        """Persists a state change made by the worker that holds the task."""
+        ...
+
+    @abstractmethod
+    async def claim(self, lease_seconds: float) -> Optional[Task]:
+        ...
+
+    @abstractmethod
+    async def purge(self, finished_before: float) -> int:
+        """Deletes final tasks last updated before the given time. Returns the count."""
+        ...
+
+    @staticmethod
+    def _lease(task: Task, now: float, lease_seconds: float) -> Optional[Task]:
+        """Applies a claim to a claimable task; None when its lease ran out with no attempts left."""
+        if task.status == RUNNING and task.attempts >= task.max_attempts:
+            task.status = FAILED
+            task.error = task.error or "Task did not finish before its lease expired"
+            task.updated_at = now
+            return None
+
+        task.status = RUNNING
+        task.attempts += 1
+        task.run_after = now + lease_seconds
+        task.updated_at = now
+        return task
+
+
+class InMemoryTaskBackend(TaskBackend):
+    """
+    Default backend. Tasks live in this process only and are lost on restart.
+    Claimable tasks are kept in a heap ordered by `run_after`; stale heap entries are skipped.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._tasks: Dict[str, Task] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _schedule(self, task: Task) -> None:
+        heapq.heappush(self._heap, (task.run_after, next(self._seq), task.id))
+
+    async def put(self, task: Task) -> None:
+        with self._lock:
+            self._tasks[task.id] = task
+            self._schedule(task)
+
+    async def put_limited(self, task: Task, max_active: int) -> bool:
+        with self._lock:
+            active = sum(
+                1 for existing in self._tasks.values()
+                if existing.user_id == task.user_id and existing.status not in FINAL_STATES
+            )
+            if active >= max_active:
+                return False
+            self._tasks[task.id] = task
+            self._schedule(task)
+            return True
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            # Copies keep readers from seeing a task mid-update
+            return Task(**{**task.__dict__, "payload": dict(task.payload)}) if task else None
+
+    async def save(self, task: Task) -> None:
+        with self._lock:
+            self._tasks[task.id] = task
+            if task.status not in FINAL_STATES:
+                self._schedule(task)
+
+    async def claim(self, lease_seconds: float) -> Optional[Task]:
+        now = time.time()
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                run_after, _, task_id = heapq.heappop(self._heap)
+                task = self._tasks.get(task_id)
+                if task is None or task.status in FINAL_STATES or task.run_after != run_after:
+                    continue
+                if self._lease(task, now, lease_seconds) is None:
+                    continue
+                self._schedule(task)  # lease expiry
+                return Task(**task.__dict__)
+        return None
+
+    async def purge(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [
+                task_id for task_id, task in self._tasks.items()
+                if task.status in FINAL_STATES and task.updated_at < finished_before
+            ]
+            for task_id in expired:
+                del self._tasks[task_id]
+        return len(expired)
+
+
+class SQLiteTaskBackend(TaskBackend):
+    """
+    Local durable backend (TASK_QUEUE_SQLITE_PATH). Tasks survive restarts and
+    can be shared by several worker processes on the same machine.
+    """
+    name = "sqlite"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            result TEXT,
+            error TEXT,
+            run_after REAL NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (status, run_after);
+        CREATE INDEX IF NOT EXISTS idx_tasks_user ON tasks (user_id, status);
+    """
+    _COLUMNS = (
+        "id", "type", "user_id", "payload", "status", "attempts", "max_attempts",
+        "result", "error", "run_after", "created_at", "updated_at"
+    )
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.TASK_QUEUE_SQLITE_PATH
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self._SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_row(task: Task) -> Tuple:
+        return (
+            task.id, task.type, task.user_id, json.dumps(task.payload), task.status,
+            task.attempts, task.max_attempts,
+            json.dumps(task.result) if task.result is not None else None,
+            task.error, task.run_after, task.created_at, task.updated_at
+        )
+
+    @staticmethod
+    def _from_row(row: Tuple) -> Task:
+        values = dict(zip(SQLiteTaskBackend._COLUMNS, row))
+        values["payload"] = json.loads(values["payload"])
+        values["result"] = json.loads(values["result"]) if values["result"] is not None else None
+        return Task(**values)
+
+    def _upsert(self, task: Task) -> None:
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                self._to_row(task)
+            )
+
+    def _put_limited(self, task: Task, max_active: int) -> bool:
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            # IMMEDIATE: concurrent enqueues from other processes cannot both pass the count
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (active,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE user_id = ? AND status IN (?, ?)",
+                    (task.user_id, QUEUED, RUNNING)
+                ).fetchone()
+                if active >= max_active:
+                    self._conn.execute("COMMIT")
+                    return False
+                self._conn.execute(
+                    f"INSERT INTO tasks ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                    self._to_row(task)
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get(self, task_id: str) -> Optional[Task]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def _claim(self, lease_seconds: float) -> Optional[Task]:
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so other processes cannot claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        f"SELECT {', '.join(self._COLUMNS)} FROM tasks "
+                        "WHERE status IN (?, ?) AND run_after <= ? ORDER BY run_after LIMIT 1",
+                        (QUEUED, RUNNING, now)
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    task = self._from_row(row)
+                    claimed = self._lease(task, now, lease_seconds)
+                    self._conn.execute(
+                        "UPDATE tasks SET status = ?, attempts = ?, error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                        (task.status, task.attempts, task.error, task.run_after, task.updated_at, task.id)
+                    )
+                    if claimed is not None:
+                        self._conn.execute("COMMIT")
+                        return claimed
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _purge(self, finished_before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, finished_before)
+            )
+            return cursor.rowcount
+
+    async def put(self, task: Task) -> None:
+        await run_in_threadpool(self._upsert, task)
+
+    async def put_limited(self, task: Task, max_active: int) -> bool:
+        return await run_in_threadpool(self._put_limited, task, max_active)
+
+    async def get(self, task_id: str) -> Optional[Task]:
+        return await run_in_threadpool(self._get, task_id)
+
+    async def save(self, task: Task) -> None:
+        await run_in_threadpool(self._upsert, task)
+
+    async def claim(self, lease_seconds: float) -> Optional[Task]:
+        return await run_in_threadpool(self._claim, lease_seconds)
+
+    async def purge(self, finished_before: float) -> int:
+        return await run_in_threadpool(self._purge, finished_before)
+
+
+BACKENDS: Dict[str, Type[TaskBackend]] = {
+    InMemoryTaskBackend.name: InMemoryTaskBackend,
+    SQLiteTaskBackend.name: SQLiteTaskBackend,
+}
+
+
+def get_backend(name: Optional[str] = None) -> TaskBackend:
+    """Instantiates the configured backend (TASK_QUEUE_BACKEND), falling back to in-memory."""
+    name = name or settings.TASK_QUEUE_BACKEND
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        logger.warning(f"Unknown task queue backend '{name}', using '{InMemoryTaskBackend.name}'")
+        backend_cls = InMemoryTaskBackend
+    return backend_cls()
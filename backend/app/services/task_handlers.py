@@ -0,0 +1,32 @@
+from typing import Any, Dict
+
+from app.schemas.analysis import AnalysisRequest, OptimizeRequest
+from app.services.analysis_workflow_service import AnalysisWorkflowService
+from app.services.task_queue_service import TaskQueueService
+
+
+class TaskHandlers:
+    """
+    Background versions of /analysis/score and /analysis/optimize.
+    Payloads are {"request": <request body>, ...} as stored by the /tasks endpoints.
+    """
+
+    @staticmethod
+    async def score(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        request = AnalysisRequest.model_validate(payload["request"])
+        persisted = bool(payload.get("persist"))
+
+        outcome = await AnalysisWorkflowService.score(request, user_id, persisted=persisted)
+        if persisted and not outcome.from_store:
+            await outcome.persist(user_id, request)
+        return outcome.result.model_dump()
+
+    @staticmethod
+    async def optimize(user_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        request = OptimizeRequest.model_validate(payload["request"])
+        result = await AnalysisWorkflowService.optimize(request, user_id)
+        return result.model_dump()
+
+
+TaskQueueService.register("score", TaskHandlers.score)
+TaskQueueService.register("optimize", TaskHandlers.optimize)
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.exceptions import NexusError
+from app.core.logging import logger
+from app.core.metrics import metrics
+from app.services.task_backends import FAILED, FINAL_STATES, QUEUED, SUCCEEDED, Task, TaskBackend, get_backend
+
+# (user_id, payload) -> JSON-serialisable result
+TaskHandler = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class TaskQueueService:
+    """
+    Background execution of long AI calls (scoring, optimisation).
+
+    POST endpoints enqueue a task and return its id at once; a pool of
+    TASK_WORKERS coroutines claims tasks from the configured backend, runs the
+    registered handler and retries failures with exponential backoff.
+    Clients poll GET /tasks/{id} or follow GET /tasks/{id}/events (SSE).
+
+    Admission control only covers the enqueue request, so each user is also
+    limited to TASK_MAX_ACTIVE_PER_USER queued or running tasks.
+    """
+
+    _handlers: Dict[str, TaskHandler] = {}
+    _backend: Optional[TaskBackend] = None
+    _workers: List[asyncio.Task] = []
+    _wakeup: Optional[asyncio.Event] = None
+    _changed: Optional[asyncio.Condition] = None
+    _last_purge: float = 0.0
+
+    @classmethod
+    def register(cls, task_type: str, handler: TaskHandler) -> None:
+        cls._handlers[task_type] = handler
+
+    @classmethod
+    def backend(cls) -> TaskBackend:
+        if cls._backend is None:
+            cls._backend = get_backend()
+        return cls._backend
+
+    @classmethod
+    async def start(cls) -> None:
+        """Starts the worker pool (idempotent; also called lazily by `enqueue`)."""
+        if cls._workers and not all(worker.done() for worker in cls._workers):
+            return
+        cls._wakeup = asyncio.Event()
+        cls._changed = asyncio.Condition()
+        cls._workers = [
+            asyncio.create_task(cls._worker(index), name=f"task-worker-{index}")
+            for index in range(settings.TASK_WORKERS)
+        ]
+        logger.info(f"Task queue started: {settings.TASK_WORKERS} workers on '{cls.backend().name}' backend")
+
+    @classmethod
+    async def stop(cls) -> None:
+        for worker in cls._workers:
+            worker.cancel()
+        await asyncio.gather(*cls._workers, return_exceptions=True)
+        cls._workers = []
+
+    @classmethod
+    async def enqueue(cls, task_type: str, user_id: str, payload: Dict[str, Any]) -> Task:
+        if task_type not in cls._handlers:
+            raise NexusError(f"Unknown task type: {task_type}")
+
+        task = Task.new(task_type, user_id, payload, max_attempts=settings.TASK_MAX_ATTEMPTS)
+        if settings.TASK_MAX_ACTIVE_PER_USER:
+            if not await cls.backend().put_limited(task, settings.TASK_MAX_ACTIVE_PER_USER):
+                metrics.inc("tasks.rejected_active_limit")
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"At most {settings.TASK_MAX_ACTIVE_PER_USER} tasks can be queued or running at once",
+                    headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+                )
+        else:
+            await cls.backend().put(task)
+        metrics.inc(f"tasks.enqueued.{task_type}")
+
+        await cls.start()
+        cls._wakeup.set()
+        return task
+
+    @classmethod
+    async def get(cls, task_id: str, user_id: str) -> Optional[Task]:
+        """Returns the task if it exists and belongs to the user."""
+        task = await cls.backend().get(task_id)
+        if task is None or task.user_id != user_id:
+            return None
+        return task
+
+    @classmethod
+    async def events(cls, task_id: str, user_id: str) -> AsyncIterator[Task]:
+        """
+        Yields the task every time its state changes, ending after a final state.
+        Local changes wake subscribers at once; changes made by other processes
+        (SQLite backend) are seen within TASK_POLL_INTERVAL_SECONDS.
+        """
+        await cls.start()
+        last = None
+        while True:
+            task = await cls.get(task_id, user_id)
+            if task is None:
+                return
+
+            state = (task.status, task.attempts, task.updated_at)
+            if state != last:
+                last = state
+                yield task
+            if task.status in FINAL_STATES:
+                return
+
+            async with cls._changed:
+                try:
+                    await asyncio.wait_for(cls._changed.wait(), timeout=settings.TASK_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    @classmethod
+    async def _notify(cls) -> None:
+        async with cls._changed:
+            cls._changed.notify_all()
+
+    @classmethod
+    async def _worker(cls, index: int) -> None:
+        backend = cls.backend()
+        while True:
+            # Cleared before claiming so an enqueue during the claim is not missed
+            cls._wakeup.clear()
+            try:
+                task = await backend.claim(settings.TASK_LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"Task worker {index} failed to claim: {str(e)}")
+                task = None
+
+            if task is None:
+                await cls._purge_finished()
+                try:
+                    await asyncio.wait_for(cls._wakeup.wait(), timeout=settings.TASK_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await cls._run(task)
+
+    @classmethod
+    async def _run(cls, task: Task) -> None:
+        await cls._notify()  # now running
+        started_at = time.perf_counter()
+
+        handler = cls._handlers.get(task.type)
+        try:
+            if handler is None:
+                raise NexusError(f"No handler registered for task type '{task.type}'")
+            task.result = await handler(task.user_id, task.payload)
+            task.status = SUCCEEDED
+            task.error = None
+            metrics.inc(f"tasks.succeeded.{task.type}")
+        except Exception as e:
+            task.error = cls._describe(e)
+            if cls._is_retryable(e) and task.attempts < task.max_attempts:
+                delay = settings.TASK_RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+                task.status = QUEUED
+                task.run_after = time.time() + delay
+                metrics.inc(f"tasks.retried.{task.type}")
+                logger.warning(f"Task {task.id} ({task.type}) attempt {task.attempts} failed, retrying in {delay:.1f}s: {str(e)}")
+            else:
+                task.status = FAILED
+                metrics.inc(f"tasks.failed.{task.type}")
+                logger.error(f"Task {task.id} ({task.type}) failed after {task.attempts} attempts: {str(e)}")
+
+        task.updated_at = time.time()
+        metrics.inc("tasks.run_seconds", time.perf_counter() - started_at)
+        try:
+            await cls.backend().save(task)
+        except Exception as e:
+            # The lease expires and the task is picked up again
+            logger.error(f"Failed to save task {task.id}: {str(e)}")
+        await cls._notify()
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        # Client errors (missing resume, bad input) fail the same way every time
+        if isinstance(exc, HTTPException):
+            return exc.status_code >= 500
+        return True
+
+    @staticmethod
+    def _describe(exc: Exception) -> str:
+        if isinstance(exc, HTTPException):
+            return str(exc.detail)
+        if isinstance(exc, NexusError):
+            return exc.message
+        return "Internal error"
+
+    @classmethod
+    async def _purge_finished(cls) -> None:
+        now = time.time()
+        if now - cls._last_purge < 60:
+            return
+        cls._last_purge = now
+        try:
+            removed = await cls.backend().purge(now - settings.TASK_RESULT_TTL_SECONDS)
+            if removed:
+                logger.info(f"Purged {removed} finished tasks")
+        except Exception as e:
+            logger.warning(f"Task purge failed: {str(e)}")
@@ -0,0 +1,127 @@
+"""
+Embedding store benchmark: memory saved and accuracy lost by the quantized
+EmbeddingStore relative to float32.
+
+Usage (from backend/):
+    python -m benchmarks.bench_embedding_store [--vectors 20000] [--dim 768] [--queries 200]
+
+Vectors are synthetic but embedding-like: unit-norm points scattered around a
+few hundred topic centres, so nearest neighbours are meaningful. Reported:
+
+- bytes per vector for Python lists (measured on a sample), a float32 array and
+  each store dtype (vectors plus the per-row scale/norm);
+- reconstruction cosine (stored vs original vector) and mean absolute error of
+  cosine scores;
+- recall@k of `search_many` against exact float32 search, and latency per
+  query for one batched call ("batch") and for one-query calls ("single");
+- a check that `view` returns memory shared with the (memory-mapped) store.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.core.embedding_store import DTYPES, EmbeddingStore
+
+
+def _vectors(count: int, dim: int, seed: int = 7) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, count // 100), dim))
+    vectors = centres[rng.integers(0, len(centres), count)] + 0.6 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _list_bytes_per_vector(vectors: np.ndarray, sample: int = 500) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    as_lists = [row.tolist() for row in vectors[:sample]]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del as_lists
+    return used / min(sample, len(vectors))
+
+
+def _exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = _vectors(args.vectors, args.dim)
+    keys = [f"v{i}" for i in range(len(vectors))]
+    queries = _vectors(args.queries, args.dim, seed=11)
+    exact = _exact_top_k(vectors, queries, args.k)
+
+    list_bytes = _list_bytes_per_vector(vectors)
+    float32_bytes = vectors.nbytes / len(vectors)
+    print(f"{args.vectors} vectors x {args.dim} dims, {args.queries} queries, recall@{args.k}\n")
+    print(
+        f"{'layout':<10}{'bytes/vec':>11}{'vs lists':>10}{'vs f32':>8}{'recon cos':>11}{'score err':>11}"
+        f"{'recall':>8}{'ms batch':>10}{'ms single':>11}"
+    )
+    print(f"{'lists':<10}{list_bytes:>11,.0f}{1:>9.1f}x{float32_bytes / list_bytes:>7.2f}x" + "-".rjust(11) * 2 + "-".rjust(8) + "-".rjust(10) + "-".rjust(11))
+
+    started = time.perf_counter()
+    _exact_top_k(vectors, queries, args.k)
+    batch_ms = (time.perf_counter() - started) / len(queries) * 1000
+    started = time.perf_counter()
+    for query in queries:
+        _exact_top_k(vectors, query[None, :], args.k)
+    single_ms = (time.perf_counter() - started) / len(queries) * 1000
+    print(
+        f"{'float32':<10}{float32_bytes:>11,.0f}{list_bytes / float32_bytes:>9.1f}x{1:>7.2f}x{1:>11.5f}{0:>11.4f}"
+        f"{1:>8.3f}{batch_ms:>10.2f}{single_ms:>11.2f}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in DTYPES:
+            store = EmbeddingStore(capacity=len(vectors), dtype=dtype, path=os.path.join(tmp, dtype))
+            store.put_many(keys, vectors)
+            store.flush()
+
+            stored = np.stack(store.get_many(keys))
+            recon = float(np.mean(np.sum(stored * vectors, axis=1) / np.linalg.norm(stored, axis=1)))
+            score_err = float(np.mean(np.abs(queries @ stored.T - queries @ vectors.T)))
+
+            started = time.perf_counter()
+            results = store.search_many(queries, k=args.k)
+            batch_ms = (time.perf_counter() - started) / len(queries) * 1000
+            started = time.perf_counter()
+            for query in queries[:20]:
+                store.search(query, k=args.k)
+            single_ms = (time.perf_counter() - started) / 20 * 1000
+
+            hits = sum(
+                len({int(key[1:]) for key, _ in found} & set(truth.tolist()))
+                for found, truth in zip(results, exact)
+            )
+            recall = hits / (len(queries) * args.k)
+
+            per_vector = store.size_bytes / len(vectors)
+            print(
+                f"{dtype:<10}{per_vector:>11,.0f}{list_bytes / per_vector:>9.1f}x{float32_bytes / per_vector:>7.2f}x"
+                f"{recon:>11.5f}{score_err:>11.4f}{recall:>8.3f}{batch_ms:>10.2f}{single_ms:>11.2f}"
+            )
+
+            row, _ = store.view(keys[0])
+            assert np.shares_memory(row, store._vectors), "view() must not copy"
+
+            # Reopening maps the same files and index
+            reopened = EmbeddingStore(capacity=len(vectors), dtype=dtype, path=os.path.join(tmp, dtype))
+            assert len(reopened) == len(vectors) and np.array_equal(reopened.get(keys[-1]), store.get(keys[-1]))
+
+    print("\nview() returns zero-copy views of the memory-mapped rows; reopened stores match.")
+
+
+if __name__ == "__main__":
+    main()
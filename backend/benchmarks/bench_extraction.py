@@ -0,0 +1,104 @@
+"""
+PDF extraction backend benchmark.
+
+Runs every installed ExtractionBackend over a corpus of PDFs and reports
+throughput and text fidelity.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extraction path/to/corpus [--repeat 3]
+
+Corpus layout:
+    corpus/
+        alice.pdf
+        alice.txt      # optional ground truth for alice.pdf
+        bob.pdf
+
+Fidelity is the token-level similarity (difflib ratio) between a backend's
+cleaned output and the ground truth .txt. When no .txt exists, the pypdf
+output is used as the reference, so pypdf scores 1.0 on those files.
+"""
+import argparse
+import difflib
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.services.extraction_backends import BACKENDS, PypdfBackend, get_backend
+from app.services.extraction_service import TextExtractionService
+
+
+def _tokens(text: str) -> List[str]:
+    return TextExtractionService._clean_text(text).lower().split()
+
+
+def _fidelity(candidate: str, reference: str) -> float:
+    return difflib.SequenceMatcher(None, _tokens(candidate), _tokens(reference), autojunk=False).ratio()
+
+
+def _extract(backend, data: bytes) -> tuple[str, int]:
+    pages = backend.extract_pages(io.BytesIO(data))
+    return "\n\n".join(p for p in pages if p), len(pages)
+
+
+def run(corpus: Path, repeat: int) -> int:
+    pdfs = sorted(corpus.glob("*.pdf"))
+    if not pdfs:
+        print(f"No PDFs found in {corpus}")
+        return 1
+
+    documents = {path: path.read_bytes() for path in pdfs}
+    total_mb = sum(len(d) for d in documents.values()) / (1024 * 1024)
+
+    reference_backend = get_backend(PypdfBackend.name)
+    references: Dict[Path, str] = {}
+    for path, data in documents.items():
+        truth = path.with_suffix(".txt")
+        references[path] = truth.read_text(encoding="utf-8") if truth.exists() else _extract(reference_backend, data)[0]
+
+    print(f"Corpus: {len(documents)} PDFs, {total_mb:.2f} MB, repeat={repeat}\n")
+    print(f"{'backend':<12} {'docs/s':>8} {'pages/s':>9} {'MB/s':>7} {'fidelity':>9} {'errors':>7}")
+
+    for name in BACKENDS:
+        backend = get_backend(name)
+        if backend is None:
+            print(f"{name:<12} {'not installed':>43}")
+            continue
+
+        errors = 0
+        pages = 0
+        elapsed = 0.0
+        texts: Dict[Path, str] = {}
+        for _ in range(repeat):
+            for path, data in documents.items():
+                # Only extraction is timed; fidelity is scored afterwards
+                start = time.perf_counter()
+                try:
+                    text, page_count = _extract(backend, data)
+                except Exception:
+                    errors += 1
+                    continue
+                finally:
+                    elapsed += time.perf_counter() - start
+                pages += page_count
+                texts.setdefault(path, text)
+
+        runs = len(documents) * repeat - errors
+        scores = [_fidelity(text, references[path]) for path, text in texts.items()]
+        fidelity = sum(scores) / len(scores) if scores else 0.0
+        elapsed = elapsed or float("inf")
+        print(
+            f"{name:<12} {runs / elapsed:>8.1f} {pages / elapsed:>9.1f} "
+            f"{total_mb * repeat / elapsed:>7.2f} {fidelity:>9.3f} {errors:>7}"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", type=Path, help="Directory with *.pdf files (and optional *.txt ground truth)")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the corpus per backend")
+    args = parser.parse_args()
+    sys.exit(run(args.corpus, args.repeat))
@@ -0,0 +1,67 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import analysis
+from app.core.admission import AdmissionController, InMemoryAdmissionBackend, LiveConnections
+from app.core.config import settings
+from app.core.security import sign_guest_session
+from app.schemas.scoring import ATSScoreResult, ScoreBreakdown
+from app.services.analysis_workflow_service import AnalysisWorkflowService
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # One request slot in total and per key: anything holding a slot blocks /score
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENT_PER_KEY", 1)
+    monkeypatch.setattr(settings, "ADMISSION_IP_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(settings, "LIVE_MAX_CONNECTIONS_PER_KEY", 1)
+    monkeypatch.setattr(AdmissionController, "_backend", InMemoryAdmissionBackend())
+    monkeypatch.setattr(AdmissionController, "_live", LiveConnections())
+
+    result = ATSScoreResult(
+        final_score=80,
+        breakdown=ScoreBreakdown(keyword_score=80, semantic_score=80, seniority_score=80, penalties=0),
+        missing_critical_skills=[],
+        missing_bonus_skills=[],
+        explanation="ok"
+    )
+
+    async def score(request, user_id, persisted):
+        return SimpleNamespace(result=result, from_store=True)
+
+    monkeypatch.setattr(AnalysisWorkflowService, "score", score)
+    app = FastAPI()
+    app.include_router(analysis.router)
+    return TestClient(app)
+
+
+def test_open_live_session_does_not_block_score(client):
+    session_id = sign_guest_session(str(uuid.uuid4()))
+    with client.websocket_connect(f"/live?session_id={session_id}"):
+        response = client.post(
+            "/score",
+            json={"resume_text": "resume", "job_description": "job"},
+            headers={"X-Session-ID": session_id}
+        )
+        assert response.status_code == 200
+        assert response.json()["final_score"] == 80
+    assert AdmissionController.stats()["live_connections"] == 0
+
+
+def test_live_connections_are_capped_per_key(client):
+    session_id = sign_guest_session(str(uuid.uuid4()))
+    with client.websocket_connect(f"/live?session_id={session_id}"):
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with client.websocket_connect(f"/live?session_id={session_id}"):
+                pass
+        assert refused.value.code == 1013
+    # Released on close
+    with client.websocket_connect(f"/live?session_id={session_id}"):
+        pass
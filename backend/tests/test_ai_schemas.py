@@ -0,0 +1,33 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.ai import BulletRewrite, ScoreAnalysis
+
+
+def test_score_analysis_coerces_recoverable_values():
+    analysis = ScoreAnalysis.model_validate({
+        "jd_analysis": {"critical_keywords": ["Python", {"keyword": ""}], "required_yoe": "5+ years"},
+        "resume_analysis": None,
+    })
+    assert [entry.keyword for entry in analysis.jd_analysis.critical_keywords] == ["Python"]
+    assert analysis.jd_analysis.required_yoe == 5
+    assert analysis.resume_analysis.suggestions == []
+    assert not analysis.repaired
+
+
+@pytest.mark.parametrize("reply", [
+    {"a": 1},
+    {"jd_analysis": None},
+    {"jd_analysis": {"bonus_keywords": ["Docker"]}},
+    {"jd_analysis": {"critical_keywords": []}},
+    {"jd_analysis": {"critical_keywords": [{"keyword": ""}]}},
+])
+def test_score_analysis_without_critical_keywords_is_rejected(reply):
+    with pytest.raises(ValidationError):
+        ScoreAnalysis.model_validate(reply)
+
+
+def test_repaired_mark_survives_copies():
+    reply = BulletRewrite(rewritten_text="Led a team")
+    reply.mark_repaired()
+    assert reply.repaired and reply.model_copy().repaired
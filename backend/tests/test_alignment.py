@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.alignment_service import AlignmentService
+
+
+def test_requirements_split_bullets_and_sentences():
+    jd = (
+        "Requirements:\n"
+        "- 5+ years of Python experience. Strong SQL skills are required.\n"
+        "• Experience with AWS and Docker\n"
+        "1) Good communication with stakeholders; able to mentor juniors\n"
+    )
+    assert AlignmentService.requirements(jd) == [
+        "5+ years of Python experience",
+        "Strong SQL skills are required",
+        "Experience with AWS and Docker",
+        "Good communication with stakeholders",
+        "able to mentor juniors",
+    ]
+
+
+def test_requirements_skip_short_and_duplicate_sentences():
+    jd = "Remote.\nTeam player. Knows Kubernetes well.\nknows kubernetes WELL.\n"
+    assert AlignmentService.requirements(jd) == ["Knows Kubernetes well"]
+
+
+def test_requirements_are_capped(monkeypatch):
+    monkeypatch.setattr(settings, "ALIGNMENT_MAX_REQUIREMENTS", 2)
+    jd = "\n".join(f"Requirement number {i} here" for i in range(5))
+    assert AlignmentService.requirements(jd) == ["Requirement number 0 here", "Requirement number 1 here"]
+
+
+def test_requirements_of_empty_text():
+    assert AlignmentService.requirements("") == []
+    assert AlignmentService.requirements(None) == []
+
+
+def test_match_picks_the_best_evidence_per_requirement():
+    evidence = [("Built Python services", "experience"), ("Led a team of five", "experience")]
+    sims = np.array([[0.9, 0.1], [0.2, 0.5]])
+    alignment = AlignmentService.match(["Python", "Leadership"], evidence, sims)
+    assert [(item.evidence, item.matched) for item in alignment] == [
+        ("Built Python services", True),
+        ("Led a team of five", 0.5 >= settings.ALIGNMENT_MIN_SIMILARITY),
+    ]
+    assert alignment[0].similarity == 0.9
@@ -0,0 +1,43 @@
+from app.core.config import settings
+from app.services.chunking_service import ChunkingService
+
+
+def words(n: int, word: str = "w") -> str:
+    return " ".join([word] * n)
+
+
+def test_pack_joins_lines_up_to_the_budget():
+    chunks = ChunkingService._pack([words(3), words(3), words(3)], max_words=6)
+    assert chunks == [words(3) + "\n" + words(3), words(3)]
+
+
+def test_pack_never_exceeds_the_budget():
+    lines = [words(n) for n in (1, 5, 2, 7, 3, 4, 6)]
+    chunks = ChunkingService._pack(lines, max_words=8)
+    assert all(len(chunk.split()) <= 8 for chunk in chunks)
+    assert sum(len(chunk.split()) for chunk in chunks) == sum(len(line.split()) for line in lines)
+
+
+def test_pack_cuts_an_overlong_line_at_word_boundaries():
+    line = " ".join(f"w{i}" for i in range(10))
+    chunks = ChunkingService._pack(["head", line], max_words=4)
+    assert chunks == ["head", "w0 w1 w2 w3", "w4 w5 w6 w7", "w8 w9"]
+
+
+def test_pack_uses_the_separator_and_skips_blank_lines():
+    assert ChunkingService._pack(["a b", "", "c"], max_words=5, separator="\n\n") == ["a b\n\nc"]
+    assert ChunkingService._pack([], max_words=5) == []
+
+
+def test_budget_grows_so_long_documents_fit_the_chunk_limit():
+    assert ChunkingService._budget(10) == settings.EMBEDDING_CHUNK_MAX_WORDS
+    total = settings.EMBEDDING_CHUNK_MAX_WORDS * settings.EMBEDDING_MAX_CHUNKS * 4
+    budget = ChunkingService._budget(total)
+    assert budget > settings.EMBEDDING_CHUNK_MAX_WORDS
+    assert budget * settings.EMBEDDING_MAX_CHUNKS >= total
+
+
+def test_text_chunks_follow_paragraphs():
+    chunks = ChunkingService.text_chunks("First para line one.\nline two.\n\nSecond para.")
+    assert [chunk.text for chunk in chunks] == ["First para line one.\nline two.", "Second para."]
+    assert [chunk.weight for chunk in chunks] == [6, 2]
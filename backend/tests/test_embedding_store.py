@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from app.core.embedding_store import EmbeddingStore
+
+
+def unit_vectors(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_int8_search_matches_exact_cosine_ranking():
+    vectors = unit_vectors(200, 64)
+    store = EmbeddingStore(capacity=256, dtype="int8")
+    store.put_many([f"v{i}" for i in range(len(vectors))], vectors)
+
+    query = vectors[17] + 0.05 * unit_vectors(1, 64, seed=1)[0]
+    exact = vectors @ (query / np.linalg.norm(query))
+    expected = [f"v{i}" for i in np.argsort(-exact)[:5]]
+
+    results = store.search(query, k=5)
+    assert [key for key, _ in results] == expected
+    for key, score in results:
+        assert score == pytest.approx(exact[int(key[1:])], abs=0.02)
+
+
+def test_int8_round_trip_is_close():
+    vectors = unit_vectors(3, 32)
+    store = EmbeddingStore(capacity=4, dtype="int8")
+    store.put_many(["a", "b", "c"], vectors)
+    for key, vector in zip("abc", vectors):
+        assert np.allclose(store.get(key), vector, atol=0.01)
+    assert store.get("missing") is None
+    assert (store.hits, store.misses) == (3, 1)
+
+
+def test_search_many_returns_one_list_per_query():
+    vectors = unit_vectors(10, 16)
+    store = EmbeddingStore(capacity=16, dtype="int8")
+    store.put_many([str(i) for i in range(10)], vectors)
+    results = store.search_many(vectors[:3], k=1)
+    assert [result[0][0] for result in results] == ["0", "1", "2"]
+    assert all(result[0][1] == pytest.approx(1.0, abs=0.01) for result in results)
+
+
+def test_ring_evicts_the_oldest_row():
+    vectors = unit_vectors(5, 8)
+    store = EmbeddingStore(capacity=3, dtype="int8")
+    store.put_many([str(i) for i in range(5)], vectors)
+    assert len(store) == 3 and store.evictions == 2
+    assert "0" not in store and "1" not in store
+    assert {key for key, _ in store.search(vectors[0], k=10)} == {"2", "3", "4"}
+
+
+def test_cleared_and_empty_stores_return_nothing():
+    store = EmbeddingStore(capacity=4, dtype="int8")
+    assert store.search([1.0, 0.0]) == []
+    store.put("a", [1.0, 0.0])
+    store.clear()
+    assert store.search([1.0, 0.0]) == []
+
+
+def test_zero_vector_is_never_a_match():
+    store = EmbeddingStore(capacity=4, dtype="int8")
+    store.put_many(["zero", "x"], [[0.0, 0.0], [1.0, 0.0]])
+    assert [key for key, _ in store.search([1.0, 0.0], k=2)] == ["x"]
+
+
+def test_dimension_mismatch_and_unknown_dtype_raise():
+    store = EmbeddingStore(capacity=4, dtype="int8")
+    store.put("a", [1.0, 0.0])
+    with pytest.raises(ValueError):
+        store.put("b", [1.0, 0.0, 0.0])
+    with pytest.raises(ValueError):
+        EmbeddingStore(capacity=4, dtype="int4")
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from app.core.idempotency import IdempotencyConflict, IdempotencyStore, StoredResponse
+
+
+def test_fingerprint_is_deterministic_and_covers_the_request():
+    base = IdempotencyStore.fingerprint("POST", "/api/v1/analysis/score", b"", b'{"a": 1}')
+    assert base == IdempotencyStore.fingerprint("POST", "/api/v1/analysis/score", b"", b'{"a": 1}')
+    assert base != IdempotencyStore.fingerprint("POST", "/api/v1/analysis/score", b"", b'{"a": 2}')
+    assert base != IdempotencyStore.fingerprint("POST", "/api/v1/analysis/optimize", b"", b'{"a": 1}')
+    assert base != IdempotencyStore.fingerprint("POST", "/api/v1/analysis/score", b"x=1", b'{"a": 1}')
+    assert base != IdempotencyStore.fingerprint("PUT", "/api/v1/analysis/score", b"", b'{"a": 1}')
+
+
+def test_fingerprint_ignores_the_multipart_boundary():
+    def multipart(boundary: bytes) -> bytes:
+        return b"--" + boundary + b'\r\nContent-Disposition: form-data; name="file"\r\n\r\nPDF\r\n--' + boundary + b"--\r\n"
+
+    first = IdempotencyStore.fingerprint("POST", "/upload", b"", multipart(b"abc123"), boundary=b"abc123")
+    retry = IdempotencyStore.fingerprint("POST", "/upload", b"", multipart(b"zz9"), boundary=b"zz9")
+    assert first == retry
+
+
+def test_fingerprint_separates_path_and_query():
+    assert IdempotencyStore.fingerprint("POST", "/a", b"b", b"") != IdempotencyStore.fingerprint("POST", "/ab", b"", b"")
+
+
+@pytest.mark.parametrize("status, storable", [(200, True), (422, True), (409, False), (429, False), (500, False)])
+def test_storable_statuses(status, storable):
+    assert StoredResponse.storable(status) is storable
+
+
+def test_claim_replays_and_refuses_a_different_request():
+    async def scenario():
+        key = ("ip:test", "/score", "k1")
+        assert await IdempotencyStore.claim(key, "fp", wait_seconds=1) is None
+        waiter = asyncio.create_task(IdempotencyStore.claim(key, "fp", wait_seconds=1))
+        await asyncio.sleep(0)
+        IdempotencyStore.complete(key, StoredResponse("fp", 200, [], b"ok"))
+        assert (await waiter).body == b"ok"
+        with pytest.raises(IdempotencyConflict):
+            await IdempotencyStore.claim(key, "other", wait_seconds=1)
+
+    asyncio.run(scenario())
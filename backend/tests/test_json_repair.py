@@ -0,0 +1,43 @@
+import pytest
+
+from app.core.json_repair import loads_tolerant
+
+
+def test_valid_json_is_not_repaired():
+    assert loads_tolerant('{"a": [1, 2]}') == ({"a": [1, 2]}, False)
+
+
+def test_code_fence_and_surrounding_prose():
+    assert loads_tolerant('Sure:\n```json\n{"a": 1}\n```') == ({"a": 1}, True)
+    assert loads_tolerant('{"a": 1} Hope this helps!') == ({"a": 1}, True)
+
+
+def test_trailing_commas_are_dropped():
+    assert loads_tolerant('{"a": [1, 2, ], "b": {"c": 3,\n},}') == ({"a": [1, 2], "b": {"c": 3}}, True)
+
+
+def test_commas_inside_strings_are_kept():
+    assert loads_tolerant('{"a": "keep, }", "b": "x,]",}') == ({"a": "keep, }", "b": "x,]"}, True)
+    assert loads_tolerant('{"a": "q\\", }", }') == ({"a": 'q", }'}, True)
+
+
+def test_truncated_after_a_complete_member_closes_the_brackets():
+    assert loads_tolerant('{"a": ["Python", "Java"') == ({"a": ["Python", "Java"]}, True)
+    assert loads_tolerant('{"a": {"b": 1}') == ({"a": {"b": 1}}, True)
+
+
+def test_truncated_member_is_dropped_not_completed():
+    assert loads_tolerant('{"a": ["Python", "Pyth') == ({"a": ["Python"]}, True)
+    assert loads_tolerant('{"a": [1, 2') == ({"a": [1]}, True)
+    assert loads_tolerant('{"a": "partial') == ({}, True)
+
+
+def test_truncated_member_is_cut_back():
+    assert loads_tolerant('{"a": 1, "b": tr') == ({"a": 1}, True)
+    assert loads_tolerant('[{"k": "v",}, {"k":') == ([{"k": "v"}, {}], True)
+
+
+@pytest.mark.parametrize("text", ["", "no json here", None])
+def test_nothing_to_parse_raises(text):
+    with pytest.raises(ValueError):
+        loads_tolerant(text)
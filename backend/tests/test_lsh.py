@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.core.lsh import MinHasher, MinHashLSH, optimal_bands
+
+
+def shingles(words, size=3):
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+BASE = [f"w{i}" for i in range(200)]
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.9])
+def test_optimal_bands_fit_the_signature(threshold):
+    bands, rows = optimal_bands(threshold, 128)
+    assert bands * rows <= 128
+    # The S-curve 1 - (1 - s^r)^b rises through the threshold
+    assert 1 - (1 - 0.2 ** rows) ** bands < 0.5 < 1 - (1 - 0.99 ** rows) ** bands
+
+
+def test_optimal_bands_use_longer_bands_for_higher_thresholds():
+    assert optimal_bands(0.9, 128)[1] > optimal_bands(0.5, 128)[1]
+
+
+def test_signatures_are_stable_and_estimate_jaccard():
+    first, second = MinHasher(num_perm=256), MinHasher(num_perm=256)
+    a = shingles(BASE)
+    b = shingles(BASE[:180] + [f"x{i}" for i in range(20)])
+    assert np.array_equal(first.signature(a), second.signature(a))
+    jaccard = len(a & b) / len(a | b)
+    assert MinHasher.similarity(first.signature(a), first.signature(b)) == pytest.approx(jaccard, abs=0.08)
+    assert first.signature([]) is None
+
+
+def test_query_finds_near_duplicates_only():
+    hasher = MinHasher(num_perm=128)
+    index = MinHashLSH(threshold=0.8, num_perm=128)
+    index.insert("base", hasher.signature(shingles(BASE)))
+    index.insert("other", hasher.signature(shingles([f"o{i}" for i in range(200)])))
+
+    near = hasher.signature(shingles(BASE[:195] + ["edit"]))
+    matches = index.query(near)
+    assert [key for key, _ in matches] == ["base"]
+    assert matches[0][1] >= 0.8
+    assert index.query(hasher.signature(shingles(BASE[:80] + [f"y{i}" for i in range(120)]))) == []
+
+
+def test_index_evicts_the_oldest_key():
+    hasher = MinHasher(num_perm=64)
+    index = MinHashLSH(threshold=0.8, num_perm=64, max_entries=2)
+    signatures = [hasher.signature(shingles([f"d{n}-{i}" for i in range(50)])) for n in range(3)]
+    for n, signature in enumerate(signatures):
+        index.insert(f"d{n}", signature)
+    assert len(index) == 2 and index.evictions == 1
+    assert index.query(signatures[0]) == []
+    assert [key for key, _ in index.query(signatures[2])] == ["d2"]
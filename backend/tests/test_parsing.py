@@ -0,0 +1,39 @@
+from app.services.parsing_service import ResumeParsingService
+
+
+def prompt_text(text: str) -> str:
+    return ResumeParsingService.to_prompt_text(ResumeParsingService.parse(text))
+
+
+def test_contact_details_are_removed_from_the_top_lines():
+    rendered = prompt_text(
+        "Jane Doe\n"
+        "jane@example.com | +55 (11) 91234-5678 | linkedin.com/in/jane\n"
+        "Experience\n"
+        "Backend Engineer, Acme 01/2019 - 03/2023\n"
+    )
+    assert rendered.splitlines()[0] == "Jane Doe"
+    assert "@" not in rendered and "91234" not in rendered and "linkedin" not in rendered
+    assert "01/2019 - 03/2023" in rendered
+
+
+def test_dated_experience_in_the_header_block_is_kept():
+    # "Career History" is not a recognised heading, so everything is "header"
+    text = (
+        "Jane Doe\n"
+        "jane@example.com\n"
+        "Career History\n"
+        "Senior Engineer, Acme 2019 - 2023\n"
+        "Engineer, Globex 01/2015 - 12/2018\n"
+        "- Built billing APIs serving 2 million users\n"
+        "- Cut p99 latency by 40%\n"
+    )
+    parsed = ResumeParsingService.parse(text)
+    assert [section.key for section in parsed.sections] == ["header"]
+
+    rendered = prompt_text(text)
+    assert "Senior Engineer, Acme 2019 - 2023" in rendered
+    assert "Engineer, Globex 01/2015 - 12/2018" in rendered
+    assert "- Built billing APIs serving 2 million users" in rendered
+    assert "- Cut p99 latency by 40%" in rendered
+    assert "jane@example.com" not in rendered
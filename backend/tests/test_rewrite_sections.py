@@ -0,0 +1,42 @@
+from app.services.parsing_service import ResumeParsingService
+from app.services.rewrite_service import RewriteService
+
+
+def section_jobs(text: str):
+    return RewriteService._section_jobs(ResumeParsingService.parse(text))
+
+
+def test_header_keeps_name_and_contact_lines():
+    header, jobs = section_jobs(
+        "Jane Doe\n"
+        "jane@example.com | +55 (11) 91234-5678\n"
+        "linkedin.com/in/jane\n"
+        "Experience\n"
+        "Backend Engineer, Acme 01/2019 - 03/2023\n"
+        "- Built billing APIs\n"
+        "Education\n"
+        "BSc Computer Science, USP 2014\n"
+    )
+    assert header == "# Jane Doe\njane@example.com | +55 (11) 91234-5678 | linkedin.com/in/jane"
+    assert [job.key for job in jobs] == ["summary", "skills", "experience", "education"]
+    assert jobs[2].source == "### Backend Engineer, Acme 01/2019 - 03/2023\n- Built billing APIs"
+
+
+def test_unrecognized_heading_before_known_sections_falls_back_to_single_mode():
+    # "Career History" is not a recognised heading: its roles land in the header block
+    header, jobs = section_jobs(
+        "Jane Doe\n"
+        "jane@example.com\n"
+        "Career History\n"
+        "Senior Engineer, Acme 2019 - 2023\n"
+        "- Cut p99 latency by 40%\n"
+        "Experience\n"
+        "Engineer, Globex 01/2015 - 12/2018\n"
+        "Education\n"
+        "BSc Computer Science, USP 2014\n"
+    )
+    assert (header, jobs) == ("", [])
+
+
+def test_no_experience_section_falls_back_to_single_mode():
+    assert section_jobs("Jane Doe\njane@example.com\nSkills\nPython, Go\n") == ("", [])
@@ -1,7 +1,7 @@
 'use client'
 
 import { useState, useEffect } from "react"
-import { fetchWithAuth, getSessionId, optimizeResume } from "@/lib/api"
+import { fetchWithAuth, optimizeResume, rememberSessionId, sessionHeaders } from "@/lib/api"
 import { Button } from "@/components/ui/button"
 import { Textarea } from "@/components/ui/textarea"
 import { Input } from "@/components/ui/input"
@@ -22,6 +22,14 @@ interface ScoreBreakdown {
   penalties: number
 }
 
+interface RequirementEvidence {
+  requirement: string
+  evidence?: string | null
+  section?: string | null
+  similarity: number
+  matched: boolean
+}
+
 interface ATSScoreResult {
   final_score: number
   breakdown: ScoreBreakdown
@@ -29,6 +37,7 @@ interface ATSScoreResult {
   missing_bonus_skills: string[]
   explanation: string
   suggestions?: string[]
+  alignment?: RequirementEvidence[]
 }
 
 interface Resume {
@@ -128,13 +137,11 @@ export default function DashboardView() {
   const handleDownload = async (fileName: string) => {
     setIsDownloading(fileName)
     try {
-      const sessionId = getSessionId()
       const response = await fetch(`${API_URL}/resumes/download_resume?file_name=${encodeURIComponent(fileName)}`, {
         method: 'GET',
-        headers: {
-          'X-Session-ID': sessionId,
-        },
+        headers: sessionHeaders(),
       })
+      rememberSessionId(response)
 
       if (!response.ok) {
         if (response.status === 404) throw new Error('File not found')
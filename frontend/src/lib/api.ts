@@ -18,24 +18,31 @@ const getBaseUrl = () => {
 
 const API_URL = getBaseUrl()
 
-export function getSessionId() {
-  if (typeof window === 'undefined') return '00000000-0000-0000-0000-000000000000'
-  
-  let sessionId = localStorage.getItem('nexus_session_id_v2')
-  if (!sessionId) {
-    // Generate a valid UUID v4
-    sessionId = crypto.randomUUID()
-    localStorage.setItem('nexus_session_id_v2', sessionId)
+const SESSION_KEY = 'nexus_session_id_v3'
+
+// Guest session ids are issued and signed by the API (X-Session-ID response header);
+// until the first response there is none and the request is sent without it.
+export function getSessionId(): string | null {
+  if (typeof window === 'undefined') return null
+  return localStorage.getItem(SESSION_KEY)
+}
+
+export function rememberSessionId(response: Response) {
+  const issued = response.headers.get('X-Session-ID')
+  if (issued && typeof window !== 'undefined') {
+    localStorage.setItem(SESSION_KEY, issued)
   }
-  return sessionId
+}
+
+export function sessionHeaders(): Record<string, string> {
+  const sessionId = getSessionId()
+  return sessionId ? { 'X-Session-ID': sessionId } : {}
 }
 
 export async function fetchWithAuth(endpoint: string, options: RequestInit = {}) {
   // No Supabase Auth anymore. We use Session ID for guests.
-  const sessionId = getSessionId()
-  
   const headers: Record<string, string> = {
-    'X-Session-ID': sessionId,
+    ...sessionHeaders(),
     ...options.headers as Record<string, string>,
   }
 
@@ -48,6 +55,7 @@ export async function fetchWithAuth(endpoint: string, options: RequestInit = {})
     ...options,
     headers,
   })
+  rememberSessionId(response)
 
   if (!response.ok) {
     const errorData = await response.json().catch(() => ({}))
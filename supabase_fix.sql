@@ -44,6 +44,9 @@ BEGIN
         ALTER TABLE public.resumes OWNER TO postgres;
     EXCEPTION WHEN OTHERS THEN NULL; END;
 
+    -- Paginação por cursor do GET /resumes: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    CREATE INDEX IF NOT EXISTS idx_resumes_user_created_id ON public.resumes (user_id, created_at DESC, id DESC);
+
     -- Tabela Job Descriptions
     IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'job_status') THEN
         CREATE TYPE public.job_status AS ENUM ('saved', 'applied', 'interviewing', 'offer', 'rejected');
@@ -72,11 +75,22 @@ BEGIN
         job_description_id UUID REFERENCES public.job_descriptions(id) ON DELETE CASCADE,
         match_score INTEGER CHECK (match_score >= 0 AND match_score <= 100),
         summary TEXT,
+        resume_hash TEXT,
+        jd_hash TEXT,
+        scoring_version INTEGER,
+        result JSONB,
         created_at TIMESTAMPTZ DEFAULT now()
     );
     BEGIN
         ALTER TABLE public.analyses OWNER TO postgres;
     EXCEPTION WHEN OTHERS THEN NULL; END;
+
+    -- Colunas para resultados salvos do /analysis/score (instalações antigas)
+    ALTER TABLE public.analyses ADD COLUMN IF NOT EXISTS resume_hash TEXT;
+    ALTER TABLE public.analyses ADD COLUMN IF NOT EXISTS jd_hash TEXT;
+    ALTER TABLE public.analyses ADD COLUMN IF NOT EXISTS scoring_version INTEGER;
+    ALTER TABLE public.analyses ADD COLUMN IF NOT EXISTS result JSONB;
+    CREATE INDEX IF NOT EXISTS idx_analyses_lookup ON public.analyses (user_id, resume_hash, jd_hash, created_at DESC);
 END $$;
 
 -- 3. HABILITAR RLS (Segurança)
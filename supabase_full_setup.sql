@@ -38,6 +38,9 @@ CREATE TABLE IF NOT EXISTS resumes (
     updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Keyset pagination for GET /resumes: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_resumes_user_created_id ON resumes (user_id, created_at DESC, id DESC);
+
 -- Job Descriptions Table
 DROP TYPE IF EXISTS job_status CASCADE;
 CREATE TYPE job_status AS ENUM ('saved', 'applied', 'interviewing', 'offer', 'rejected');
@@ -62,9 +65,20 @@ CREATE TABLE IF NOT EXISTS analyses (
     job_description_id UUID REFERENCES job_descriptions(id) ON DELETE CASCADE, -- Made nullable
     match_score INTEGER CHECK (match_score >= 0 AND match_score <= 100),
     summary TEXT,
+    resume_hash TEXT,
+    jd_hash TEXT,
+    scoring_version INTEGER,
+    result JSONB,
     created_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Columns for stored /analysis/score results (older installs)
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS resume_hash TEXT;
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS jd_hash TEXT;
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS scoring_version INTEGER;
+ALTER TABLE analyses ADD COLUMN IF NOT EXISTS result JSONB;
+CREATE INDEX IF NOT EXISTS idx_analyses_lookup ON analyses (user_id, resume_hash, jd_hash, created_at DESC);
+
 -- Keyword Gaps Table
 DROP TYPE IF EXISTS keyword_importance CASCADE;
 DROP TYPE IF EXISTS keyword_status CASCADE;
@@ -5,6 +5,7 @@
 -- 1. Performance Optimization: Index Foreign Keys
 -- RLS checks often join tables. Indexes are critical for performance.
 CREATE INDEX IF NOT EXISTS idx_resumes_user_id ON resumes(user_id);
+CREATE INDEX IF NOT EXISTS idx_resumes_user_created_id ON resumes(user_id, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_job_descriptions_user_id ON job_descriptions(user_id);
 CREATE INDEX IF NOT EXISTS idx_analyses_user_id ON analyses(user_id);
 CREATE INDEX IF NOT EXISTS idx_analyses_resume_id ON analyses(resume_id);
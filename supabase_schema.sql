@@ -24,6 +24,9 @@ CREATE TABLE resumes (
     updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Keyset pagination for GET /resumes: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_resumes_user_created_id ON resumes (user_id, created_at DESC, id DESC);
+
 -- 3. Job Descriptions Table (Kanban Board Core)
 CREATE TYPE job_status AS ENUM ('saved', 'applied', 'interviewing', 'offer', 'rejected');
 
@@ -43,13 +46,20 @@ CREATE TABLE job_descriptions (
 CREATE TABLE analyses (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
-    resume_id UUID NOT NULL REFERENCES resumes(id) ON DELETE CASCADE,
-    job_description_id UUID NOT NULL REFERENCES job_descriptions(id) ON DELETE CASCADE,
+    resume_id UUID REFERENCES resumes(id) ON DELETE CASCADE, -- NULL when scored from inline text
+    job_description_id UUID REFERENCES job_descriptions(id) ON DELETE CASCADE, -- NULL for ad-hoc JDs
     match_score INTEGER CHECK (match_score >= 0 AND match_score <= 100),
     summary TEXT,
+    resume_hash TEXT, -- sha256 of the resume text
+    jd_hash TEXT, -- sha256 of the normalised job description
+    scoring_version INTEGER,
+    result JSONB, -- full ATSScoreResult, returned as-is on lookup
     created_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Stored-result lookup for /analysis/score
+CREATE INDEX IF NOT EXISTS idx_analyses_lookup ON analyses (user_id, resume_hash, jd_hash, created_at DESC);
+
 -- 5. Keyword Gaps Table
 CREATE TYPE keyword_importance AS ENUM ('critical', 'high', 'medium', 'low');
 CREATE TYPE keyword_status AS ENUM ('missing', 'partial', 'present');